@@ -8,16 +8,28 @@ API REST per gestire calendario, tecnici, e aiutanti
 import sys
 import os
 import io
-from flask import Flask, jsonify, request, send_from_directory, send_file
+from flask import Flask, jsonify, request, send_from_directory, send_file, make_response, g, has_request_context
 from flask_cors import CORS
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 from pathlib import Path
 import uuid
+from collections import ChainMap, OrderedDict
+from contextlib import contextmanager
+import functools
+import hashlib
+import random
 import tempfile
 import threading
+import time
 import webbrowser
 
+try:
+    import fcntl
+except ImportError:  # Windows (EXE desktop): lock con msvcrt
+    fcntl = None
+    import msvcrt
+
 def _get_base_dir() -> Path:
     """Directory 'portabile' dove tenere dati e da cui risolvere risorse.
 
@@ -56,6 +68,9 @@ sys.path.insert(0, str(SRC_DIR))
 from calendar_generator import CalendarioReperibilita
 from pdf_generator import PDFCalendarioGenerator
 from excel_generator import GeneratoreExcel
+from scenari import PARAMETRI_SCENARIO, confronta_scenari
+from ottimizzatore import BUDGET_MS_DEFAULT, ottimizza_equita
+from fattibilita import verifica_fattibilita
 
 # Crea l'app Flask
 app = Flask(__name__, static_folder=str(STATIC_DIR), static_url_path='')
@@ -64,11 +79,18 @@ CORS(app)
 
 @app.after_request
 def _disable_api_cache(response):
-    """Evita risposte stale (browser/proxy)."""
+    """Evita risposte stale (browser/proxy).
+
+    Le risposte con ETag (vedi _con_etag) possono essere conservate, ma vanno sempre
+    riconvalidate con If-None-Match prima dell'uso.
+    """
     try:
         path = request.path or ""
         if path.startswith("/api/"):
-            response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+            if response.get_etag()[0]:
+                response.headers["Cache-Control"] = "no-cache, must-revalidate, max-age=0"
+            else:
+                response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
             response.headers["Pragma"] = "no-cache"
             response.headers["Expires"] = "0"
     except Exception:
@@ -82,6 +104,11 @@ def _disable_api_cache(response):
 DATA_DIR = Path(os.environ.get("REPAPP_DATA_DIR", str(BASE_DIR / "pwa_data")))
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 CONFIG_FILE = DATA_DIR / "config.json"
+# Lock tra processi (più worker gunicorn) per i salvataggi della config
+CONFIG_LOCK_FILE = DATA_DIR / "config.json.lock"
+
+# Tentativi di un handler che trova la config salvata nel frattempo da un'altra richiesta
+TENTATIVI_SALVATAGGIO = 10
 
 # Config predefinita
 CONFIG_DEFAULT = {
@@ -105,15 +132,33 @@ CONFIG_DEFAULT = {
     "giorni_settimana_aiutanti": [],
     # Ferie tecnici: lista di periodi {id, nome, dal, al} (YYYY-MM-DD)
     "ferie": [],
-    # Cache dell'ultimo calendario calcolato (per aggiornamenti parziali)
-    "calendario_cache": None,
+    # Assegnazioni fisse decise dal responsabile: {"YYYY-MM-DD": "tecnico"}
+    # (si aggiungono al default del motore: 1 gennaio 2026 a Dardha)
+    "assegnazioni_fisse": {},
+    # Calendari calcolati per anno (per aggiornamenti parziali e scambi):
+    # {"2026": {"anno", "assegnazioni", "checkpoint", "updated_at", ...}, ...}
+    "calendario_cache": {},
     # Stato rotazione per continuità tra anni: {"2026": {"next_tecnico_index": 3, "next_aiutante_offset": 1}, ...}
     "rotazione_after_year": {},
     # Stato rotazione per-festività tra anni: {"2026": {"01-06": 4, "EASTER": 2, ...}, ...}
     "rotazione_festivi_after_year": {},
-    "anno": 2026
+    # Squadre aggiuntive con reperibilità indipendente:
+    # {"nome": {"tecnici": [...], "aiutanti": [...], "date_aiutanti": [...]}} (+ stato rotazione e cache propri)
+    "squadre": {},
+    "anno": 2026,
+    # Versione della config su disco, incrementata a ogni salvataggio (controllo di concorrenza ottimistico)
+    "versione": 0
 }
 
+# Nome con cui la squadra definita al primo livello della config compare negli elenchi
+SQUADRA_PRINCIPALE = "principale"
+
+# Chiavi proprie di ogni squadra (le altre, es. ferie e anno, sono condivise)
+CHIAVI_SQUADRA = (
+    "tecnici", "aiutanti", "date_aiutanti", "assegnazioni_fisse", "calendario_cache",
+    "rotazione_after_year", "rotazione_festivi_after_year",
+)
+
 
 def normalizza_config(config: dict) -> dict:
     """Garantisce che la config abbia tutte le chiavi attese (compatibilità)."""
@@ -133,6 +178,11 @@ def normalizza_config(config: dict) -> dict:
             normalized["anno"] = int(normalized.get("anno", CONFIG_DEFAULT["anno"]))
         except Exception:
             normalized["anno"] = CONFIG_DEFAULT["anno"]
+    if not isinstance(normalized.get("versione"), int):
+        try:
+            normalized["versione"] = int(normalized.get("versione") or 0)
+        except Exception:
+            normalized["versione"] = 0
     if not isinstance(normalized.get("ferie"), list):
         normalized["ferie"] = []
     else:
@@ -147,15 +197,100 @@ def normalizza_config(config: dict) -> dict:
             fixed_ferie.append(ff)
         normalized["ferie"] = fixed_ferie
 
-    if normalized.get("calendario_cache") is not None and not isinstance(normalized.get("calendario_cache"), dict):
-        normalized["calendario_cache"] = None
+    if not isinstance(normalized.get("assegnazioni_fisse"), dict):
+        normalized["assegnazioni_fisse"] = {}
+    else:
+        normalized["assegnazioni_fisse"] = {
+            str(data_str): str(nome) for data_str, nome in normalized["assegnazioni_fisse"].items()
+        }
+
+    normalized["calendario_cache"] = _normalizza_cache_calendario(normalized.get("calendario_cache"))
     if not isinstance(normalized.get("rotazione_after_year"), dict):
         normalized["rotazione_after_year"] = {}
     if not isinstance(normalized.get("rotazione_festivi_after_year"), dict):
         normalized["rotazione_festivi_after_year"] = {}
+    if not isinstance(normalized.get("squadre"), dict):
+        normalized["squadre"] = {}
+    else:
+        normalized["squadre"] = {
+            str(nome): dati for nome, dati in normalized["squadre"].items()
+            if isinstance(dati, dict) and isinstance(dati.get("tecnici"), list)
+        }
+        for dati in normalized["squadre"].values():
+            if "calendario_cache" in dati:
+                dati["calendario_cache"] = _normalizza_cache_calendario(dati["calendario_cache"])
     return normalized
 
 
+def _normalizza_cache_calendario(cache) -> dict:
+    """calendario_cache per anno ({"2026": {...}}); le config precedenti avevano un solo anno ({"anno": 2026, ...})."""
+    if not isinstance(cache, dict):
+        return {}
+    if "anno" in cache and "assegnazioni" in cache:
+        return {str(cache["anno"]): cache}
+    return {
+        str(anno): voce for anno, voce in cache.items()
+        if isinstance(voce, dict) and isinstance(voce.get("assegnazioni"), dict)
+    }
+
+
+def _cache_anno(config: dict, anno: int) -> dict:
+    """Voce di calendario_cache per l'anno ({} se l'anno non è in cache)."""
+    voce = _normalizza_cache_calendario(config.get("calendario_cache")).get(str(anno))
+    return voce or {}
+
+
+def _imposta_cache_anno(config: dict, anno: int, voce: dict):
+    """Sostituisce la voce di calendario_cache di un anno, lasciando invariati gli altri anni."""
+    cache = _normalizza_cache_calendario(config.get("calendario_cache"))
+    cache[str(anno)] = voce
+    config["calendario_cache"] = cache
+
+
+def _rimuovi_cache_anno(config: dict, anno):
+    """Toglie un anno da calendario_cache (la prossima lettura lo rigenera)."""
+    cache = _normalizza_cache_calendario(config.get("calendario_cache"))
+    cache.pop(str(anno), None)
+    config["calendario_cache"] = cache
+
+
+def _cache_valida(config: dict, anno: int) -> dict:
+    """Voce dell'anno in calendario_cache se calcolata con gli input attuali ({} altrimenti).
+
+    La voce conserva patch e scambi; se tecnici, ferie, assegnazioni fisse o stato di
+    rotazione sono cambiati (impronta diversa) l'anno va rigenerato.
+    """
+    cache = _cache_anno(config, anno)
+    if cache and cache.get("impronta") == _chiave_calendario(config, anno, anno):
+        return cache
+    return {}
+
+
+def _squadra_richiesta() -> str:
+    """Squadra indicata nella richiesta (?squadra= oppure campo "squadra" del body JSON)."""
+    squadra = request.args.get("squadra")
+    if not squadra and request.is_json:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            squadra = body.get("squadra")
+    return (str(squadra).strip() if squadra else "")
+
+
+def _config_squadra(config: dict, squadra: str):
+    """Vista della config per una squadra (None/principale = config di primo livello).
+
+    Le chiavi di CHIAVI_SQUADRA si leggono e si scrivono nella squadra, le altre
+    (ferie, anno, ...) sono lette dalla config comune. Ritorna None se la squadra non esiste.
+    """
+    if not squadra or squadra == SQUADRA_PRINCIPALE:
+        return config
+    dati = (config.get("squadre") or {}).get(squadra)
+    if not isinstance(dati, dict):
+        return None
+    comuni = {k: v for k, v in config.items() if k not in CHIAVI_SQUADRA and k != "squadre"}
+    return ChainMap(dati, comuni)
+
+
 def _calcola_statistiche_da_assegnazioni(assegnazioni: dict) -> tuple[dict, dict]:
     stats_tecnici: dict = {}
     stats_aiutanti: dict = {}
@@ -178,18 +313,198 @@ def _parse_date_yyyy_mm_dd(value: str) -> datetime:
     return datetime.strptime(value, "%Y-%m-%d")
 
 
+# Config già letta e normalizzata, valida finché il file non cambia (mtime, dimensione, inode):
+# le modifiche esterne (altri worker, modifica a mano) vengono rilette alla richiesta successiva
+_config_cache = {"chiave": None, "config": None, "impronta": None}
+_config_lock = threading.Lock()
+
+
+def _chiave_config_file():
+    try:
+        st = CONFIG_FILE.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _copia_config(valore, chiave=None, in_cache=False):
+    """Copia della config per un handler, che può modificarla senza toccare la cache.
+
+    Dict e liste sono copiati a ogni livello. Dentro calendario_cache (assegnazioni e checkpoint
+    di un anno) si copiano solo i dict: le righe [tecnico, tipo, aiutante] e [w, f] restano
+    condivise con la cache, quindi vanno sostituite, non modificate sul posto.
+    """
+    if isinstance(valore, dict):
+        in_cache = in_cache or chiave == "calendario_cache"
+        if in_cache:
+            return {k: _copia_config(v, k, True) if isinstance(v, dict) else v for k, v in valore.items()}
+        return {k: _copia_config(v, k) for k, v in valore.items()}
+    if isinstance(valore, list) and not in_cache:
+        return [_copia_config(v) for v in valore]
+    return valore
+
+
+def _config_da_file():
+    """Config su disco, dalla cache se il file non è cambiato (chiamare con _config_lock acquisito)."""
+    chiave = _chiave_config_file()
+    if chiave is None:
+        return CONFIG_DEFAULT
+    if _config_cache["chiave"] != chiave:
+        with open(CONFIG_FILE, 'rb') as f:
+            contenuto = f.read()
+        _config_cache["config"] = normalizza_config(json.loads(contenuto))
+        _config_cache["impronta"] = hashlib.sha256(contenuto).hexdigest()
+        _config_cache["chiave"] = chiave
+    return _config_cache["config"]
+
+
+def _impronta_config() -> str:
+    """Impronta (sha256) del contenuto di config.json: cambia a ogni modifica, anche esterna."""
+    return _leggi_config_e_impronta(copia=False)[1]
+
+
+def _leggi_config_e_impronta(copia: bool = True) -> tuple:
+    """Config (copia per l'handler) e impronta del contenuto da cui è stata letta, lette insieme.
+
+    Durante una richiesta l'impronta resta in g.impronta_config: l'ETag della risposta
+    (_con_etag) è quello della config effettivamente letta dall'handler.
+    """
+    with _config_lock:
+        config = _config_da_file()
+        impronta = "default" if config is CONFIG_DEFAULT else _config_cache["impronta"]
+    if copia and has_request_context():
+        g.impronta_config = impronta
+    return (_copia_config(config) if copia else None), impronta
+
+
 def leggi_config():
-    """Legge la configurazione dal file"""
-    if CONFIG_FILE.exists():
-        with open(CONFIG_FILE, 'r') as f:
-            return normalizza_config(json.load(f))
-    return CONFIG_DEFAULT.copy()
+    """Legge la configurazione dal file (dalla cache in memoria se il file non è cambiato)"""
+    return _leggi_config_e_impronta()[0]
+
+
+class ConflittoConfig(Exception):
+    """La config su disco è stata salvata da un'altra richiesta dopo la lettura (versione diversa)."""
+
+
+@contextmanager
+def _lock_file_config():
+    """Lock esclusivo tra processi sul file CONFIG_LOCK_FILE (fcntl, o msvcrt su Windows).
+
+    Vale anche tra thread dello stesso processo: ogni chiamata apre il file per conto suo.
+    """
+    with open(CONFIG_LOCK_FILE, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK riprova per circa 10 secondi, poi solleva OSError
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
 
 
 def salva_config(config):
-    """Salva la configurazione nel file"""
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(normalizza_config(config), f, indent=2)
+    """Salva la configurazione nel file.
+
+    Scrittura atomica (file temporaneo + os.replace) sotto lock tra processi: chi legge vede
+    sempre il file vecchio o quello nuovo, mai uno troncato. Se la versione della config non è
+    più quella su disco (un'altra richiesta ha salvato dopo la lettura) solleva ConflittoConfig.
+    _config_lock si prende solo per leggere la versione e per aggiornare la cache: durante
+    scrittura e fsync le letture non restano bloccate.
+    """
+    normalizzata = normalizza_config(config)
+    with _lock_file_config():
+        with _config_lock:
+            versione = _config_da_file()["versione"]
+        if normalizzata["versione"] != versione:
+            raise ConflittoConfig(
+                f"Configurazione modificata da un'altra richiesta (versione {versione}, letta {normalizzata['versione']})"
+            )
+        normalizzata["versione"] = versione + 1
+        temporaneo = CONFIG_FILE.with_name(f"{CONFIG_FILE.name}.{os.getpid()}.tmp")
+        contenuto = json.dumps(normalizzata, indent=2)
+        with open(temporaneo, 'w') as f:
+            f.write(contenuto)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaneo, CONFIG_FILE)
+        # Copia: l'handler può continuare a modificare la propria config dopo il salvataggio
+        nuova = _copia_config(normalizzata)
+        impronta = hashlib.sha256(contenuto.encode("utf-8")).hexdigest()
+        chiave = _chiave_config_file()
+        with _config_lock:
+            _config_cache["config"] = nuova
+            _config_cache["impronta"] = impronta
+            _config_cache["chiave"] = chiave
+    # Un secondo salvataggio nella stessa richiesta parte dalla nuova versione
+    config["versione"] = normalizzata["versione"]
+    if has_request_context():
+        # La risposta dell'handler rispecchia ora la config appena salvata
+        g.impronta_config = impronta
+
+
+def _etag_richiesta(impronta: str) -> str:
+    """ETag di una GET sul calendario: impronta della config, percorso e query (anno, squadra, ...).
+
+    Comprende anche la data odierna, default di alcuni parametri (es. dal di /api/calendario/orizzonte).
+    """
+    dati = "|".join((impronta, request.full_path, datetime.now().strftime("%Y-%m-%d")))
+    return hashlib.sha256(dati.encode("utf-8")).hexdigest()
+
+
+def _con_etag(handler):
+    """GET condizionale: 304 se If-None-Match corrisponde all'ETag della config attuale.
+
+    A parità di config e richiesta le risposte del calendario sono identiche (generazione
+    deterministica), quindi l'ETag si calcola senza eseguire l'handler. Quello della
+    risposta usa l'impronta della config letta (o salvata) dall'handler, non quella del file
+    a fine richiesta: un salvataggio concorrente non può etichettare dati vecchi come nuovi.
+    """
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        if request.method != "GET":
+            return handler(*args, **kwargs)
+        etag = _etag_richiesta(_impronta_config())
+        if request.if_none_match.contains(etag):
+            risposta = make_response("", 304)
+            risposta.set_etag(etag)
+            return risposta
+        g.pop("impronta_config", None)
+        risposta = make_response(handler(*args, **kwargs))
+        impronta = g.pop("impronta_config", None)
+        # Senza impronta (handler che non ha letto la config) la risposta resta senza ETag
+        if risposta.status_code == 200 and impronta is not None:
+            risposta.set_etag(_etag_richiesta(impronta))
+        return risposta
+    return wrapper
+
+
+def _riprova_se_conflitto(handler):
+    """Riesegue l'handler (rilettura, modifica, salvataggio) se il salvataggio va in conflitto.
+
+    Dopo TENTATIVI_SALVATAGGIO conflitti consecutivi risponde 409.
+    """
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        for tentativo in range(TENTATIVI_SALVATAGGIO):
+            try:
+                return handler(*args, **kwargs)
+            except ConflittoConfig:
+                # Attesa crescente e casuale, per non ripresentarsi insieme agli altri scrittori
+                time.sleep(random.uniform(0, 0.01 * 2 ** min(tentativo, 5)))
+        return jsonify({"error": "Configurazione modificata da un'altra richiesta, riprova"}), 409
+    return wrapper
 
 
 def _parse_anno_query(default_anno: int) -> int:
@@ -212,8 +527,12 @@ def _parse_anno_query(default_anno: int) -> int:
     return int(anno or default_anno)
 
 
-def _build_calendario(config: dict, anno: int) -> CalendarioReperibilita:
-    """Costruisce e genera un calendario coerente con la config e la continuità di rotazione."""
+def _parametri_calendario(config: dict, anno: int) -> dict:
+    """Parametri del costruttore di CalendarioReperibilita per la config e l'anno indicati.
+
+    Ogni richiesta costruisce la propria istanza: nessun attributo di classe viene modificato,
+    quindi richieste concorrenti (es. gunicorn con thread) non interferiscono.
+    """
     # Stato rotazione: per l'anno richiesto, usa i puntatori salvati dall'anno precedente
     rot_state = config.get("rotazione_after_year", {}) or {}
     prev_state = rot_state.get(str(anno - 1), {}) if isinstance(rot_state, dict) else {}
@@ -225,19 +544,158 @@ def _build_calendario(config: dict, anno: int) -> CalendarioReperibilita:
     if not isinstance(prev_fest_state, dict):
         prev_fest_state = {}
 
-    CalendarioReperibilita.ANNO = anno
-    CalendarioReperibilita.TECNICI = config.get("tecnici", CalendarioReperibilita.TECNICI)
-    CalendarioReperibilita.AIUTANTI = config.get("aiutanti", [])
-    CalendarioReperibilita.DATE_AIUTANTI = config.get("date_aiutanti", [])
-    CalendarioReperibilita.FERIE = config.get("ferie", [])
-    CalendarioReperibilita.GIORNI_AIUTANTI = []
-    CalendarioReperibilita.ROTATION_START_INDEX = start_idx
-    CalendarioReperibilita.AIUTANTI_OFFSET = aiut_offset
-    CalendarioReperibilita.FESTIVI_ROTATION_START = prev_fest_state
+    return {
+        "anno": anno,
+        "tecnici": config.get("tecnici", CalendarioReperibilita.TECNICI),
+        "aiutanti": config.get("aiutanti", []),
+        "date_aiutanti": config.get("date_aiutanti", []),
+        "ferie": config.get("ferie", []),
+        "rotation_start_index": start_idx,
+        "aiutanti_offset": aiut_offset,
+        "festivi_rotation_start": prev_fest_state,
+        "assegnazioni_fisse": config.get("assegnazioni_fisse", {}),
+    }
+
+
+def _stati_rotazione(config: dict) -> dict:
+    """Stati di fine anno salvati in config, nel formato di CalendarioReperibilita.genera_anni."""
+    rot_state = config.get("rotazione_after_year") or {}
+    fest_state = config.get("rotazione_festivi_after_year") or {}
+    stati = {}
+    if not isinstance(rot_state, dict):
+        return stati
+    for anno_str, stato in rot_state.items():
+        try:
+            anno = int(anno_str)
+        except Exception:
+            continue
+        if not isinstance(stato, dict):
+            continue
+        festivi = fest_state.get(str(anno_str), {}) if isinstance(fest_state, dict) else {}
+        stati[anno] = {
+            "next_tecnico_index": int(stato.get("next_tecnico_index", 0) or 0),
+            "next_aiutante_offset": int(stato.get("next_aiutante_offset", 0) or 0),
+            "festivi": festivi if isinstance(festivi, dict) else {},
+        }
+    return stati
+
+
+def _salva_stati_rotazione(config: dict, stati: dict):
+    """Riporta in config (rotazione_after_year / rotazione_festivi_after_year) gli stati di fine anno."""
+    rot_state = config.get("rotazione_after_year") or {}
+    if not isinstance(rot_state, dict):
+        rot_state = {}
+    fest_state = config.get("rotazione_festivi_after_year") or {}
+    if not isinstance(fest_state, dict):
+        fest_state = {}
+    for anno, stato in stati.items():
+        rot_state[str(anno)] = {
+            "next_tecnico_index": int(stato.get("next_tecnico_index", 0) or 0),
+            "next_aiutante_offset": int(stato.get("next_aiutante_offset", 0) or 0),
+        }
+        fest_state[str(anno)] = dict(stato.get("festivi") or {})
+    config["rotazione_after_year"] = rot_state
+    config["rotazione_festivi_after_year"] = fest_state
+
+
+# Calendari generati (per processo), per impronta degli input: le richieste ripetute
+# sullo stesso anno (calendario, export PDF ed Excel) non rigenerano l'anno intero
+MAX_CALENDARI_IN_CACHE = 16
+_calendari_generati: "OrderedDict[str, tuple]" = OrderedDict()
+_calendari_lock = threading.Lock()
+
+
+def _build_calendario(config: dict, anno: int) -> CalendarioReperibilita:
+    """Costruisce e genera un calendario coerente con la config e la continuità di rotazione.
+
+    Se manca lo stato di fine anno precedente, gli anni intermedi vengono generati in catena
+    (a partire dall'anno base della config o dall'ultimo stato noto) e i loro stati finali
+    vengono memorizzati in config, così saltare direttamente a un anno lontano resta corretto.
+
+    I calendari generati restano in una cache LRU per impronta degli input (vedi
+    _chiave_calendario): a input invariati si riceve una copia, senza rigenerare.
+    """
+    anno_base = int(config.get("anno", 2026) or 2026)
+    anno_da = min(anno_base, anno)
+    stati = _stati_rotazione(config)
+    # Primo anno che genera_anni rigenererebbe: il più recente con lo stato dell'anno prima già noto
+    inizio = next((a for a in range(anno, anno_da, -1) if a - 1 in stati), anno_da)
+    chiave = _chiave_calendario(config, inizio, anno)
+    with _calendari_lock:
+        trovato = _calendari_generati.get(chiave)
+        if trovato is not None:
+            _calendari_generati.move_to_end(chiave)
+    if trovato is not None:
+        calendario, stati_catena = trovato
+        stati.update(stati_catena)
+        _salva_stati_rotazione(config, stati)
+        # Copia: chi riceve il calendario può modificarlo (ottimizzazione, scambi)
+        return calendario.copia()
+
+    parametri = _parametri_calendario(config, anno_da)
+    calendari = CalendarioReperibilita.genera_anni(anno_da, anno, stati, **parametri)
+    _salva_stati_rotazione(config, stati)
+
+    with _calendari_lock:
+        # Ogni anno generato in catena è memorizzato anche con il proprio stato di partenza,
+        # la chiave con cui sarà cercato ora che quello stato è salvato in config
+        for anno_generato, calendario in calendari.items():
+            _memorizza_calendario(
+                _chiave_calendario(config, anno_generato, anno_generato),
+                calendario, {anno_generato: stati[anno_generato]},
+            )
+        _memorizza_calendario(
+            chiave, calendari[anno], {a: stati[a] for a in calendari},
+        )
+    return calendari[anno].copia()
+
+
+def _chiave_calendario(config: dict, inizio: int, anno: int) -> str:
+    """Impronta degli input della generazione da `inizio` ad `anno`.
+
+    Comprende tecnici, aiutanti, date aiutanti, ferie, assegnazioni fisse e stato di rotazione
+    all'inizio di `inizio`: se uno di questi cambia cambia la chiave, quindi la cache non
+    restituisce mai un calendario generato con input diversi.
+    """
+    parametri = _parametri_calendario(config, inizio)
+    parametri["fino_a"] = anno
+    return hashlib.sha256(json.dumps(parametri, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
 
-    calendario = CalendarioReperibilita()
-    calendario.genera_calendario()
-    return calendario
+def _memorizza_calendario(chiave: str, calendario: CalendarioReperibilita, stati: dict):
+    """Inserisce un calendario nella cache LRU (da chiamare con _calendari_lock acquisito)."""
+    _calendari_generati[chiave] = (calendario, stati)
+    _calendari_generati.move_to_end(chiave)
+    while len(_calendari_generati) > MAX_CALENDARI_IN_CACHE:
+        _calendari_generati.popitem(last=False)
+
+
+def _calendario_corrente(config: dict, anno: int, chiave: str = None) -> tuple:
+    """Calendario dell'anno così come lo vede l'utente.
+
+    Se l'anno è in cache con gli input attuali viene ricostruito dalle sue assegnazioni
+    (patch e scambi inclusi) senza rigenerare; altrimenti viene generato. Ritorna (calendario, generato).
+
+    Con `chiave` (impronta della config letta e squadra) il calendario ricostruito resta in
+    _calendari_generati e le richieste successive sulla stessa config ricevono la stessa istanza,
+    con il suo indice di disponibilità già costruito: va usata in sola lettura.
+    """
+    cache = _cache_valida(config, anno)
+    if cache:
+        if chiave is not None:
+            chiave = f"corrente|{chiave}|{anno}"
+            with _calendari_lock:
+                trovato = _calendari_generati.get(chiave)
+                if trovato is not None:
+                    _calendari_generati.move_to_end(chiave)
+                    return trovato[0], False
+        parametri = _parametri_calendario(config, anno)
+        calendario = CalendarioReperibilita.da_assegnazioni(cache["assegnazioni"], **parametri)
+        if chiave is not None:
+            with _calendari_lock:
+                _memorizza_calendario(chiave, calendario, {})
+        return calendario, False
+    return _build_calendario(config, anno), True
 
 
 # ============ ROUTE PRINCIPALI ============
@@ -262,10 +720,22 @@ def get_config():
 
 
 @app.route('/api/config', methods=['POST'])
+@_riprova_se_conflitto
 def update_config():
-    """Aggiorna configurazione"""
-    data = request.json
-    salva_config(data)
+    """Aggiorna configurazione (con "versione" letta da GET /api/config: 409 se nel frattempo è cambiata)"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Il corpo della richiesta deve essere un oggetto JSON"}), 400
+    if "versione" not in data:
+        # Client che non conoscono la versione: sovrascrittura come in passato. La versione
+        # si rilegge a ogni tentativo: un salvataggio concorrente fa ripetere, non risponde 409
+        data = dict(data, versione=leggi_config()["versione"])
+        salva_config(data)
+        return jsonify({"status": "ok"})
+    try:
+        salva_config(data)
+    except ConflittoConfig as e:
+        return jsonify({"error": str(e)}), 409
     return jsonify({"status": "ok"})
 
 
@@ -277,6 +747,7 @@ def get_tecnici():
 
 
 @app.route('/api/tecnici', methods=['POST'])
+@_riprova_se_conflitto
 def add_tecnico():
     """Aggiunge un tecnico"""
     data = request.json
@@ -295,6 +766,7 @@ def add_tecnico():
 
 
 @app.route('/api/tecnici/<nome>', methods=['DELETE'])
+@_riprova_se_conflitto
 def remove_tecnico(nome):
     """Rimuove un tecnico"""
     config = leggi_config()
@@ -323,6 +795,7 @@ def get_aiutanti():
 
 
 @app.route('/api/aiutanti', methods=['POST'])
+@_riprova_se_conflitto
 def add_aiutante():
     """Aggiunge un aiutante"""
     data = request.json
@@ -345,6 +818,7 @@ def add_aiutante():
 
 
 @app.route('/api/aiutanti/<nome>', methods=['DELETE'])
+@_riprova_se_conflitto
 def remove_aiutante(nome):
     """Rimuove un aiutante"""
     config = leggi_config()
@@ -387,6 +861,7 @@ def get_date_aiutanti():
 
 
 @app.route('/api/date-aiutanti', methods=['POST'])
+@_riprova_se_conflitto
 def update_date_aiutanti():
     """Aggiorna la lista delle date (YYYY-MM-DD) in cui serve l'aiutante."""
     data = request.json
@@ -403,6 +878,190 @@ def update_date_aiutanti():
     return jsonify({"status": "ok", "date_aiutanti": config["date_aiutanti"]})
 
 
+@app.route('/api/assegnazioni-fisse', methods=['GET'])
+def get_assegnazioni_fisse():
+    """Assegnazioni fisse della squadra (più quelle di default del motore)."""
+    config = leggi_config()
+    dati_squadra = _config_squadra(config, _squadra_richiesta())
+    if dati_squadra is None:
+        return jsonify({"error": "Squadra non trovata"}), 404
+    return jsonify({
+        "assegnazioni_fisse": dati_squadra.get("assegnazioni_fisse", {}),
+        "default": CalendarioReperibilita.ASSEGNAZIONI_FISSE,
+    })
+
+
+@app.route('/api/assegnazioni-fisse', methods=['POST'])
+@_riprova_se_conflitto
+def add_assegnazione_fissa():
+    """Fissa un turno ({data, tecnico}); un tecnico vuoto annulla il default di quella data."""
+    data = request.json or {}
+    data_str = (data.get("data") or "").strip()
+    nome = (data.get("tecnico") or "").strip()
+    try:
+        giorno = _parse_date_yyyy_mm_dd(data_str)
+    except Exception:
+        return jsonify({"error": "Formato data non valido (usa YYYY-MM-DD)"}), 400
+
+    config = leggi_config()
+    dati_squadra = _config_squadra(config, _squadra_richiesta())
+    if dati_squadra is None:
+        return jsonify({"error": "Squadra non trovata"}), 404
+    if nome and nome not in dati_squadra.get("tecnici", []):
+        return jsonify({"error": "Tecnico non trovato"}), 404
+    # Un giorno di weekend fissa l'intero weekend: le ferie non devono toccare nessuno dei due giorni
+    if giorno.weekday() >= 5:
+        sabato = giorno - timedelta(days=giorno.weekday() - 5)
+        giorni = [sabato.strftime("%Y-%m-%d"), (sabato + timedelta(days=1)).strftime("%Y-%m-%d")]
+    else:
+        giorni = [giorno.strftime("%Y-%m-%d")]
+    for f in config.get("ferie", []):
+        if f.get("tipo") != "tecnico" or f.get("nome") != nome:
+            continue
+        for g in giorni:
+            if f.get("dal", "") <= g <= f.get("al", ""):
+                return jsonify({"error": f"Conflitto ferie: {nome} è in ferie il {g}"}), 409
+
+    fisse = dict(dati_squadra.get("assegnazioni_fisse") or {})
+    fisse[giorno.strftime("%Y-%m-%d")] = nome
+    dati_squadra["assegnazioni_fisse"] = fisse
+    if nome:
+        # Regola dei 7 giorni con le altre assegnazioni fisse del tecnico (non serve generare)
+        calendario = CalendarioReperibilita(**_parametri_calendario(dati_squadra, giorno.year))
+        conflitti = calendario.conflitti_fissi(giorni[0], giorni[-1])
+        if conflitti:
+            return jsonify({"error": f"Conflitto assegnazioni fisse: {conflitti[0]}"}), 409
+    # La cache dell'anno non rispecchia più la generazione: la prossima lettura lo rigenera
+    _rimuovi_cache_anno(dati_squadra, giorno.year)
+    salva_config(config)
+    return jsonify({"status": "ok", "assegnazioni_fisse": fisse})
+
+
+@app.route('/api/assegnazioni-fisse/<data_str>', methods=['DELETE'])
+@_riprova_se_conflitto
+def remove_assegnazione_fissa(data_str: str):
+    """Rimuove un'assegnazione fissa configurata."""
+    config = leggi_config()
+    dati_squadra = _config_squadra(config, _squadra_richiesta())
+    if dati_squadra is None:
+        return jsonify({"error": "Squadra non trovata"}), 404
+    fisse = dict(dati_squadra.get("assegnazioni_fisse") or {})
+    if data_str not in fisse:
+        return jsonify({"error": "Assegnazione fissa non trovata"}), 404
+    del fisse[data_str]
+    dati_squadra["assegnazioni_fisse"] = fisse
+    _rimuovi_cache_anno(dati_squadra, data_str[:4])
+    salva_config(config)
+    return jsonify({"status": "ok", "assegnazioni_fisse": fisse})
+
+
+@app.route('/api/squadre', methods=['GET'])
+def get_squadre():
+    """Elenca le squadre (la principale più quelle aggiuntive) con i loro tecnici."""
+    config = leggi_config()
+    squadre = {SQUADRA_PRINCIPALE: {"tecnici": config["tecnici"], "aiutanti": config["aiutanti"]}}
+    for nome, dati in config["squadre"].items():
+        squadre[nome] = {"tecnici": dati.get("tecnici", []), "aiutanti": dati.get("aiutanti", [])}
+    return jsonify({"squadre": squadre})
+
+
+@app.route('/api/squadre', methods=['POST'])
+@_riprova_se_conflitto
+def salva_squadra():
+    """Crea o sostituisce una squadra aggiuntiva ({nome, tecnici, aiutanti?, date_aiutanti?})."""
+    data = request.json or {}
+    nome = (data.get("nome") or "").strip()
+    tecnici = data.get("tecnici")
+    if not nome:
+        return jsonify({"error": "Nome vuoto"}), 400
+    if nome == SQUADRA_PRINCIPALE:
+        return jsonify({"error": f"Nome riservato: {SQUADRA_PRINCIPALE}"}), 400
+    if not isinstance(tecnici, list) or not tecnici:
+        return jsonify({"error": "Campo obbligatorio: tecnici (lista non vuota)"}), 400
+    for chiave in ("aiutanti", "date_aiutanti"):
+        if chiave in data and not isinstance(data[chiave], list):
+            return jsonify({"error": f"{chiave} non valido"}), 400
+
+    config = leggi_config()
+    precedente = config["squadre"].get(nome) or {}
+    squadra = {
+        "tecnici": [str(t).strip() for t in tecnici if str(t).strip()],
+        "aiutanti": data.get("aiutanti", precedente.get("aiutanti", [])),
+        "date_aiutanti": data.get("date_aiutanti", precedente.get("date_aiutanti", [])),
+        "assegnazioni_fisse": precedente.get("assegnazioni_fisse", {}),
+        # Composizione cambiata: stato rotazione e cache ripartono da zero
+        "calendario_cache": {},
+        "rotazione_after_year": {},
+        "rotazione_festivi_after_year": {},
+    }
+    config["squadre"][nome] = squadra
+    salva_config(config)
+    return jsonify({"status": "ok", "squadra": nome, "tecnici": squadra["tecnici"]})
+
+
+@app.route('/api/squadre/<nome>', methods=['DELETE'])
+@_riprova_se_conflitto
+def remove_squadra(nome):
+    """Rimuove una squadra aggiuntiva."""
+    config = leggi_config()
+    if nome not in config["squadre"]:
+        return jsonify({"error": "Squadra non trovata"}), 404
+    del config["squadre"][nome]
+    salva_config(config)
+    return jsonify({"status": "ok"})
+
+
+@app.route('/api/squadre/calendario', methods=['GET'])
+@_con_etag
+@_riprova_se_conflitto
+def get_calendario_squadre():
+    """Genera in un unico lotto i calendari di tutte le squadre per l'anno richiesto."""
+    try:
+        config = leggi_config()
+        anno = _parse_anno_query(int(config.get("anno", 2026)))
+        anno_da = min(int(config.get("anno", 2026) or 2026), anno)
+
+        viste = {SQUADRA_PRINCIPALE: config}
+        for nome in config["squadre"]:
+            viste[nome] = _config_squadra(config, nome)
+
+        squadre = {}
+        stati = {}
+        stati_prima = {}
+        for nome, vista in viste.items():
+            parametri = _parametri_calendario(vista, anno_da)
+            parametri.pop("ferie")
+            squadre[nome] = parametri
+            stati[nome] = _stati_rotazione(vista)
+            stati_prima[nome] = _stati_rotazione(vista)
+
+        calendari = CalendarioReperibilita.genera_squadre(
+            anno_da, anno, squadre, stati, ferie=config.get("ferie", [])
+        )
+        for nome, vista in viste.items():
+            _salva_stati_rotazione(vista, stati[nome])
+        # Si salva solo se la generazione ha aggiunto o cambiato stati di rotazione
+        if any(_stati_rotazione(vista) != stati_prima[nome] for nome, vista in viste.items()):
+            salva_config(config)
+
+        risultato = {}
+        for nome, per_anno in calendari.items():
+            calendario = per_anno[anno]
+            if _cache_valida(viste[nome], anno):
+                # Patch e scambi della squadra restano visibili
+                calendario, _ = _calendario_corrente(viste[nome], anno)
+            risultato[nome] = {
+                "assegnazioni": calendario.assegnazioni,
+                "statistiche": dict(calendario.contatori_turni),
+                "statistiche_aiutanti": dict(calendario.contatori_aiutanti),
+            }
+        return jsonify({"status": "ok", "anno": anno, "squadre": risultato})
+    except ConflittoConfig:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/api/ferie', methods=['GET'])
 def get_ferie():
     """Ottiene la lista ferie."""
@@ -411,6 +1070,7 @@ def get_ferie():
 
 
 @app.route('/api/ferie', methods=['POST'])
+@_riprova_se_conflitto
 def add_ferie():
     """Aggiunge un periodo di ferie per un tecnico."""
     data = request.json or {}
@@ -435,11 +1095,13 @@ def add_ferie():
         return jsonify({"error": "Intervallo non valido: 'al' prima di 'dal'"}), 400
 
     config = leggi_config()
+    # Le ferie sono comuni: la persona può appartenere a una qualunque squadra
+    squadre = [config] + list(config["squadre"].values())
     if tipo == "tecnico":
-        if nome not in config.get("tecnici", []):
+        if not any(nome in squadra.get("tecnici", []) for squadra in squadre):
             return jsonify({"error": "Tecnico non trovato"}), 404
     else:
-        if nome not in config.get("aiutanti", []):
+        if not any(nome in squadra.get("aiutanti", []) for squadra in squadre):
             return jsonify({"error": "Aiutante non trovato"}), 404
 
     ferie = config.get("ferie", [])
@@ -450,13 +1112,64 @@ def add_ferie():
         "dal": dal,
         "al": al,
     }
+
+    # Verifica di copertura prima di salvare: le ferie che lasciano turni scoperti vengono
+    # rifiutate (salvo "forza": true), quelle che rendono la copertura fragile segnalate
+    avvisi = []
+    if tipo == "tecnico":
+        impossibili, avvisi = _verifica_ferie(config, ferie + [entry], nome, dal_dt, al_dt)
+        # Un'assegnazione fissa nelle ferie renderebbe ogni generazione impossibile: mai forzabile
+        fissi = [voce for voce in impossibili if voce["tipo"] == "fisso"]
+        if fissi:
+            return jsonify({
+                "error": "Le ferie coprono un turno fisso del tecnico: rimuovere prima l'assegnazione fissa",
+                "impossibili": fissi,
+            }), 409
+        if impossibili and not data.get("forza"):
+            return jsonify({
+                "error": "Con queste ferie alcuni turni resterebbero scoperti",
+                "impossibili": impossibili,
+                "fragili": avvisi,
+            }), 409
+        avvisi = impossibili + avvisi
+
     ferie.append(entry)
     config["ferie"] = ferie
     salva_config(config)
-    return jsonify({"status": "ok", "ferie": ferie})
+    return jsonify({"status": "ok", "ferie": ferie, "avvisi": avvisi})
+
+
+def _verifica_ferie(config: dict, ferie: list, nome: str, dal_dt: datetime, al_dt: datetime) -> tuple:
+    """Verifica di fattibilità, con le ferie indicate, delle squadre di cui fa parte il tecnico.
+
+    Il report copre il periodo allargato di un blocco per lato, dove le ferie possono
+    ancora togliere copertura. Il calendario di verifica è un orizzonte (inizio/fine) largo
+    un altro blocco per lato, così i turni vicini contano anche a cavallo di fine anno.
+    Ritorna (impossibili, fragili) con la squadra in ogni voce.
+    """
+    margine = timedelta(days=CalendarioReperibilita.GIORNI_BLOCCO + 1)
+    dal = (dal_dt - margine).strftime("%Y-%m-%d")
+    al = (al_dt + margine).strftime("%Y-%m-%d")
+    inizio = (dal_dt - 2 * margine).strftime("%Y-%m-%d")
+    fine = (al_dt + 2 * margine).strftime("%Y-%m-%d")
+    impossibili, fragili = [], []
+    for nome_squadra in [SQUADRA_PRINCIPALE] + list(config["squadre"]):
+        vista = _config_squadra(config, nome_squadra)
+        tecnici = vista.get("tecnici", [])
+        if nome not in tecnici:
+            continue
+        calendario = CalendarioReperibilita(
+            inizio=inizio, fine=fine, tecnici=tecnici, ferie=ferie,
+            assegnazioni_fisse=vista.get("assegnazioni_fisse", {})
+        )
+        esito = verifica_fattibilita(calendario, dal, al)
+        impossibili.extend({"squadra": nome_squadra, **voce} for voce in esito["impossibili"])
+        fragili.extend({"squadra": nome_squadra, **voce} for voce in esito["fragili"])
+    return impossibili, fragili
 
 
 @app.route('/api/ferie/<ferie_id>', methods=['DELETE'])
+@_riprova_se_conflitto
 def delete_ferie(ferie_id: str):
     """Rimuove una ferie per id."""
     config = leggi_config()
@@ -470,10 +1183,24 @@ def delete_ferie(ferie_id: str):
 
 
 @app.route('/api/calendario', methods=['GET'])
+@_con_etag
+@_riprova_se_conflitto
 def get_calendario():
-    """Genera calendario"""
+    """Calendario (della squadra indicata con ?squadra=, default la principale)"""
+    return _risposta_calendario()
+
+
+def _risposta_calendario(rigenera: bool = False):
+    """Calendario dell'anno richiesto: dalla cache se gli input non sono cambiati, altrimenti generato.
+
+    La cache conserva patch e scambi; con `rigenera` l'anno viene comunque rigenerato da zero.
+    """
     try:
-        config = leggi_config()
+        config, impronta_config = _leggi_config_e_impronta()
+        squadra = _squadra_richiesta()
+        dati_squadra = _config_squadra(config, squadra)
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
 
 
         # Configura giorni aiutanti
@@ -489,55 +1216,31 @@ def get_calendario():
 
         anno = _parse_anno_query(int(config.get("anno", 2026)))
 
-        calendario = _build_calendario(config, anno)
+        cache = {} if rigenera else _cache_valida(dati_squadra, anno)
+        if cache:
+            # Nessuna rigenerazione e nessun salvataggio: patch e scambi restano visibili
+            calendario, _ = _calendario_corrente(dati_squadra, anno, f"{impronta_config}|{squadra}")
+            return jsonify({
+                "status": "ok",
+                "assegnazioni": cache["assegnazioni"],
+                "statistiche": dict(calendario.contatori_turni),
+                "statistiche_aiutanti": dict(calendario.contatori_aiutanti),
+                "anno": anno
+            })
+
+        stati_prima = _stati_rotazione(dati_squadra)
+        calendario = _build_calendario(dati_squadra, anno)
 
         assegnazioni = calendario.assegnazioni
 
-        # Calcola lo stato rotazione per l'anno successivo
-        next_tecnico_index = 0
-        if calendario.TECNICI:
-            next_tecnico_index = int(calendario.indice_rotazione % len(calendario.TECNICI))
-
-        next_aiutante_offset = int(getattr(calendario, 'aiutanti_offset', 0) or 0)
-        if calendario.AIUTANTI:
-            # Trova l'ultimo aiutante assegnato nell'anno e imposta il successivo come start per l'anno seguente
-            last_date = None
-            last_name = None
-            for d in sorted(calendario.aiutante_per_data.keys()):
-                name = calendario.aiutante_per_data.get(d) or ""
-                if not name:
-                    continue
-                if str(d).startswith(str(anno) + "-"):
-                    last_date = d
-                    last_name = name
-            if last_name in calendario.AIUTANTI:
-                i = calendario.AIUTANTI.index(last_name)
-                next_name = calendario.AIUTANTI[(i + 1) % len(calendario.AIUTANTI)]
-                next_aiutante_offset = calendario.AIUTANTI.index(next_name)
-
-        rot_state = config.get("rotazione_after_year") or {}
-        if not isinstance(rot_state, dict):
-            rot_state = {}
-        rot_state[str(anno)] = {
-            "next_tecnico_index": int(next_tecnico_index),
-            "next_aiutante_offset": int(next_aiutante_offset)
-        }
-        config["rotazione_after_year"] = rot_state
-
-        # Salva anche lo stato rotazione per-festività
-        fest_state = config.get("rotazione_festivi_after_year") or {}
-        if not isinstance(fest_state, dict):
-            fest_state = {}
-        fest_state[str(anno)] = dict(getattr(calendario, "festivi_rotation_next", {}) or {})
-        config["rotazione_festivi_after_year"] = fest_state
-
-        # Salva cache per poter fare aggiornamenti parziali (es. ferie inserite dopo)
-        config["calendario_cache"] = {
-            "anno": calendario.anno,
-            "assegnazioni": assegnazioni,
-            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        salva_config(config)
+        # Lo stato rotazione per l'anno successivo (e per gli eventuali anni intermedi
+        # generati in catena) è già stato riportato in config da _build_calendario.
+
+        # Salva cache per poter fare aggiornamenti parziali (es. ferie inserite dopo):
+        # il file si riscrive solo se cache o stati di rotazione sono cambiati
+        cache_cambiata = _aggiorna_cache_calendario(dati_squadra, calendario)
+        if cache_cambiata or _stati_rotazione(dati_squadra) != stati_prima:
+            salva_config(config)
         
         return jsonify({
             "status": "ok",
@@ -546,6 +1249,211 @@ def get_calendario():
             "statistiche_aiutanti": dict(calendario.contatori_aiutanti),
             "anno": calendario.anno
         })
+    except ConflittoConfig:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _aggiorna_cache_calendario(config: dict, calendario: CalendarioReperibilita) -> bool:
+    """Porta la voce dell'anno in calendario_cache al calendario generato; False se coincideva già."""
+    cache = _cache_anno(config, calendario.anno)
+    assegnazioni = calendario.assegnazioni
+    # Checkpoint settimanali della rotazione: la rigenerazione parziale riparte da qui
+    checkpoint = calendario.checkpoint_rotazione()
+    impronta = _chiave_calendario(config, calendario.anno, calendario.anno)
+    if (cache.get("assegnazioni") == assegnazioni and cache.get("checkpoint") == checkpoint
+            and cache.get("impronta") == impronta):
+        return False
+    _imposta_cache_anno(config, calendario.anno, {
+        "anno": calendario.anno,
+        "assegnazioni": assegnazioni,
+        "checkpoint": checkpoint,
+        "impronta": impronta,
+        "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    })
+    return True
+
+
+# Ampiezza massima dell'orizzonte per /api/calendario/orizzonte (in mesi)
+MAX_MESI_ORIZZONTE = 24
+
+
+def _giorno_nel_mese(anno: int, mese: int, giorno: int) -> datetime:
+    """Stesso giorno del mese indicato, limitato all'ultimo giorno del mese (es. 31 -> 30)."""
+    while True:
+        try:
+            return datetime(anno, mese, giorno)
+        except ValueError:
+            giorno -= 1
+
+
+@app.route('/api/calendario/orizzonte', methods=['GET'])
+@_con_etag
+@_riprova_se_conflitto
+def get_calendario_orizzonte():
+    """Calendario su un orizzonte mobile (?dal=, default oggi; ?mesi=, default 12), non salvato.
+
+    La rotazione è continua anche a cavallo d'anno: parte dallo stato di inizio anno di `dal`
+    (rotazione_after_year dell'anno precedente) e non viene spezzata al 31 dicembre,
+    quindi oltre il primo anno le assegnazioni possono differire dalla vista per anno.
+    """
+    try:
+        try:
+            dal_dt = _parse_date_yyyy_mm_dd(request.args.get("dal") or datetime.now().strftime("%Y-%m-%d"))
+            mesi = int(request.args.get("mesi") or 12)
+        except Exception:
+            return jsonify({"error": "Parametri non validi (dal=YYYY-MM-DD, mesi intero)"}), 400
+        if not 1 <= mesi <= MAX_MESI_ORIZZONTE:
+            return jsonify({"error": f"mesi deve essere tra 1 e {MAX_MESI_ORIZZONTE}"}), 400
+        mese_fine = dal_dt.month - 1 + mesi
+        al_dt = _giorno_nel_mese(dal_dt.year + mese_fine // 12, mese_fine % 12 + 1, dal_dt.day) - timedelta(days=1)
+
+        config = leggi_config()
+        dati_squadra = _config_squadra(config, _squadra_richiesta())
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
+
+        anno = dal_dt.year
+        anno_base = int(config.get("anno", 2026) or 2026)
+        rot_state = dati_squadra.get("rotazione_after_year") or {}
+        if anno > anno_base and str(anno - 1) not in rot_state:
+            # Stato di partenza non ancora noto: genera in catena gli anni precedenti
+            _build_calendario(dati_squadra, anno - 1)
+            salva_config(config)
+
+        parametri = _parametri_calendario(dati_squadra, anno)
+        parametri.pop("anno")
+        calendario = CalendarioReperibilita(
+            inizio=f"{anno}-01-01", fine=al_dt.strftime("%Y-%m-%d"), **parametri
+        )
+        calendario.genera_calendario()
+
+        dal = dal_dt.strftime("%Y-%m-%d")
+        al = al_dt.strftime("%Y-%m-%d")
+        assegnazioni = calendario.get_range(dal, al)
+        stats_tecnici, stats_aiutanti = _calcola_statistiche_da_assegnazioni(assegnazioni)
+        return jsonify({
+            "status": "ok",
+            "dal": dal,
+            "al": al,
+            "assegnazioni": assegnazioni,
+            "statistiche": stats_tecnici,
+            "statistiche_aiutanti": stats_aiutanti,
+            "stato_finale": calendario.stato_rotazione_finale(),
+        })
+    except ConflittoConfig:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/calendario/disponibili', methods=['GET'])
+@_con_etag
+@_riprova_se_conflitto
+def get_disponibili():
+    """Tecnici e aiutanti che potrebbero coprire il turno di una data (?data=), dal meno carico."""
+    try:
+        data_str = (request.args.get("data") or "").strip()
+        try:
+            anno = _parse_date_yyyy_mm_dd(data_str).year
+        except Exception:
+            return jsonify({"error": "Formato data non valido (usa YYYY-MM-DD)"}), 400
+
+        config, impronta = _leggi_config_e_impronta()
+        squadra = _squadra_richiesta()
+        dati_squadra = _config_squadra(config, squadra)
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
+
+        # Finché la config non cambia si riusa lo stesso calendario (e il suo indice di disponibilità)
+        calendario, generato = _calendario_corrente(dati_squadra, anno, f"{impronta}|{squadra}")
+        if generato:
+            salva_config(config)
+        disponibili = calendario.disponibili(data_str)
+        contatori_turni = calendario.contatori_turni
+        contatori_aiutanti = calendario.contatori_aiutanti
+        tecnico, tipo = calendario.get_reperibile_data(data_str)
+        return jsonify({
+            "status": "ok",
+            "data": data_str,
+            "reperibile": {"tecnico": tecnico, "tipo": tipo, "aiutante": calendario.get_aiutante_data(data_str)},
+            "tecnici": [{"nome": nome, "turni": contatori_turni.get(nome, 0)} for nome in disponibili["tecnici"]],
+            "aiutanti": [{"nome": nome, "turni": contatori_aiutanti.get(nome, 0)} for nome in disponibili["aiutanti"]],
+        })
+    except ConflittoConfig:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Ampiezza massima di un intervallo per /api/calendario/range (in giorni)
+MAX_GIORNI_RANGE = 366
+
+
+@app.route('/api/calendario/range', methods=['GET'])
+@_con_etag
+@_riprova_se_conflitto
+def get_calendario_range():
+    """Assegnazioni in un intervallo qualsiasi (?dal=&al=, anche a cavallo d'anno).
+
+    Gli anni già in cache (calendario_cache, con eventuali patch) vengono letti senza rigenerare;
+    gli altri vengono generati come in /api/calendario.
+    """
+    try:
+        dal = (request.args.get("dal") or "").strip()
+        al = (request.args.get("al") or "").strip()
+        if not dal or not al:
+            return jsonify({"error": "Campi obbligatori: dal, al"}), 400
+        try:
+            dal_dt = _parse_date_yyyy_mm_dd(dal)
+            al_dt = _parse_date_yyyy_mm_dd(al)
+        except Exception:
+            return jsonify({"error": "Formato data non valido (usa YYYY-MM-DD)"}), 400
+        if al_dt < dal_dt:
+            return jsonify({"error": "Intervallo non valido: 'al' prima di 'dal'"}), 400
+        if (al_dt - dal_dt).days + 1 > MAX_GIORNI_RANGE:
+            return jsonify({"error": f"Intervallo troppo ampio (max {MAX_GIORNI_RANGE} giorni)"}), 400
+
+        config = leggi_config()
+        dati_squadra = _config_squadra(config, _squadra_richiesta())
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
+
+        assegnazioni = {}
+        generato = False
+        for anno in range(dal_dt.year, al_dt.year + 1):
+            dal_anno = max(dal, f"{anno}-01-01")
+            al_anno = min(al, f"{anno}-12-31")
+            cache = _cache_valida(dati_squadra, anno)
+            if cache:
+                base = cache["assegnazioni"]
+                giorno = _parse_date_yyyy_mm_dd(dal_anno)
+                fine = _parse_date_yyyy_mm_dd(al_anno)
+                while giorno <= fine:
+                    data_str = giorno.strftime("%Y-%m-%d")
+                    if data_str in base:
+                        assegnazioni[data_str] = base[data_str]
+                    giorno += timedelta(days=1)
+            else:
+                calendario = _build_calendario(dati_squadra, anno)
+                assegnazioni.update(calendario.get_range(dal_anno, al_anno))
+                generato = True
+        if generato:
+            # Gli stati di rotazione degli anni generati restano disponibili per le richieste successive
+            salva_config(config)
+
+        stats_tecnici, stats_aiutanti = _calcola_statistiche_da_assegnazioni(assegnazioni)
+        return jsonify({
+            "status": "ok",
+            "dal": dal,
+            "al": al,
+            "assegnazioni": assegnazioni,
+            "statistiche": stats_tecnici,
+            "statistiche_aiutanti": stats_aiutanti,
+        })
+    except ConflittoConfig:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -555,8 +1463,12 @@ def export_pdf():
     """Esporta il calendario in PDF."""
     try:
         config = leggi_config()
+        dati_squadra = _config_squadra(config, _squadra_richiesta())
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
         anno = _parse_anno_query(int(config.get("anno", 2026)))
-        calendario = _build_calendario(config, anno)
+        # Come lo vede l'utente: con patch e scambi dell'anno in cache
+        calendario, _ = _calendario_corrente(dati_squadra, anno)
 
         # Genera su file temporaneo
         tmp_dir = DATA_DIR / "exports"
@@ -586,8 +1498,12 @@ def export_excel():
     """Esporta il calendario in Excel (XLSX) modificabile."""
     try:
         config = leggi_config()
+        dati_squadra = _config_squadra(config, _squadra_richiesta())
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
         anno = _parse_anno_query(int(config.get("anno", 2026)))
-        calendario = _build_calendario(config, anno)
+        # Come lo vede l'utente: con patch e scambi dell'anno in cache
+        calendario, _ = _calendario_corrente(dati_squadra, anno)
 
         buf = io.BytesIO()
         gen = GeneratoreExcel(calendario)
@@ -633,15 +1549,21 @@ def export_config():
 
 
 @app.route('/api/calendario/rigenerare', methods=['POST'])
+@_riprova_se_conflitto
 def rigenera_calendario():
-    """Rigenera il calendario usando la configurazione corrente."""
-    # La rigenerazione è equivalente a un GET su /api/calendario (tutto è deterministico)
-    return get_calendario()
+    """Rigenera il calendario usando la configurazione corrente (patch e scambi dell'anno si perdono)."""
+    return _risposta_calendario(rigenera=True)
 
 
 @app.route('/api/calendario/rigenerare-parziale', methods=['POST'])
+@_riprova_se_conflitto
 def rigenera_calendario_parziale():
-    """Rigenera solo un intervallo (tipicamente ferie) mantenendo il resto invariato."""
+    """Rigenera solo un intervallo (tipicamente ferie) mantenendo il resto invariato.
+
+    Un intervallo a cavallo di fine anno viene diviso per anno e ogni parte aggiorna la voce
+    del proprio anno in calendario_cache. La risposta contiene il calendario dell'anno
+    indicato con "anno" (default: l'anno di "dal").
+    """
     try:
         data = request.json or {}
         dal = (data.get("dal") or "").strip()
@@ -650,53 +1572,210 @@ def rigenera_calendario_parziale():
             return jsonify({"error": "Campi obbligatori: dal, al"}), 400
 
         # Validazione formato
-        _parse_date_yyyy_mm_dd(dal)
-        _parse_date_yyyy_mm_dd(al)
+        dal_dt = _parse_date_yyyy_mm_dd(dal)
+        al_dt = _parse_date_yyyy_mm_dd(al)
+        if al_dt < dal_dt:
+            return jsonify({"error": "Intervallo non valido: al precede dal"}), 400
+        try:
+            anno_risposta = int(data.get("anno") or dal_dt.year)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Anno non valido"}), 400
 
         config = leggi_config()
-        cache = config.get("calendario_cache") or {}
-        assegnazioni_base = cache.get("assegnazioni")
-        if not isinstance(assegnazioni_base, dict):
-            # Se non c'è una base, fallback a rigenerazione completa
-            return get_calendario()
+        dati_squadra = _config_squadra(config, _squadra_richiesta())
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
+
+        patch = {}
+        for anno in range(dal_dt.year, al_dt.year + 1):
+            # Parte dell'intervallo che cade nell'anno
+            inizio = max(dal, f"{anno}-01-01")
+            fine = min(al, f"{anno}-12-31")
+            cache = _cache_anno(dati_squadra, anno)
+            if cache:
+                assegnazioni_base = cache["assegnazioni"]
+                # La compatibilità del checkpoint con la config la verifica il motore.
+                # patch_assegnazioni aggiorna le sue "settimane" sul posto: è la copia di questa richiesta (_copia_config)
+                checkpoint = cache.get("checkpoint")
+            else:
+                # Anno non ancora in cache: la base è la sua generazione completa
+                calendario = _build_calendario(dati_squadra, anno)
+                assegnazioni_base = calendario.assegnazioni
+                checkpoint = calendario.checkpoint_rotazione()
+
+            parametri = _parametri_calendario(dati_squadra, anno)
+            parametri.pop("anno")
+            merged = CalendarioReperibilita.patch_assegnazioni(
+                assegnazioni_base, inizio, fine, checkpoint=checkpoint, **parametri
+            )
+            patch[anno] = merged
+            _imposta_cache_anno(dati_squadra, anno, {
+                "anno": anno,
+                "assegnazioni": merged,
+                "checkpoint": checkpoint,
+                # Il risultato della patch vale come calendario per gli input attuali (ferie incluse)
+                "impronta": _chiave_calendario(dati_squadra, anno, anno),
+                "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "last_patch": {"dal": inizio, "al": fine}
+            })
+        salva_config(config)
+
+        if anno_risposta in patch:
+            assegnazioni = patch[anno_risposta]
+        else:
+            # Anno visualizzato non toccato dall'intervallo: il suo calendario attuale
+            assegnazioni = _calendario_corrente(dati_squadra, anno_risposta)[0].assegnazioni
+        stats_tecnici, stats_aiutanti = _calcola_statistiche_da_assegnazioni(assegnazioni)
 
-        # Determina anno dall'intervallo (YYYY-MM-DD)
+        return jsonify({
+            "status": "ok",
+            "assegnazioni": assegnazioni,
+            "statistiche": stats_tecnici,
+            "statistiche_aiutanti": stats_aiutanti,
+            "anno": anno_risposta
+        })
+    except ConflittoConfig:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/calendario/scambio', methods=['POST'])
+@_riprova_se_conflitto
+def scambia_turno():
+    """Cambio turno: {"data", "tecnico"} cede il turno, {"data", "data_scambio"} scambia due turni.
+
+    Le regole vengono verificate solo attorno ai turni toccati e la cache viene aggiornata
+    nelle sole date modificate, senza rigenerare il calendario.
+    """
+    try:
+        data = request.json or {}
+        data_str = (data.get("data") or "").strip()
+        tecnico = (data.get("tecnico") or "").strip() or None
+        data_scambio = (data.get("data_scambio") or "").strip() or None
+        if not data_str or (tecnico is None) == (data_scambio is None):
+            return jsonify({"error": "Campi obbligatori: data e uno tra tecnico, data_scambio"}), 400
         try:
-            anno = int(dal[:4])
-        except Exception:
-            anno = int(config.get("anno", 2026))
+            anno = _parse_date_yyyy_mm_dd(data_str).year
+            if data_scambio is not None and _parse_date_yyyy_mm_dd(data_scambio).year != anno:
+                return jsonify({"error": "Le due date devono essere nello stesso anno"}), 400
+        except ValueError:
+            return jsonify({"error": "Formato data non valido (usa YYYY-MM-DD)"}), 400
 
-        # Configura class variables
-        CalendarioReperibilita.ANNO = anno
-        CalendarioReperibilita.TECNICI = config.get("tecnici", CalendarioReperibilita.TECNICI)
-        CalendarioReperibilita.AIUTANTI = config.get("aiutanti", [])
-        CalendarioReperibilita.DATE_AIUTANTI = config.get("date_aiutanti", [])
-        CalendarioReperibilita.FERIE = config.get("ferie", [])
-        CalendarioReperibilita.GIORNI_AIUTANTI = []
+        config = leggi_config()
+        dati_squadra = _config_squadra(config, _squadra_richiesta())
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
 
-        merged = CalendarioReperibilita.patch_assegnazioni(assegnazioni_base, dal, al)
-        stats_tecnici, stats_aiutanti = _calcola_statistiche_da_assegnazioni(merged)
+        calendario, generato = _calendario_corrente(dati_squadra, anno)
+        try:
+            modificate = calendario.scambia(data_str, tecnico=tecnico, data_scambio=data_scambio)
+        except ValueError as e:
+            if generato:
+                salva_config(config)
+            return jsonify({"error": str(e)}), 409
 
-        config["calendario_cache"] = {
-            "anno": anno,
-            "assegnazioni": merged,
-            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "last_patch": {"dal": dal, "al": al}
+        assegnazioni = calendario.assegnazioni
+        if generato:
+            cache = {
+                "anno": anno,
+                "assegnazioni": assegnazioni,
+                "checkpoint": calendario.checkpoint_rotazione(),
+                "impronta": _chiave_calendario(dati_squadra, anno, anno),
+            }
+        else:
+            # Le assegnazioni in cache sono condivise con leggi_config: si sostituiscono, non si modificano
+            cache = dict(_cache_anno(dati_squadra, anno))
+            cache_assegnazioni = dict(cache["assegnazioni"])
+            for giorno in modificate:
+                cache_assegnazioni[giorno] = assegnazioni[giorno]
+            cache["assegnazioni"] = cache_assegnazioni
+        cache["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cache["last_scambio"] = {
+            "data": data_str, "tecnico": tecnico, "data_scambio": data_scambio,
         }
+        _imposta_cache_anno(dati_squadra, anno, cache)
         salva_config(config)
 
         return jsonify({
             "status": "ok",
-            "assegnazioni": merged,
-            "statistiche": stats_tecnici,
-            "statistiche_aiutanti": stats_aiutanti,
-            "anno": anno
+            "anno": anno,
+            "modificate": {giorno: assegnazioni[giorno] for giorno in modificate},
+            "statistiche": dict(calendario.contatori_turni),
+            "statistiche_aiutanti": dict(calendario.contatori_aiutanti),
         })
+    except ConflittoConfig:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/calendario/scenari', methods=['POST'])
+def confronta_scenari_calendario():
+    """Confronta scenari alternativi (es. piani ferie) con il calendario corrente, senza salvarli."""
+    try:
+        data = request.json or {}
+        scenari = data.get("scenari")
+        if not isinstance(scenari, list) or not scenari:
+            return jsonify({"error": "Campo obbligatorio: scenari (lista non vuota)"}), 400
+        for scenario in scenari:
+            if not isinstance(scenario, dict):
+                return jsonify({"error": "Ogni scenario deve essere un oggetto"}), 400
+            for chiave in PARAMETRI_SCENARIO + ("ferie_aggiuntive",):
+                if chiave in scenario and not isinstance(scenario[chiave], list):
+                    return jsonify({"error": f"{chiave} non valido nello scenario"}), 400
+
+        config = leggi_config()
+        dati_squadra = _config_squadra(config, _squadra_richiesta())
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
+        try:
+            anno = int(data.get("anno") or config.get("anno", 2026))
+        except Exception:
+            return jsonify({"error": "Anno non valido"}), 400
+
+        base = _build_calendario(dati_squadra, anno)
+        risultato = confronta_scenari(_parametri_calendario(dati_squadra, anno), scenari, base=base)
+        return jsonify({"status": "ok", **risultato})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
+# Limite al budget dell'ottimizzatore per non bloccare il worker troppo a lungo
+BUDGET_MS_MAX = 5000
+
+
+@app.route('/api/calendario/ottimizza', methods=['POST'])
+def ottimizza_calendario():
+    """Calcola una versione più equa del calendario (ricerca locale a tempo), senza salvarla."""
+    try:
+        data = request.json or {}
+        config = leggi_config()
+        dati_squadra = _config_squadra(config, _squadra_richiesta())
+        if dati_squadra is None:
+            return jsonify({"error": "Squadra non trovata"}), 404
+        try:
+            anno = int(data.get("anno") or config.get("anno", 2026))
+            budget_ms = int(data.get("budget_ms") or BUDGET_MS_DEFAULT)
+        except Exception:
+            return jsonify({"error": "Anno o budget_ms non validi"}), 400
+        if budget_ms <= 0:
+            return jsonify({"error": "budget_ms deve essere positivo"}), 400
+        budget_ms = min(budget_ms, BUDGET_MS_MAX)
+
+        calendario = _build_calendario(dati_squadra, anno)
+        report = ottimizza_equita(calendario, budget_ms=budget_ms)
+
+        return jsonify({
+            "status": "ok",
+            "assegnazioni": calendario.assegnazioni,
+            "statistiche": dict(calendario.contatori_turni),
+            "statistiche_aiutanti": dict(calendario.contatori_aiutanti),
+            "ottimizzazione": report,
+            "anno": anno
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 
 if __name__ == '__main__':
@@ -166,7 +166,7 @@ function renderFerie(ferie) {
 
 async function rigeneraCalendarioParziale(dal, al) {
     if (!dal || !al) return;
-    const result = await apiCall('/calendario/rigenerare-parziale', 'POST', { dal, al });
+    const result = await apiCall('/calendario/rigenerare-parziale', 'POST', { dal, al, anno: getSelectedYear() });
     if (result) {
         currentCalendario = result;
         renderCalendar();
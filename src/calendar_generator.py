@@ -3,19 +3,243 @@ Modulo principale per la generazione del calendario di reperibilità.
 Implementa la logica di rotazione equa con vincoli di blocco temporale.
 """
 
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Set, Tuple
+from functools import lru_cache
+from typing import FrozenSet, Iterator, List, Dict, NamedTuple, Optional, Tuple
 import calendar as cal
+import copy
+
+
+# Tipi di turno memorizzati come codici a un byte nelle colonne per giorno (0 = nessun turno)
+TIPI_TURNO = ("", "feriale", "weekend", "festivo")
+_CODICE_TIPO = {tipo: i for i, tipo in enumerate(TIPI_TURNO)}
+
+
+@lru_cache(maxsize=32)
+def _tabella_giorni(primo: int, ultimo: int) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+    """
+    Stringhe YYYY-MM-DD per gli ordinali da primo ad ultimo, più la mappa inversa.
+    Condivisa tra le istanze (sola lettura): si formatta una volta per orizzonte.
+    """
+    giorni = tuple(date.fromordinal(o).isoformat() for o in range(primo, ultimo + 1))
+    return giorni, {s: primo + i for i, s in enumerate(giorni)}
+
+
+class TabellaFestivi(NamedTuple):
+    """Festività di un anno, in ordine di data (immutabile, condivisa nel processo)."""
+
+    date: Tuple[str, ...]                    # YYYY-MM-DD
+    dettaglio: Tuple[Tuple[str, str], ...]   # (data, key) con key stabile tra anni
+    ordinali: Tuple[Tuple[int, str], ...]    # (ordinale, key)
+    insieme: FrozenSet[int]                  # ordinali, per i test di appartenenza
+
+
+# Festività nazionali a data fissa: ((mese, giorno), key)
+_FESTIVI_FISSI: Tuple[Tuple[Tuple[int, int], str], ...] = (
+    ((1, 1), "01-01"),    # Capodanno
+    ((1, 6), "01-06"),    # Epifania
+    ((4, 25), "04-25"),   # Liberazione
+    ((5, 1), "05-01"),    # Lavoro
+    ((6, 2), "06-02"),    # Repubblica
+    ((8, 15), "08-15"),   # Ferragosto
+    ((11, 1), "11-01"),   # Ognissanti
+    ((12, 8), "12-08"),   # Immacolata
+    ((12, 25), "12-25"),  # Natale
+    ((12, 26), "12-26"),  # Santo Stefano
+)
+
+
+@lru_cache(maxsize=64)
+def tabella_festivi(anno: int) -> TabellaFestivi:
+    """
+    Tabella delle festività nazionali italiane per l'anno (Pasqua inclusa).
+    Calcolata una volta per anno e condivisa: generazione, patch ed export la riusano.
+    """
+    easter = CalendarioReperibilita._pasqua_gregoriana(anno)
+    voci = [(date(anno, m, d), key) for (m, d), key in _FESTIVI_FISSI]
+    voci.append((easter, "EASTER"))
+    voci.append((easter + timedelta(days=1), "EASTER_MON"))
+    voci.sort(key=lambda x: x[0])
+    dettaglio = tuple((giorno.isoformat(), key) for giorno, key in voci)
+    ordinali = tuple((giorno.toordinal(), key) for giorno, key in voci)
+    return TabellaFestivi(
+        date=tuple(data_str for data_str, _ in dettaglio),
+        dettaglio=dettaglio,
+        ordinali=ordinali,
+        insieme=frozenset(o for o, _ in ordinali),
+    )
+
+
+class MascheraGiorni:
+    """
+    Insieme compatto di giorni (ordinali) memorizzato come bitmask intera.
+    Il bit i rappresenta il giorno base + i; i giorni prima di base vengono ignorati.
+    """
+
+    __slots__ = ("base", "bits")
+
+    def __init__(self, base: int = 0):
+        self.base = base
+        self.bits = 0
+
+    def aggiungi_intervallo(self, dal: int, al: int):
+        """Aggiunge i giorni da dal ad al (inclusi) con una sola operazione sui bit."""
+        inizio = max(dal - self.base, 0)
+        fine = al - self.base + 1
+        if fine > inizio:
+            self.bits |= ((1 << (fine - inizio)) - 1) << inizio
+
+    def __contains__(self, o: int) -> bool:
+        i = o - self.base
+        return i >= 0 and (self.bits >> i) & 1 == 1
+
+    def __iter__(self) -> Iterator[int]:
+        bits = self.bits
+        i = 0
+        while bits:
+            if bits & 1:
+                yield self.base + i
+            bits >>= 1
+            i += 1
+
+    def __len__(self) -> int:
+        return bin(self.bits).count("1")
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+
+class IndiceFerie:
+    """
+    Indice a intervalli delle ferie: per ogni persona una lista ordinata di
+    intervalli (dal, al) di ordinali, fusi se sovrapposti o adiacenti.
+    Risponde senza espandere i periodi giorno per giorno.
+    """
+
+    def __init__(self):
+        self._intervalli: Dict[str, List[Tuple[int, int]]] = {}
+        self._inizi: Dict[str, List[int]] = {}
+
+    def aggiungi(self, nome: str, dal: int, al: int):
+        """Aggiunge un periodo (estremi inclusi), fondendolo con quelli esistenti."""
+        if al < dal:
+            return
+        intervalli = self._intervalli.get(nome, [])
+        fusi: List[Tuple[int, int]] = []
+        for a, b in intervalli:
+            if b + 1 < dal or a > al + 1:
+                fusi.append((a, b))
+            else:
+                dal, al = min(a, dal), max(b, al)
+        fusi.append((dal, al))
+        fusi.sort()
+        self._intervalli[nome] = fusi
+        self._inizi[nome] = [a for a, _ in fusi]
+
+    def intervalli(self, nome: str) -> List[Tuple[int, int]]:
+        """Ritorna gli intervalli (dal, al) di una persona."""
+        return list(self._intervalli.get(nome, []))
+
+    def in_ferie(self, nome: str, o: int) -> bool:
+        """Indica se la persona è in ferie nel giorno o (ricerca binaria)."""
+        inizi = self._inizi.get(nome)
+        if not inizi:
+            return False
+        i = bisect_right(inizi, o) - 1
+        return i >= 0 and self._intervalli[nome][i][1] >= o
+
+    def in_ferie_tra(self, dal: int, al: int) -> List[str]:
+        """Ritorna le persone con almeno un giorno di ferie nell'intervallo [dal, al]."""
+        out = []
+        for nome, inizi in self._inizi.items():
+            i = bisect_right(inizi, al) - 1
+            if i >= 0 and self._intervalli[nome][i][1] >= dal:
+                out.append(nome)
+        return out
+
+    def __iter__(self) -> Iterator[Tuple[str, int, int]]:
+        for nome, intervalli in self._intervalli.items():
+            for a, b in intervalli:
+                yield nome, a, b
+
+
+class GiorniReperibili(Mapping):
+    """Vista in sola lettura {data: tipo} dei turni di un tecnico, letta dalle colonne del calendario."""
+
+    __slots__ = ("_calendario", "_pos")
+
+    def __init__(self, calendario: "CalendarioReperibilita", pos: int):
+        self._calendario = calendario
+        self._pos = pos
+
+    def __getitem__(self, data_str: str) -> str:
+        cal_ = self._calendario
+        o = cal_._ord_per_str.get(data_str)
+        if o is not None:
+            i = o - cal_._ord_base
+            if cal_._col_tecnico[i] == self._pos:
+                return TIPI_TURNO[cal_._col_tipo[i]]
+        raise KeyError(data_str)
+
+    def __iter__(self) -> Iterator[str]:
+        cal_ = self._calendario
+        pos = self._pos
+        for i, p in enumerate(cal_._col_tecnico):
+            if p == pos:
+                yield cal_._giorni_str[i]
+
+    def __len__(self) -> int:
+        return self._calendario._col_tecnico.count(self._pos)
 
 
 class TecnicoReperibilita:
-    """Rappresenta un tecnico e il suo stato di reperibilità."""
-    
-    def __init__(self, nome: str):
+    """
+    Rappresenta un tecnico e il suo stato di reperibilità.
+    I turni non sono copiati nel record: giorni_reperibili e turni_importanti
+    si leggono dalle colonne per giorno del calendario a cui il tecnico appartiene.
+    """
+
+    __slots__ = ("nome", "giorni_bloccati", "_calendario", "_pos")
+
+    def __init__(
+        self, nome: str, ord_base: int = 0,
+        calendario: Optional["CalendarioReperibilita"] = None, pos: int = -1,
+    ):
         self.nome = nome
-        self.giorni_reperibili: Dict[str, str] = {}  # {data: tipo}
-        self.giorni_bloccati: Set[str] = set()  # Date in formato YYYY-MM-DD
-        self.turni_importanti: List[Tuple[str, str]] = []  # [(data, tipo), ...]
+        self.giorni_bloccati = MascheraGiorni(ord_base)  # Ordinali (date.toordinal()) dei giorni bloccati
+        self._calendario = calendario
+        self._pos = pos
+
+    @property
+    def giorni_reperibili(self) -> Mapping:
+        """Turni del tecnico come {data: tipo}."""
+        if self._calendario is None:
+            return {}
+        return GiorniReperibili(self._calendario, self._pos)
+
+    @property
+    def turni_importanti(self) -> List[Tuple[str, str]]:
+        """Festivi e weekend (riferiti al sabato) del tecnico, in ordine di data: [(data, tipo), ...]."""
+        cal_ = self._calendario
+        if cal_ is None:
+            return []
+        out = []
+        festivo = _CODICE_TIPO["festivo"]
+        weekend = _CODICE_TIPO["weekend"]
+        for i, p in enumerate(cal_._col_tecnico):
+            if p != self._pos:
+                continue
+            tipo = cal_._col_tipo[i]
+            if tipo == festivo or (tipo == weekend and cal_._weekday(cal_._ord_base + i) == 5):
+                out.append((cal_._giorni_str[i], TIPI_TURNO[tipo]))
+        return out
+
+    def bloccato(self, data_str: str) -> bool:
+        """Indica se il tecnico è bloccato (ferie o regola 7 giorni) in una data YYYY-MM-DD."""
+        return datetime.strptime(data_str, "%Y-%m-%d").toordinal() in self.giorni_bloccati
     
     def __repr__(self):
         return f"Tecnico({self.nome})"
@@ -47,6 +271,9 @@ class CalendarioReperibilita:
     # Viene configurata dinamicamente dalla PWA
     GIORNI_AIUTANTI = [5, 6]  # Sabato e domenica di default
     
+    # Valori di default: ogni istanza può ricevere la propria configurazione dal costruttore
+    # (vedi __init__), senza modificare questi attributi di classe.
+
     # Stato (configurabile dall'esterno) per supporto multi-anno e continuità di rotazione
     ANNO = 2026
     ROTATION_START_INDEX = 0
@@ -55,6 +282,10 @@ class CalendarioReperibilita:
     # Stato rotazione per-festività (chiave -> indice tecnico di partenza)
     # Chiavi tipiche: "01-06" (Epifania), "04-25" (Liberazione), "EASTER", "EASTER_MON", ecc.
     FESTIVI_ROTATION_START: Dict[str, int] = {}
+
+    # Assegnazioni fisse di default (data YYYY-MM-DD -> tecnico), valide solo se il tecnico
+    # fa parte della squadra: il 1 gennaio 2026 a Dardha è la regola storica
+    ASSEGNAZIONI_FISSE: Dict[str, str] = {"2026-01-01": "Dardha"}
     
     GIORNI_BLOCCO = 7  # giorni prima e dopo
 
@@ -80,25 +311,7 @@ class CalendarioReperibilita:
     @classmethod
     def get_festivi(cls, anno: int) -> List[str]:
         """Ritorna la lista festività nazionali italiane per l'anno indicato."""
-        easter = cls._pasqua_gregoriana(anno)
-        easter_monday = easter + timedelta(days=1)
-        fissi = [
-            (1, 1),   # Capodanno
-            (1, 6),   # Epifania
-            (4, 25),  # Liberazione
-            (5, 1),   # Lavoro
-            (6, 2),   # Repubblica
-            (8, 15),  # Ferragosto
-            (11, 1),  # Ognissanti
-            (12, 8),  # Immacolata
-            (12, 25), # Natale
-            (12, 26), # Santo Stefano
-        ]
-        out = [f"{anno}-{m:02d}-{d:02d}" for (m, d) in fissi]
-        out.append(easter.strftime("%Y-%m-%d"))
-        out.append(easter_monday.strftime("%Y-%m-%d"))
-        out.sort()
-        return out
+        return list(tabella_festivi(anno).date)
 
     @classmethod
     def get_festivi_dettaglio(cls, anno: int) -> List[Tuple[str, str]]:
@@ -106,43 +319,117 @@ class CalendarioReperibilita:
 
         La key è stabile tra anni per applicare una rotazione dedicata per-festività.
         """
-        easter = cls._pasqua_gregoriana(anno)
-        easter_monday = easter + timedelta(days=1)
-
-        fixed: List[Tuple[Tuple[int, int], str]] = [
-            ((1, 1), "01-01"),
-            ((1, 6), "01-06"),
-            ((4, 25), "04-25"),
-            ((5, 1), "05-01"),
-            ((6, 2), "06-02"),
-            ((8, 15), "08-15"),
-            ((11, 1), "11-01"),
-            ((12, 8), "12-08"),
-            ((12, 25), "12-25"),
-            ((12, 26), "12-26"),
-        ]
-
-        out: List[Tuple[str, str]] = []
-        for (m, d), key in fixed:
-            out.append((f"{anno}-{m:02d}-{d:02d}", key))
-
-        out.append((easter.strftime("%Y-%m-%d"), "EASTER"))
-        out.append((easter_monday.strftime("%Y-%m-%d"), "EASTER_MON"))
-        out.sort(key=lambda x: x[0])
-        return out
+        return list(tabella_festivi(anno).dettaglio)
     
-    def __init__(self):
-        self.anno = int(getattr(self, "ANNO", 2026) or 2026)
+    def __init__(
+        self,
+        anno: Optional[int] = None,
+        tecnici: Optional[List[str]] = None,
+        aiutanti: Optional[List[str]] = None,
+        date_aiutanti: Optional[List[str]] = None,
+        ferie: Optional[List[Dict[str, str]]] = None,
+        rotation_start_index: Optional[int] = None,
+        aiutanti_offset: Optional[int] = None,
+        festivi_rotation_start: Optional[Dict[str, int]] = None,
+        assegnazioni_fisse: Optional[Dict[str, str]] = None,
+        inizio: Optional[str] = None,
+        fine: Optional[str] = None,
+    ):
+        """
+        Crea un calendario con configurazione propria dell'istanza.
+        I parametri non indicati usano i default di classe (TECNICI, AIUTANTI, ...),
+        così istanze diverse possono essere generate in parallelo senza interferire.
+        Le assegnazioni_fisse ({data: tecnico}) si aggiungono a quelle di default
+        (un tecnico vuoto annulla il default di quella data).
+
+        Di default il calendario copre l'anno solare; con inizio/fine (YYYY-MM-DD) copre un
+        orizzonte qualsiasi, anche a cavallo d'anno, con una rotazione continua che parte
+        dallo stato passato (rotation_start_index, ...). Senza fine l'orizzonte è di 12 mesi
+        e `anno` diventa l'anno di inizio.
+        """
+        cls = type(self)
+        if inizio:
+            primo_giorno = datetime.strptime(inizio, "%Y-%m-%d").date()
+            anno = primo_giorno.year
+        self.ANNO = int(anno if anno is not None else cls.ANNO)
+        if not inizio:
+            primo_giorno = date(self.ANNO, 1, 1)
+        if fine:
+            ultimo_giorno = datetime.strptime(fine, "%Y-%m-%d").date()
+        elif inizio:
+            try:
+                ultimo_giorno = primo_giorno.replace(year=primo_giorno.year + 1) - timedelta(days=1)
+            except ValueError:
+                # 29 febbraio: l'orizzonte arriva al 28 febbraio dell'anno dopo
+                ultimo_giorno = date(primo_giorno.year + 1, 2, 28)
+        else:
+            ultimo_giorno = date(self.ANNO, 12, 31)
+        if ultimo_giorno < primo_giorno:
+            raise ValueError("Periodo non valido: 'fine' prima di 'inizio'")
+        self.TECNICI = list(tecnici if tecnici is not None else cls.TECNICI)
+        self.AIUTANTI = list(aiutanti if aiutanti is not None else cls.AIUTANTI)
+        self.DATE_AIUTANTI = list(date_aiutanti if date_aiutanti is not None else cls.DATE_AIUTANTI)
+        self.FERIE = list(ferie if ferie is not None else cls.FERIE)
+        self.ROTATION_START_INDEX = (
+            rotation_start_index if rotation_start_index is not None else cls.ROTATION_START_INDEX
+        )
+        self.AIUTANTI_OFFSET = aiutanti_offset if aiutanti_offset is not None else cls.AIUTANTI_OFFSET
+        self.FESTIVI_ROTATION_START = dict(
+            festivi_rotation_start if festivi_rotation_start is not None else cls.FESTIVI_ROTATION_START
+        )
+
+        self.ASSEGNAZIONI_FISSE = {**cls.ASSEGNAZIONI_FISSE, **(assegnazioni_fisse or {})}
+
+        self.anno = self.ANNO
+
+        # Periodo coperto (ordinali inclusi) e relative stringhe
+        self._inizio = primo_giorno.toordinal()
+        self._fine = ultimo_giorno.toordinal()
+        self.inizio = primo_giorno.isoformat()
+        self.fine = ultimo_giorno.isoformat()
+
+        # Tabella ordinale <-> stringa per il periodo (con margine per i blocchi ai bordi)
+        self._prepara_giorni()
+
+        # Festività del periodo: (ordinale, chiave) in ordine di data e insieme degli ordinali
+        self._festivi, self._festivi_set = self._festivi_periodo()
+
+        # Posizione di ogni tecnico nella rotazione (O(1) anche con squadre numerose)
+        self._pos_tecnico: Dict[str, int] = {}
+        for i, nome in enumerate(self.TECNICI):
+            self._pos_tecnico.setdefault(nome, i)
         self.tecnici: Dict[str, TecnicoReperibilita] = {
-            nome: TecnicoReperibilita(nome) for nome in self.TECNICI
+            nome: TecnicoReperibilita(nome, self._ord_base, self, pos) for nome, pos in self._pos_tecnico.items()
         }
-        self.calendario: Dict[str, Dict] = {}  # {data: {tipo, tecnico, aiutante}}
+        # Assegnazioni fisse dei tecnici della squadra, per ordinale (lookup O(1) durante la generazione)
+        self._fissi: Dict[int, str] = {}
+        for data_str, nome in self.ASSEGNAZIONI_FISSE.items():
+            if nome and nome in self.tecnici:
+                try:
+                    self._fissi[self._str_to_ord(data_str)] = nome
+                except Exception:
+                    continue
         self.indice_rotazione = int(getattr(self, "ROTATION_START_INDEX", 0) or 0)  # Traccia il prossimo tecnico da assegnare
         self.indice_rotazione_aiutanti = 0  # Traccia il prossimo aiutante da assegnare
-        self.contatori_turni: Dict[str, int] = {nome: 0 for nome in self.TECNICI}
-        self.contatori_aiutanti: Dict[str, int] = {nome: 0 for nome in self.AIUTANTI}
-        self.aiutante_per_data: Dict[str, str] = {}
-        self.aiutanti_giorni_bloccati: Dict[str, Set[str]] = {nome: set() for nome in self.AIUTANTI}
+
+        # Stato colonnare, indicizzato per giorno (ordinale - _ord_base): posizione del tecnico
+        # in TECNICI, codice del tipo di turno e posizione dell'aiutante (-1 / 0 = nessuno).
+        # È l'indice autorevole delle assegnazioni: un anno occupa pochi KB e si copia in blocco.
+        n_giorni = len(self._giorni_str)
+        self._col_tecnico = array("h", [-1]) * n_giorni
+        self._col_tipo = bytearray(n_giorni)
+        self._col_aiutante = array("h", [-1]) * n_giorni
+        self._nomi_aiutanti: List[str] = list(dict.fromkeys(self.AIUTANTI))
+        self._pos_aiutante: Dict[str, int] = {nome: i for i, nome in enumerate(self._nomi_aiutanti)}
+        self._turni = array("l", [0]) * len(self.TECNICI)
+        self._turni_aiutanti = array("l", [0]) * len(self._nomi_aiutanti)
+        # Vista materializzata di `assegnazioni`, invalidata da ogni modifica delle colonne
+        self._vista_assegnazioni: Optional[Dict[str, List[str]]] = None
+        # Indice di disponibilità (per giorno, bitmask dei tecnici che potrebbero coprirlo), costruito su richiesta
+        self._indice_disponibilita: Optional[List[int]] = None
+        self.aiutanti_giorni_bloccati: Dict[str, MascheraGiorni] = {
+            nome: MascheraGiorni(self._ord_base) for nome in self.AIUTANTI
+        }
         self.aiutanti_offset: int = int(getattr(self, "AIUTANTI_OFFSET", 0) or 0)
 
         # Rotazione dedicata alle festività (persistita esternamente dalla PWA)
@@ -155,13 +442,275 @@ class CalendarioReperibilita:
                 except Exception:
                     self.festivi_rotation_index[str(k)] = 0
         self.festivi_rotation_next: Dict[str, int] = {}
+        # Checkpoint settimanali della rotazione: lunedì (ordinale) -> [indice prima del sabato
+        # nel passaggio weekend, indice prima del lunedì nel passaggio feriali]
+        self._checkpoint: Dict[int, List[Optional[int]]] = {}
+
+        # Indici a intervalli delle ferie (tecnici e aiutanti)
+        self.ferie_tecnici = IndiceFerie()
+        self.ferie_aiutanti = IndiceFerie()
+        self._indicizza_ferie()
 
         # Precalcola mapping date -> indice (deterministico) per la rotazione aiutanti
         date_aiutanti_raw = getattr(self, "DATE_AIUTANTI", []) or []
         self.date_aiutanti: List[str] = sorted(set(date_aiutanti_raw))
-        self._date_aiutanti_index: Dict[str, int] = {
-            data_str: idx for idx, data_str in enumerate(self.date_aiutanti)
-        }
+        self._date_aiutanti_index: Dict[int, int] = {}
+        for idx, data_str in enumerate(self.date_aiutanti):
+            try:
+                self._date_aiutanti_index[self._str_to_ord(data_str)] = idx
+            except Exception:
+                continue
+
+    def _prepara_giorni(self):
+        """Precalcola le stringhe YYYY-MM-DD del periodo (più margine) indicizzate per ordinale.
+
+        Internamente il motore lavora su ordinali interi (date.toordinal()); le stringhe
+        servono solo ai confini dell'API, quindi vengono formattate una sola volta
+        (la tabella è condivisa tra le istanze dello stesso periodo).
+        """
+        margine = 2 * self.GIORNI_BLOCCO + 2
+        primo = self._inizio - margine
+        ultimo = self._fine + margine
+        self._ord_base = primo
+        self._giorni_str, self._ord_per_str = _tabella_giorni(primo, ultimo)
+
+    def _ord_to_str(self, o: int) -> str:
+        """Converte un ordinale in stringa YYYY-MM-DD (lookup in tabella)."""
+        i = o - self._ord_base
+        if 0 <= i < len(self._giorni_str):
+            return self._giorni_str[i]
+        return date.fromordinal(o).isoformat()
+
+    def _str_to_ord(self, data_str: str) -> int:
+        """Converte una stringa YYYY-MM-DD in ordinale (lookup in tabella)."""
+        o = self._ord_per_str.get(data_str)
+        if o is None:
+            o = self._str_to_data(data_str).toordinal()
+        return o
+
+    def _registra_turno(self, tecnico: TecnicoReperibilita, o: int, tipo: str):
+        """Registra un turno del tecnico nelle colonne per giorno (l'aiutante si azzera)."""
+        i = o - self._ord_base
+        self._col_tecnico[i] = self._pos_tecnico[tecnico.nome]
+        self._col_tipo[i] = _CODICE_TIPO[tipo]
+        self._col_aiutante[i] = -1
+        self._invalida_viste()
+
+    def _registra_aiutante(self, o: int, aiutante: str):
+        """Registra l'aiutante di una data (anche vuoto)."""
+        self._col_aiutante[o - self._ord_base] = self._indice_aiutante(aiutante) if aiutante else -1
+        self._invalida_viste()
+
+    def _invalida_viste(self):
+        """Scarta le viste derivate dalle colonne (assegnazioni, disponibilità) dopo una modifica."""
+        self._vista_assegnazioni = None
+        self._indice_disponibilita = None
+
+    def _indice_aiutante(self, nome: str) -> int:
+        """Posizione di un aiutante nella tabella dei nomi (aggiunto se non configurato)."""
+        pos = self._pos_aiutante.get(nome)
+        if pos is None:
+            pos = len(self._nomi_aiutanti)
+            self._nomi_aiutanti.append(nome)
+            self._pos_aiutante[nome] = pos
+            self._turni_aiutanti.append(0)
+        return pos
+
+    def _conta_turno(self, tecnico_nome: str, quanti: int = 1):
+        """Aggiorna il contatore turni di un tecnico."""
+        self._turni[self._pos_tecnico[tecnico_nome]] += quanti
+
+    def _rimuovi_turno(self, o: int):
+        """Rimuove l'assegnazione (tecnico e aiutante) di una data."""
+        i = o - self._ord_base
+        self._col_tecnico[i] = -1
+        self._col_tipo[i] = 0
+        self._col_aiutante[i] = -1
+        self._invalida_viste()
+
+    def _voce(self, o: int) -> Optional[Tuple[str, str, str]]:
+        """(tecnico, tipo, aiutante) di una data (ordinale), o None se non assegnata."""
+        i = o - self._ord_base
+        if not 0 <= i < len(self._col_tecnico):
+            return None
+        pos = self._col_tecnico[i]
+        if pos < 0:
+            return None
+        aiutante = self._col_aiutante[i]
+        return (
+            self.TECNICI[pos],
+            TIPI_TURNO[self._col_tipo[i]],
+            self._nomi_aiutanti[aiutante] if aiutante >= 0 else "",
+        )
+
+    def _giorni_assegnati(self) -> Iterator[int]:
+        """Ordinali con un tecnico assegnato, in ordine di data."""
+        base = self._ord_base
+        for i, pos in enumerate(self._col_tecnico):
+            if pos >= 0:
+                yield base + i
+
+    @property
+    def contatori_turni(self) -> Dict[str, int]:
+        """Turni assegnati per tecnico (il weekend conta 2)."""
+        return {nome: self._turni[pos] for nome, pos in self._pos_tecnico.items()}
+
+    @property
+    def contatori_aiutanti(self) -> Dict[str, int]:
+        """Turni assegnati per aiutante."""
+        return {nome: self._turni_aiutanti[pos] for nome, pos in self._pos_aiutante.items()}
+
+    def _cambia_tecnico(self, o: int, tecnico_nome: str):
+        """Sposta il turno di una data su un altro tecnico (tipo e aiutante invariati).
+
+        I blocchi non vengono aggiornati: dopo una serie di spostamenti
+        va chiamato _ricostruisci_blocchi().
+        """
+        i = o - self._ord_base
+        precedente = self._col_tecnico[i]
+        if precedente >= 0:
+            self._turni[precedente] -= 1
+        self._conta_turno(tecnico_nome)
+        self._col_tecnico[i] = self._pos_tecnico[tecnico_nome]
+        self._invalida_viste()
+
+    def _ricostruisci_blocchi(self, nomi: Optional[List[str]] = None):
+        """Ricalcola i giorni bloccati (ferie + regola 7 giorni) dalle colonne per giorno.
+
+        Con `nomi` vengono ricalcolati solo i tecnici indicati (es. dopo uno scambio).
+        """
+        self._invalida_viste()
+        if nomi is None:
+            for tecnico in self.tecnici.values():
+                tecnico.giorni_bloccati = MascheraGiorni(self._ord_base)
+            self._applica_ferie()
+            posizioni = None
+        else:
+            posizioni = set()
+            for nome in nomi:
+                tecnico = self.tecnici[nome]
+                tecnico.giorni_bloccati = MascheraGiorni(self._ord_base)
+                for dal_o, al_o in self.ferie_tecnici.intervalli(nome):
+                    tecnico.giorni_bloccati.aggiungi_intervallo(dal_o, al_o)
+                posizioni.add(tecnico._pos)
+        for o in self._giorni_assegnati():
+            if posizioni is not None and self._col_tecnico[o - self._ord_base] not in posizioni:
+                continue
+            nome, tipo, _ = self._voce(o)
+            tecnico = self.tecnici[nome]
+            if tipo == "festivo":
+                self._aggiungi_blocco(tecnico, o)
+            elif tipo == "weekend" and self._weekday(o) == 5:
+                self._aggiungi_blocco_weekend(tecnico, o)
+
+    def copia(self) -> "CalendarioReperibilita":
+        """Copia indipendente del calendario (colonne e maschere copiate in blocco, configurazione condivisa)."""
+        nuovo = copy.copy(self)
+        nuovo._col_tecnico = array("h", self._col_tecnico)
+        nuovo._col_tipo = bytearray(self._col_tipo)
+        nuovo._col_aiutante = array("h", self._col_aiutante)
+        nuovo._nomi_aiutanti = list(self._nomi_aiutanti)
+        nuovo._pos_aiutante = dict(self._pos_aiutante)
+        nuovo._turni = array("l", self._turni)
+        nuovo._turni_aiutanti = array("l", self._turni_aiutanti)
+        nuovo.tecnici = {}
+        for nome, tecnico in self.tecnici.items():
+            record = TecnicoReperibilita(nome, self._ord_base, nuovo, tecnico._pos)
+            record.giorni_bloccati.bits = tecnico.giorni_bloccati.bits
+            nuovo.tecnici[nome] = record
+        nuovo.aiutanti_giorni_bloccati = {}
+        for nome, maschera in self.aiutanti_giorni_bloccati.items():
+            nuovo.aiutanti_giorni_bloccati[nome] = MascheraGiorni(maschera.base)
+            nuovo.aiutanti_giorni_bloccati[nome].bits = maschera.bits
+        nuovo.festivi_rotation_index = dict(self.festivi_rotation_index)
+        nuovo.festivi_rotation_next = dict(self.festivi_rotation_next)
+        nuovo._checkpoint = {o: list(v) for o, v in self._checkpoint.items()}
+        return nuovo
+
+    def _assegnato(self, o: int) -> bool:
+        """Indica se una data (ordinale) ha già un tecnico assegnato."""
+        return self._col_tecnico[o - self._ord_base] >= 0
+
+    @staticmethod
+    def _weekday(o: int) -> int:
+        """Giorno della settimana (0=lunedì) di un ordinale; l'ordinale 1 è un lunedì."""
+        return (o - 1) % 7
+
+    def _applica_fissi(self, dal: int, al: int):
+        """
+        Registra le assegnazioni fisse tra dal e al (ordinali). Un giorno di weekend fissa
+        l'intero weekend; se la festività fissata non ha ancora uno stato di rotazione,
+        la rotazione parte dal tecnico fissato (la passata dei festivi la fa poi avanzare).
+        Solleva ValueError se un turno fissato cade nelle ferie del titolare o nel blocco
+        di 7 giorni di un altro turno fissato allo stesso tecnico.
+        """
+        conflitti = self._conflitti_fissi(dal, al)
+        if conflitti:
+            raise ValueError(f"Conflitto assegnazioni fisse: {conflitti[0]} (obbligatorio)")
+        chiavi = dict(self._festivi)
+        for o in sorted(self._fissi):
+            if not dal <= o <= al or self._assegnato(o):
+                continue
+            nome = self._fissi[o]
+            tecnico = self.tecnici[nome]
+            giorni, tipo = self._turno_fisso(o)
+            for g in giorni:
+                if self.ferie_tecnici.in_ferie(nome, g):
+                    raise ValueError(f"Conflitto ferie: {nome} è in ferie il {self._ord_to_str(g)} (obbligatorio)")
+            for g in giorni:
+                key = chiavi.get(g)
+                if key is not None and key not in self.festivi_rotation_index:
+                    self.festivi_rotation_index[key] = self._pos_tecnico[nome]
+
+            for g in giorni:
+                self._registra_turno(tecnico, g, tipo)
+            self._conta_turno(nome, len(giorni))
+            if tipo == "weekend":
+                self._aggiungi_blocco_weekend(tecnico, giorni[0])
+            elif tipo == "festivo":
+                self._aggiungi_blocco(tecnico, o)
+            for g in giorni:
+                self._registra_aiutante(g, self._assegna_aiutante(g))
+
+    def _turno_fisso(self, o: int) -> Tuple[Tuple[int, ...], str]:
+        """Giorni e tipo del turno fissato in o: un giorno di weekend fissa sabato e domenica."""
+        if self._weekday(o) >= 5:
+            sabato = o if self._weekday(o) == 5 else o - 1
+            return (sabato, sabato + 1), "weekend"
+        return (o,), "festivo" if o in self._festivi_set else "feriale"
+
+    def _conflitti_fissi(self, dal: int, al: int) -> List[str]:
+        """
+        Coppie di assegnazioni fisse dello stesso tecnico che violano la regola dei 7 giorni
+        (un turno fissato cade nel blocco di un weekend o festivo fissato). Si riportano le
+        coppie con almeno un turno tra dal e al (ordinali).
+        """
+        turni: Dict[str, Dict[int, Tuple[Tuple[int, ...], str]]] = {}
+        for o, nome in self._fissi.items():
+            giorni, tipo = self._turno_fisso(o)
+            # Sabato e domenica fissati allo stesso tecnico sono un unico turno
+            turni.setdefault(nome, {})[giorni[0]] = (giorni, tipo)
+
+        errori = []
+        visti = set()
+        for nome, per_giorno in sorted(turni.items()):
+            for primo, (giorni, tipo) in sorted(per_giorno.items()):
+                for dal_o, al_o in self._giorni_bloccati_da(primo, tipo):
+                    for altro, (giorni_altro, _) in sorted(per_giorno.items()):
+                        if altro == primo or not any(dal_o <= g <= al_o for g in giorni_altro):
+                            continue
+                        if not any(dal <= g <= al for g in giorni + giorni_altro):
+                            continue
+                        # Due turni importanti si bloccano a vicenda: la coppia si riporta una volta
+                        coppia = (nome, min(primo, altro), max(primo, altro))
+                        if coppia in visti:
+                            continue
+                        visti.add(coppia)
+                        errori.append(
+                            f"{nome} fissato il {self._ord_to_str(altro)} ma ha {tipo} il "
+                            f"{self._ord_to_str(primo)} (regola {self.GIORNI_BLOCCO} giorni)"
+                        )
+        return errori
 
     def _avanza_rotazione_festivo(self, key: str, base_index: int):
         """Avanza di una posizione la rotazione per una specifica festività."""
@@ -169,7 +718,7 @@ class CalendarioReperibilita:
             return
         self.festivi_rotation_index[key] = (int(base_index) + 1) % len(self.TECNICI)
 
-    def _assegna_festivo_con_rotazione(self, data_str: str, key: str) -> str:
+    def _assegna_festivo_con_rotazione(self, o: int, key: str) -> str:
         """Assegna una festività feriale con rotazione dedicata per-festività."""
         if not self.TECNICI:
             return "ERRORE: Nessun tecnico disponibile"
@@ -178,45 +727,42 @@ class CalendarioReperibilita:
         for offset in range(len(self.TECNICI)):
             tecnico_nome = self.TECNICI[(start + offset) % len(self.TECNICI)]
             tecnico = self.tecnici[tecnico_nome]
-            if not self._tecnico_disponibile(tecnico, data_str):
+            if not self._tecnico_disponibile(tecnico, o):
                 continue
 
-            tecnico.giorni_reperibili[data_str] = "festivo"
-            self.contatori_turni[tecnico_nome] += 1
-            tecnico.turni_importanti.append((data_str, "festivo"))
-            self._aggiungi_blocco(tecnico, data_str)
-            self.aiutante_per_data[data_str] = self._assegna_aiutante(data_str)
+            self._registra_turno(tecnico, o, "festivo")
+            self._conta_turno(tecnico_nome)
+            self._aggiungi_blocco(tecnico, o)
+            self._registra_aiutante(o, self._assegna_aiutante(o))
 
             # Mantieni coerente anche la rotazione generale
-            self.indice_rotazione = (self.TECNICI.index(tecnico_nome) + 1) % len(self.TECNICI)
+            self.indice_rotazione = (self._pos_tecnico[tecnico_nome] + 1) % len(self.TECNICI)
             return tecnico_nome
 
         return "ERRORE: Nessun tecnico disponibile"
 
-    def _assegna_weekend_con_rotazione_festivo(self, sabato_str: str, key: str) -> str:
+    def _assegna_weekend_con_rotazione_festivo(self, sabato: int, key: str) -> str:
         """Assegna un weekend (sab+dom) usando la rotazione del festivo che cade nel weekend."""
         if not self.TECNICI:
             return "ERRORE: Nessun tecnico disponibile"
 
-        sabato = self._str_to_data(sabato_str)
-        domenica_str = self._data_to_str(sabato + timedelta(days=1))
+        domenica = sabato + 1
 
         start = int(self.festivi_rotation_index.get(key, 0) or 0) % len(self.TECNICI)
         for offset in range(len(self.TECNICI)):
             tecnico_nome = self.TECNICI[(start + offset) % len(self.TECNICI)]
             tecnico = self.tecnici[tecnico_nome]
-            if not (self._tecnico_disponibile(tecnico, sabato_str) and self._tecnico_disponibile(tecnico, domenica_str)):
+            if not (self._tecnico_disponibile(tecnico, sabato) and self._tecnico_disponibile(tecnico, domenica)):
                 continue
 
-            tecnico.giorni_reperibili[sabato_str] = "weekend"
-            tecnico.giorni_reperibili[domenica_str] = "weekend"
-            self.contatori_turni[tecnico_nome] += 2
-            tecnico.turni_importanti.append((sabato_str, "weekend"))
-            self._aggiungi_blocco_weekend(tecnico, sabato_str)
-            self.aiutante_per_data[sabato_str] = self._assegna_aiutante(sabato_str)
-            self.aiutante_per_data[domenica_str] = self._assegna_aiutante(domenica_str)
+            self._registra_turno(tecnico, sabato, "weekend")
+            self._registra_turno(tecnico, domenica, "weekend")
+            self._conta_turno(tecnico_nome, 2)
+            self._aggiungi_blocco_weekend(tecnico, sabato)
+            self._registra_aiutante(sabato, self._assegna_aiutante(sabato))
+            self._registra_aiutante(domenica, self._assegna_aiutante(domenica))
 
-            self.indice_rotazione = (self.TECNICI.index(tecnico_nome) + 1) % len(self.TECNICI)
+            self.indice_rotazione = (self._pos_tecnico[tecnico_nome] + 1) % len(self.TECNICI)
             return tecnico_nome
 
         return "ERRORE: Nessun tecnico disponibile"
@@ -229,44 +775,30 @@ class CalendarioReperibilita:
         """Converte stringa YYYY-MM-DD a datetime."""
         return datetime.strptime(data_str, "%Y-%m-%d")
     
-    def _aggiungi_blocco(self, tecnico: TecnicoReperibilita, data_str: str):
+    def _aggiungi_blocco(self, tecnico: TecnicoReperibilita, o: int):
         """Aggiunge il blocco di 7 giorni prima e dopo una data."""
-        data = self._str_to_data(data_str)
-        
-        # Blocco 7 giorni prima
-        for i in range(1, self.GIORNI_BLOCCO + 1):
-            data_bloccata = data - timedelta(days=i)
-            tecnico.giorni_bloccati.add(self._data_to_str(data_bloccata))
-        
-        # Blocco 7 giorni dopo
-        for i in range(1, self.GIORNI_BLOCCO + 1):
-            data_bloccata = data + timedelta(days=i)
-            tecnico.giorni_bloccati.add(self._data_to_str(data_bloccata))
+        # Blocco 7 giorni prima e 7 giorni dopo
+        tecnico.giorni_bloccati.aggiungi_intervallo(o - self.GIORNI_BLOCCO, o - 1)
+        tecnico.giorni_bloccati.aggiungi_intervallo(o + 1, o + self.GIORNI_BLOCCO)
     
-    def _aggiungi_blocco_weekend(self, tecnico: TecnicoReperibilita, sabato_str: str):
+    def _aggiungi_blocco_weekend(self, tecnico: TecnicoReperibilita, sabato: int):
         """
         Aggiunge il blocco per un weekend.
         Blocca 7 giorni prima del sabato e 8 giorni dopo (per saltare domenica e lunedì).
         """
-        sabato = self._str_to_data(sabato_str)
-        
         # Blocco 7 giorni prima del sabato
-        for i in range(1, self.GIORNI_BLOCCO + 1):
-            data_bloccata = sabato - timedelta(days=i)
-            tecnico.giorni_bloccati.add(self._data_to_str(data_bloccata))
+        tecnico.giorni_bloccati.aggiungi_intervallo(sabato - self.GIORNI_BLOCCO, sabato - 1)
         
         # Blocco 8 giorni dopo (da martedì in poi, escludendo domenica e lunedì che sono parte del weekend)
-        for i in range(2, self.GIORNI_BLOCCO + 2):
-            data_bloccata = sabato + timedelta(days=i)
-            tecnico.giorni_bloccati.add(self._data_to_str(data_bloccata))
+        tecnico.giorni_bloccati.aggiungi_intervallo(sabato + 2, sabato + self.GIORNI_BLOCCO + 1)
     
-    def _tecnico_disponibile(self, tecnico: TecnicoReperibilita, data_str: str) -> bool:
-        """Verifica se un tecnico è disponibile per una data."""
-        return data_str not in tecnico.giorni_bloccati
+    def _tecnico_disponibile(self, tecnico: TecnicoReperibilita, o: int) -> bool:
+        """Verifica se un tecnico è disponibile per una data (ordinale): un test sul bit del giorno."""
+        return o not in tecnico.giorni_bloccati
     
-    def _assegna_aiutante(self, data_str: str) -> str:
+    def _assegna_aiutante(self, o: int) -> str:
         """
-        Assegna un aiutante a una data specifica.
+        Assegna un aiutante a una data specifica (ordinale).
         Ritorna il nome dell'aiutante (o vuoto se non assegnato).
         """
         # Se non ci sono aiutanti configurati, non assegnare nulla
@@ -274,7 +806,7 @@ class CalendarioReperibilita:
             return ""
 
         # Nuovo modello: assegnazione solo sulle date selezionate
-        idx = self._date_aiutanti_index.get(data_str)
+        idx = self._date_aiutanti_index.get(o)
         if idx is None:
             return ""
 
@@ -283,7 +815,7 @@ class CalendarioReperibilita:
         for offset in range(len(self.AIUTANTI)):
             candidate = self.AIUTANTI[(start_pos + offset) % len(self.AIUTANTI)]
             blocked = self.aiutanti_giorni_bloccati.get(candidate)
-            if blocked and data_str in blocked:
+            if blocked and o in blocked:
                 continue
             aiutante_nome = candidate
             break
@@ -291,13 +823,11 @@ class CalendarioReperibilita:
         if not aiutante_nome:
             return ""
         # In caso di cambi dinamici della lista aiutanti, garantisci che il contatore esista
-        if aiutante_nome not in self.contatori_aiutanti:
-            self.contatori_aiutanti[aiutante_nome] = 0
-        self.contatori_aiutanti[aiutante_nome] += 1
+        self._turni_aiutanti[self._indice_aiutante(aiutante_nome)] += 1
         
         return aiutante_nome
     
-    def _assegna_turno(self, data_str: str, tipo: str) -> str:
+    def _assegna_turno(self, o: int, tipo: str) -> str:
         """
         Assegna un turno a un tecnico seguendo la rotazione.
         Ritorna il nome del tecnico assegnato.
@@ -307,18 +837,17 @@ class CalendarioReperibilita:
             tecnico_nome = self.TECNICI[self.indice_rotazione % len(self.TECNICI)]
             tecnico = self.tecnici[tecnico_nome]
             
-            if self._tecnico_disponibile(tecnico, data_str):
+            if self._tecnico_disponibile(tecnico, o):
                 # Assegna il turno
-                tecnico.giorni_reperibili[data_str] = tipo
-                self.contatori_turni[tecnico_nome] += 1
+                self._registra_turno(tecnico, o, tipo)
+                self._conta_turno(tecnico_nome)
                 
                 # Se è un turno importante, aggiunge il blocco
                 if tipo in ["weekend", "festivo"]:
-                    tecnico.turni_importanti.append((data_str, tipo))
-                    self._aggiungi_blocco(tecnico, data_str)
+                    self._aggiungi_blocco(tecnico, o)
                 
                 # Assegna aiutante se necessario (e memorizza per la UI)
-                self.aiutante_per_data[data_str] = self._assegna_aiutante(data_str)
+                self._registra_aiutante(o, self._assegna_aiutante(o))
                 
                 # Passa al prossimo tecnico per la prossima assegnazione
                 self.indice_rotazione += 1
@@ -331,13 +860,12 @@ class CalendarioReperibilita:
         # Nessun tecnico disponibile (non dovrebbe accadere con le regole corrette)
         return "ERRORE: Nessun tecnico disponibile"
     
-    def _assegna_weekend(self, sabato_str: str) -> str:
+    def _assegna_weekend(self, sabato: int) -> str:
         """
         Assegna un weekend completo (sabato + domenica) a un tecnico.
         Ritorna il nome del tecnico assegnato.
         """
-        sabato = self._str_to_data(sabato_str)
-        domenica_str = self._data_to_str(sabato + timedelta(days=1))
+        domenica = sabato + 1
         
         tentativi = 0
         while tentativi < len(self.TECNICI):
@@ -345,23 +873,22 @@ class CalendarioReperibilita:
             tecnico = self.tecnici[tecnico_nome]
             
             # Controlla se entrambi i giorni sono disponibili
-            if (self._tecnico_disponibile(tecnico, sabato_str) and 
-                self._tecnico_disponibile(tecnico, domenica_str)):
+            if (self._tecnico_disponibile(tecnico, sabato) and 
+                self._tecnico_disponibile(tecnico, domenica)):
                 
                 # Assegna entrambi i giorni
-                tecnico.giorni_reperibili[sabato_str] = "weekend"
-                tecnico.giorni_reperibili[domenica_str] = "weekend"
-                self.contatori_turni[tecnico_nome] += 2  # Conteggia come 2 turni
+                self._registra_turno(tecnico, sabato, "weekend")
+                self._registra_turno(tecnico, domenica, "weekend")
+                self._conta_turno(tecnico_nome, 2)  # Conteggia come 2 turni
                 
                 # Aggiunge il blocco usando il sabato come riferimento
                 # MA esclude domenica e lunedì dal blocco (sono parte del weekend)
-                tecnico.turni_importanti.append((sabato_str, "weekend"))
-                self._aggiungi_blocco_weekend(tecnico, sabato_str)
+                self._aggiungi_blocco_weekend(tecnico, sabato)
                 
                 # Passa al prossimo tecnico
                 # Assegna aiutante per sabato/domenica se necessario (e memorizza per la UI)
-                self.aiutante_per_data[sabato_str] = self._assegna_aiutante(sabato_str)
-                self.aiutante_per_data[domenica_str] = self._assegna_aiutante(domenica_str)
+                self._registra_aiutante(sabato, self._assegna_aiutante(sabato))
+                self._registra_aiutante(domenica, self._assegna_aiutante(domenica))
                 self.indice_rotazione += 1
                 return tecnico_nome
             
@@ -377,124 +904,97 @@ class CalendarioReperibilita:
         if giorni_to_monday == 0 and data.weekday() != 0:
             giorni_to_monday = 7
         return data + timedelta(days=giorni_to_monday)
+
+    def _festivi_ordinali(self, anno: int) -> Tuple[Tuple[int, str], ...]:
+        """Come get_festivi_dettaglio, ma con ordinali al posto delle stringhe (tabella condivisa)."""
+        return tabella_festivi(anno).ordinali
+
+    def _festivi_periodo(self) -> Tuple[Tuple[Tuple[int, str], ...], FrozenSet[int]]:
+        """Festività (ordinale, chiave) che cadono nel periodo e insieme dei loro ordinali.
+
+        Per l'anno solare sono le tabelle condivise dell'anno, senza copie.
+        """
+        primo_anno = date.fromordinal(self._inizio).year
+        ultimo_anno = date.fromordinal(self._fine).year
+        if primo_anno == ultimo_anno and self._inizio == date(primo_anno, 1, 1).toordinal() \
+                and self._fine == date(primo_anno, 12, 31).toordinal():
+            tabella = tabella_festivi(primo_anno)
+            return tabella.ordinali, tabella.insieme
+        festivi = tuple(
+            (o, key)
+            for anno in range(primo_anno, ultimo_anno + 1)
+            for o, key in tabella_festivi(anno).ordinali
+            if self._inizio <= o <= self._fine
+        )
+        return festivi, frozenset(o for o, _ in festivi)
     
     def genera_calendario(self):
-        """Genera il calendario completo per l'anno impostato."""
-        data_inizio = datetime(self.anno, 1, 1)
-        data_fine = datetime(self.anno, 12, 31)
+        """Genera il calendario completo per il periodo impostato (di default l'anno)."""
+        inizio = self._inizio
+        fine = self._fine
 
-        festivi = set(self.get_festivi(self.anno))
-        festivi_dettaglio = self.get_festivi_dettaglio(self.anno)
+        festivi_dettaglio = self._festivi
+        festivi = self._festivi_set
 
         # Applica ferie (blocca i tecnici nelle date indicate)
         self._applica_ferie()
         
-        # Assegna il 1 gennaio a Dardha SOLO per il 2026 (regola storica).
-        # Negli altri anni, il 1 gennaio segue la rotazione normale come qualsiasi festivo.
-        data_str = self._data_to_str(data_inizio)
-        if self.anno == 2026:
-            # Allinea la rotazione del Capodanno: se non c'è stato precedente, parte da Dardha.
-            if "01-01" not in self.festivi_rotation_index and "Dardha" in self.TECNICI:
-                self.festivi_rotation_index["01-01"] = self.TECNICI.index("Dardha")
-            base_0101 = int(self.festivi_rotation_index.get("01-01", 0) or 0)
-            tecnico = self.tecnici["Dardha"]
-            if data_str in tecnico.giorni_bloccati:
-                raise ValueError(f"Conflitto ferie: Dardha è in ferie il {data_str} (obbligatorio)")
-            tecnico.giorni_reperibili[data_str] = "festivo"
-            self.contatori_turni["Dardha"] += 1
-            tecnico.turni_importanti.append((data_str, "festivo"))
-            self._aggiungi_blocco(tecnico, data_str)
-            # Assegna aiutante anche per il 1 gennaio se previsto
-            self.aiutante_per_data[data_str] = self._assegna_aiutante(data_str)
-            # Avanza di un anno la rotazione del Capodanno
-            self._avanza_rotazione_festivo("01-01", base_0101)
+        # Assegnazioni fisse (es. il 1 gennaio 2026 a Dardha): registrate prima delle rotazioni,
+        # le passate successive le trovano già occupate e le saltano con un lookup sulle colonne
+        self._applica_fissi(inizio, fine)
         
         # Assegna le festività con una rotazione dedicata per ciascuna festività.
-        for festivo_str, key in festivi_dettaglio:
-            # Capodanno 2026 già forzato
-            if self.anno == 2026 and festivo_str == data_str:
-                continue
-
+        for festivo, key in festivi_dettaglio:
             base_idx = int(self.festivi_rotation_index.get(key, 0) or 0)
 
-            tecnico_gia, _ = self.get_reperibile_data(festivo_str)
-            if tecnico_gia:
+            if self._assegnato(festivo):
                 # Se già assegnato (es. weekend già assegnato), considera la festività "consumata" per l'anno
                 self._avanza_rotazione_festivo(key, base_idx)
                 continue
 
-            festivo_data = self._str_to_data(festivo_str)
-            if festivo_data.weekday() in [5, 6]:
+            weekday = self._weekday(festivo)
+            if weekday in [5, 6]:
                 # Festivo nel weekend: assegna (se non già assegnato) l'intero weekend usando la rotazione del festivo
-                sabato_str = festivo_str if festivo_data.weekday() == 5 else self._data_to_str(festivo_data - timedelta(days=1))
-                tecnico_sab, _ = self.get_reperibile_data(sabato_str)
-                if tecnico_sab:
+                sabato = festivo if weekday == 5 else festivo - 1
+                if self._assegnato(sabato):
                     self._avanza_rotazione_festivo(key, base_idx)
                 else:
-                    self._assegna_weekend_con_rotazione_festivo(sabato_str, key)
+                    self._assegna_weekend_con_rotazione_festivo(sabato, key)
                     self._avanza_rotazione_festivo(key, base_idx)
             else:
-                self._assegna_festivo_con_rotazione(festivo_str, key)
+                self._assegna_festivo_con_rotazione(festivo, key)
                 self._avanza_rotazione_festivo(key, base_idx)
 
         # Esponi lo stato rotazione per-festività per persistenza esterna
         self.festivi_rotation_next = dict(self.festivi_rotation_index)
         
-        # Assegna i weekend
-        data_corrente = data_inizio
-        while data_corrente <= data_fine:
-            # Trova il sabato
-            while data_corrente.weekday() != 5:  # 5 = sabato
-                data_corrente += timedelta(days=1)
+        # Assegna i weekend (ogni sabato dell'anno)
+        primo_sabato = inizio + (5 - self._weekday(inizio)) % 7
+        for sabato in range(primo_sabato, fine + 1, 7):
+            self._segna_checkpoint(sabato - 5, 0)
+            # Verifica che non sia già assegnato e che non sia un giorno festivo
+            sabato_assegnato = self._assegnato(sabato)
+            domenica_assegnato = self._assegnato(sabato + 1)
+            sabato_festivo = sabato in festivi
+            domenica_festivo = (sabato + 1) in festivi
             
-            if data_corrente <= data_fine:
-                sabato_str = self._data_to_str(data_corrente)
-                domenica_str = self._data_to_str(data_corrente + timedelta(days=1))
-                
-                # Verifica che non sia già assegnato e che non sia un giorno festivo
-                sabato_assegnato = False
-                domenica_assegnato = False
-                sabato_festivo = sabato_str in festivi
-                domenica_festivo = domenica_str in festivi
-                
-                for tecnico_iter in self.tecnici.values():
-                    if sabato_str in tecnico_iter.giorni_reperibili:
-                        sabato_assegnato = True
-                    if domenica_str in tecnico_iter.giorni_reperibili:
-                        domenica_assegnato = True
-                
-                # Assegna solo se nessuno dei due giorni è festivo o già assegnato
-                if (not sabato_assegnato and not domenica_assegnato and 
-                    not sabato_festivo and not domenica_festivo):
-                    # Assegna il weekend completo (sabato + domenica)
-                    self._assegna_weekend(sabato_str)
-                
-                data_corrente += timedelta(days=2)  # Salta a lunedì
-            else:
-                break
+            # Assegna solo se nessuno dei due giorni è festivo o già assegnato
+            if (not sabato_assegnato and not domenica_assegnato and 
+                not sabato_festivo and not domenica_festivo):
+                # Assegna il weekend completo (sabato + domenica)
+                self._assegna_weekend(sabato)
         
         # Assegna i feriali (lunedì-venerdì, escludendo festivi e fine settimana)
-        data_corrente = datetime(self.anno, 1, 1)
-        while data_corrente <= data_fine:
-            data_str = self._data_to_str(data_corrente)
-            
+        for o in range(inizio, fine + 1):
+            if o == inizio or self._weekday(o) == 0:
+                self._segna_checkpoint(o - self._weekday(o), 1)
             # Controlla se è feriale (lun-ven, non festivo che non sia nel weekend)
-            if data_corrente.weekday() < 5:  # lunedì-venerdì
-                # Verifica se è una festività feriale (non nel weekend)
-                è_festivo_feriale = (data_str in festivi and data_corrente.weekday() < 5)
-                
-                if not è_festivo_feriale:
-                    # Verifica che non sia già assegnato
-                    if not any(
-                        data_str in tecnico.giorni_reperibili 
-                        for tecnico in self.tecnici.values()
-                    ):
-                        self._assegna_turno(data_str, "feriale")
-            
-            data_corrente += timedelta(days=1)
+            # Verifica anche che non sia già assegnato
+            if self._weekday(o) < 5 and o not in festivi and not self._assegnato(o):
+                self._assegna_turno(o, "feriale")
 
-    def _applica_ferie(self):
-        """Blocca i tecnici nei periodi di ferie (inibisce assegnazioni)."""
+    def _indicizza_ferie(self):
+        """Popola gli indici a intervalli a partire dalla lista FERIE."""
         ferie_list = getattr(self, "FERIE", []) or []
         for entry in ferie_list:
             tipo = (entry.get("tipo") or "tecnico").strip().lower()
@@ -504,136 +1004,606 @@ class CalendarioReperibilita:
             if not nome or not dal or not al:
                 continue
             try:
-                dal_dt = self._str_to_data(dal)
-                al_dt = self._str_to_data(al)
+                dal_o = self._str_to_ord(dal)
+                al_o = self._str_to_ord(al)
             except Exception:
                 continue
-            if al_dt < dal_dt:
+            if al_o < dal_o:
                 continue
 
-            cur = dal_dt
             if tipo == "aiutante":
-                if nome not in self.aiutanti_giorni_bloccati:
-                    self.aiutanti_giorni_bloccati[nome] = set()
-                while cur <= al_dt:
-                    self.aiutanti_giorni_bloccati[nome].add(self._data_to_str(cur))
-                    cur += timedelta(days=1)
+                self.ferie_aiutanti.aggiungi(nome, dal_o, al_o)
             else:
-                if nome not in self.tecnici:
-                    continue
-                tecnico = self.tecnici[nome]
-                while cur <= al_dt:
-                    tecnico.giorni_bloccati.add(self._data_to_str(cur))
-                    cur += timedelta(days=1)
+                self.ferie_tecnici.aggiungi(nome, dal_o, al_o)
+
+    def _applica_ferie(self, dal: Optional[int] = None, al: Optional[int] = None):
+        """
+        Blocca i tecnici nei periodi di ferie (inibisce assegnazioni).
+        Se indicati dal/al (ordinali), applica solo la parte dei periodi che cade nella finestra.
+        """
+        def _taglia(dal_o: int, al_o: int) -> Tuple[int, int]:
+            if dal is not None:
+                dal_o = max(dal_o, dal)
+            if al is not None:
+                al_o = min(al_o, al)
+            return dal_o, al_o
+
+        for nome, dal_o, al_o in self.ferie_aiutanti:
+            dal_o, al_o = _taglia(dal_o, al_o)
+            if al_o < dal_o:
+                continue
+            if nome not in self.aiutanti_giorni_bloccati:
+                self.aiutanti_giorni_bloccati[nome] = MascheraGiorni(self._ord_base)
+            self.aiutanti_giorni_bloccati[nome].aggiungi_intervallo(dal_o, al_o)
+
+        for nome, dal_o, al_o in self.ferie_tecnici:
+            if nome not in self.tecnici:
+                continue
+            dal_o, al_o = _taglia(dal_o, al_o)
+            if al_o < dal_o:
+                continue
+            self.tecnici[nome].giorni_bloccati.aggiungi_intervallo(dal_o, al_o)
         
+        self._indice_disponibilita = None
         return self.tecnici
+
+    def in_ferie(self, nome: str, data_str: str, tipo: str = "tecnico") -> bool:
+        """Indica se un tecnico (o aiutante) è in ferie in una data YYYY-MM-DD."""
+        indice = self.ferie_aiutanti if tipo == "aiutante" else self.ferie_tecnici
+        return indice.in_ferie(nome, self._str_to_ord(data_str))
+
+    def in_ferie_tra(self, dal: str, al: str, tipo: str = "tecnico") -> List[str]:
+        """Ritorna chi ha ferie nell'intervallo [dal, al] (date YYYY-MM-DD)."""
+        indice = self.ferie_aiutanti if tipo == "aiutante" else self.ferie_tecnici
+        return indice.in_ferie_tra(self._str_to_ord(dal), self._str_to_ord(al))
     
     def get_reperibile_data(self, data_str: str) -> Tuple[str, str]:
         """Ritorna (tecnico, tipo) per una data specifica."""
-        for tecnico_nome, tecnico in self.tecnici.items():
-            if data_str in tecnico.giorni_reperibili:
-                return (tecnico_nome, tecnico.giorni_reperibili[data_str])
-        return ("", "")
+        o = self._ord_per_str.get(data_str)
+        if o is None:
+            try:
+                o = self._str_to_data(data_str).toordinal()
+            except Exception:
+                return ("", "")
+        voce = self._voce(o)
+        if voce is None:
+            return ("", "")
+        return (voce[0], voce[1])
     
     def get_aiutante_data(self, data_str: str) -> str:
         """Ritorna l'aiutante per una data specifica."""
-        return self.aiutante_per_data.get(data_str, "")
+        o = self._ord_per_str.get(data_str)
+        if o is None:
+            return ""
+        aiutante = self._col_aiutante[o - self._ord_base]
+        return self._nomi_aiutanti[aiutante] if aiutante >= 0 else ""
     
+    def iter_assegnazioni(
+        self, dal: Optional[str] = None, al: Optional[str] = None
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Genera (data, [tecnico, tipo, aiutante]) per i giorni assegnati tra dal e al
+        (YYYY-MM-DD, inclusi; default tutto il periodo), leggendo direttamente le colonne.
+        """
+        inizio = self._inizio
+        fine = self._fine
+        if dal:
+            inizio = max(inizio, self._str_to_ord(dal))
+        if al:
+            fine = min(fine, self._str_to_ord(al))
+
+        # Aiutante per questo giorno (se configurato)
+        aiutanti_attivi = bool(self.AIUTANTI) and bool(self.date_aiutanti)
+
+        for o in range(inizio, fine + 1):
+            voce = self._voce(o)
+            if voce is not None:
+                aiutante = voce[2] if aiutanti_attivi else ""
+                yield self._ord_to_str(o), [voce[0], voce[1], aiutante]
+
     @property
     def assegnazioni(self) -> Dict:
-        """Restituisce un dict di tutte le assegnazioni con tecnici e aiutanti."""
-        risultato = {}
-        anno_start = datetime(self.anno, 1, 1)
-        anno_end = datetime(self.anno, 12, 31)
-
-        aiutanti_attivi = bool(self.AIUTANTI) and bool(self.date_aiutanti)
-        
-        data_corrente = anno_start
-        while data_corrente <= anno_end:
-            data_str = self._data_to_str(data_corrente)
-            tecnico, tipo = self.get_reperibile_data(data_str)
-            
-            if tecnico:
-                # Calcola l'aiutante per questo giorno (se configurato)
-                aiutante = ""
-                if aiutanti_attivi:
-                    aiutante = self.aiutante_per_data.get(data_str, "")
-                
-                risultato[data_str] = [tecnico, tipo, aiutante]
-            
-            data_corrente += timedelta(days=1)
-        
-        return risultato
+        """
+        Restituisce un dict di tutte le assegnazioni con tecnici e aiutanti.
+        La vista è materializzata una volta e condivisa finché il calendario non cambia:
+        va trattata in sola lettura (per una copia modificabile usare dict(...)).
+        """
+        if self._vista_assegnazioni is None:
+            self._vista_assegnazioni = dict(self.iter_assegnazioni())
+        return self._vista_assegnazioni
     
+    def get_range(self, dal: str, al: str) -> Dict[str, List[str]]:
+        """
+        Assegnazioni {data: [tecnico, tipo, aiutante]} tra dal e al (YYYY-MM-DD, inclusi),
+        limitate al periodo del calendario. Costo proporzionale ai giorni dell'intervallo.
+        """
+        if self._str_to_ord(al) < self._str_to_ord(dal):
+            raise ValueError("Intervallo non valido: 'al' prima di 'dal'")
+        return dict(self.iter_assegnazioni(dal, al))
+
+    def _unita_turno(self, o: int) -> Tuple[int, ...]:
+        """Giorni del turno che contiene la data o: il weekend (sabato + domenica) è un turno unico."""
+        voce = self._voce(o)
+        if voce is None:
+            return ()
+        if voce[1] != "weekend":
+            return (o,)
+        sabato = o if self._weekday(o) == 5 else o - 1
+        return tuple(g for g in (sabato, sabato + 1) if self._voce(g) is not None and self._voce(g)[:2] == voce[:2])
+
+    def _giorni_bloccati_da(self, o: int, tipo: str) -> List[Tuple[int, int]]:
+        """Intervalli (dal, al) bloccati da un turno importante (festivo, o weekend riferito al sabato)."""
+        if tipo == "festivo":
+            return [(o - self.GIORNI_BLOCCO, o - 1), (o + 1, o + self.GIORNI_BLOCCO)]
+        if tipo == "weekend" and self._weekday(o) == 5:
+            return [(o - self.GIORNI_BLOCCO, o - 1), (o + 2, o + self.GIORNI_BLOCCO + 1)]
+        return []
+
+    def _conflitti_locali(self, nome: str, giorni: Tuple[int, ...]) -> List[str]:
+        """
+        Violazioni (ferie, regola dei 7 giorni) che coinvolgono i turni di un tecnico nei giorni indicati.
+        Si esaminano solo i turni del tecnico nella finestra in cui un blocco può toccare quei giorni;
+        eventuali violazioni preesistenti altrove non vengono riportate.
+        """
+        pos = self._pos_tecnico[nome]
+        raggio = self.GIORNI_BLOCCO + 2
+        turni = {}
+        for o in range(min(giorni) - raggio, max(giorni) + raggio + 1):
+            i = o - self._ord_base
+            if 0 <= i < len(self._col_tecnico) and self._col_tecnico[i] == pos:
+                turni[o] = TIPI_TURNO[self._col_tipo[i]]
+
+        errori = []
+        for g in giorni:
+            if self.ferie_tecnici.in_ferie(nome, g):
+                errori.append(f"{nome} è in ferie il {self._ord_to_str(g)}")
+        for o, tipo in turni.items():
+            for dal_o, al_o in self._giorni_bloccati_da(o, tipo):
+                for altro in range(dal_o, al_o + 1):
+                    if altro in turni and (o in giorni or altro in giorni):
+                        errori.append(
+                            f"{nome} assegnato il {self._ord_to_str(altro)} ma ha {tipo} il "
+                            f"{self._ord_to_str(o)} (regola {self.GIORNI_BLOCCO} giorni)"
+                        )
+        return errori
+
+    def scambia(self, data: str, tecnico: Optional[str] = None, data_scambio: Optional[str] = None) -> List[str]:
+        """
+        Cambio turno senza rigenerare il calendario.
+
+        - con `tecnico`: il turno della data (l'intero weekend, se è un weekend) passa a quel tecnico;
+        - con `data_scambio`: i titolari dei turni delle due date si scambiano.
+
+        Ferie, regola dei 7 giorni e assegnazione unica per data vengono verificate solo attorno
+        ai turni toccati; in caso di violazione il calendario resta invariato e si solleva
+        ValueError con l'elenco dei problemi. Ritorna le date modificate (YYYY-MM-DD).
+        """
+        if (tecnico is None) == (data_scambio is None):
+            raise ValueError("Indicare un tecnico oppure una data con cui scambiare il turno")
+
+        unita_a = self._unita_turno(self._str_to_ord(data))
+        if not unita_a:
+            raise ValueError(f"Nessun turno assegnato il {data}")
+        titolare_a = self._voce(unita_a[0])[0]
+
+        if data_scambio is not None:
+            unita_b = self._unita_turno(self._str_to_ord(data_scambio))
+            if not unita_b:
+                raise ValueError(f"Nessun turno assegnato il {data_scambio}")
+            titolare_b = self._voce(unita_b[0])[0]
+            if titolare_a == titolare_b:
+                raise ValueError(f"Entrambi i turni sono già di {titolare_a}")
+            spostamenti = [(g, titolare_b) for g in unita_a] + [(g, titolare_a) for g in unita_b]
+        else:
+            if tecnico not in self.tecnici:
+                raise ValueError(f"Tecnico non trovato: {tecnico}")
+            if tecnico == titolare_a:
+                raise ValueError(f"Il turno del {data} è già di {tecnico}")
+            spostamenti = [(g, tecnico) for g in unita_a]
+
+        for g, _ in spostamenti:
+            if not self._inizio <= g <= self._fine:
+                raise ValueError(f"Il turno del {self._ord_to_str(g)} è fuori dal periodo del calendario")
+            if g in self._fissi:
+                raise ValueError(f"Il turno del {self._ord_to_str(g)} è fisso e non può essere ceduto")
+
+        precedenti = [(g, self._voce(g)[0]) for g, _ in spostamenti]
+        for g, nome in spostamenti:
+            self._cambia_tecnico(g, nome)
+
+        errori = []
+        coinvolti = sorted({nome for _, nome in spostamenti})
+        for nome in coinvolti:
+            giorni = tuple(g for g, n in spostamenti if n == nome)
+            errori.extend(self._conflitti_locali(nome, giorni))
+        if errori:
+            for g, nome in precedenti:
+                self._cambia_tecnico(g, nome)
+            raise ValueError("; ".join(errori))
+
+        self._ricostruisci_blocchi(sorted({nome for _, nome in precedenti} | set(coinvolti)))
+        return sorted(self._ord_to_str(g) for g, _ in spostamenti)
+
+    def _costruisci_indice_disponibilita(self) -> List[int]:
+        """
+        Per ogni giorno del periodo, bitmask delle posizioni dei tecnici che potrebbero prenderne il turno:
+        non titolari, non bloccati (ferie o regola 7 giorni) e, per weekend e festivi, senza altri
+        turni nei giorni che il nuovo blocco coprirebbe. Un weekend va coperto per intero.
+        """
+        n_giorni = len(self._col_tecnico)
+        turni_bits = {pos: 0 for pos in self._pos_tecnico.values()}
+        for i, pos in enumerate(self._col_tecnico):
+            if pos >= 0:
+                turni_bits[pos] |= 1 << i
+        record = [
+            (tecnico._pos, tecnico.giorni_bloccati.bits, turni_bits[tecnico._pos])
+            for tecnico in self.tecnici.values()
+        ]
+
+        blocco = self.GIORNI_BLOCCO
+        finestra = (1 << blocco) - 1
+        weekend = _CODICE_TIPO["weekend"]
+        festivo = _CODICE_TIPO["festivo"]
+        indice = [0] * n_giorni
+        inizio = self._inizio - self._ord_base
+        fine = self._fine - self._ord_base
+        for i in range(inizio, fine + 1):
+            tipo = self._col_tipo[i]
+            if tipo == weekend:
+                sabato = i if self._weekday(self._ord_base + i) == 5 else i - 1
+                giorni = 3 << sabato
+                vicini = (finestra << (sabato - blocco)) | (finestra << (sabato + 2))
+            elif tipo == festivo:
+                giorni = 1 << i
+                vicini = (finestra << (i - blocco)) | (finestra << (i + 1))
+            else:
+                giorni = 1 << i
+                vicini = 0
+            titolare = self._col_tecnico[i]
+            liberi = 0
+            for pos, bloccati, turni in record:
+                if pos == titolare or (bloccati | turni) & giorni or turni & vicini:
+                    continue
+                liberi |= 1 << pos
+            indice[i] = liberi
+        return indice
+
+    def conflitti_fissi(self, dal: Optional[str] = None, al: Optional[str] = None) -> List[str]:
+        """
+        Assegnazioni fisse incompatibili tra loro: lo stesso tecnico fissato entro il blocco
+        di 7 giorni di un suo weekend o festivo fissato. Si riportano le coppie con un turno
+        tra dal e al (YYYY-MM-DD, default il periodo del calendario); non serve generare.
+        """
+        return self._conflitti_fissi(
+            self._str_to_ord(dal) if dal else self._inizio,
+            self._str_to_ord(al) if al else self._fine,
+        )
+
+    def disponibili(self, data_str: str) -> Dict[str, List[str]]:
+        """
+        Chi potrebbe coprire il turno di una data, ad esempio per sostituire un assente:
+        {"tecnici": [...], "aiutanti": [...]}, ordinati per carico (turni già assegnati)
+        e poi per ordine di rotazione. Il titolare e l'aiutante del giorno sono esclusi.
+
+        L'indice dei tecnici si costruisce alla prima richiesta e resta valido finché
+        il calendario non cambia: le richieste successive sono un lookup.
+        """
+        o = self._str_to_ord(data_str)
+        if not self._inizio <= o <= self._fine:
+            raise ValueError(f"Data fuori dal periodo del calendario: {data_str}")
+        if self._indice_disponibilita is None:
+            self._indice_disponibilita = self._costruisci_indice_disponibilita()
+        i = o - self._ord_base
+
+        liberi = self._indice_disponibilita[i]
+        tecnici = [nome for nome, pos in self._pos_tecnico.items() if (liberi >> pos) & 1]
+        tecnici.sort(key=lambda nome: (self._turni[self._pos_tecnico[nome]], self._pos_tecnico[nome]))
+
+        aiutante = self._col_aiutante[i]
+        aiutanti = []
+        for nome in dict.fromkeys(self.AIUTANTI):
+            pos = self._pos_aiutante[nome]
+            bloccati = self.aiutanti_giorni_bloccati.get(nome)
+            if pos == aiutante or (bloccati and o in bloccati):
+                continue
+            aiutanti.append(nome)
+        aiutanti.sort(key=lambda nome: (self._turni_aiutanti[self._pos_aiutante[nome]], self._pos_aiutante[nome]))
+        return {"tecnici": tecnici, "aiutanti": aiutanti}
+
     def get_mese(self, anno: int, mese: int) -> Dict[str, Tuple[str, str]]:
         """Ritorna il calendario per un mese specifico."""
         mese_calendario = {}
-        anno_mese = datetime(anno, mese, 1)
+        primo = date(anno, mese, 1).toordinal()
         
         # Iterate attraverso tutti i giorni del mese
-        for giorno in range(1, cal.monthrange(anno, mese)[1] + 1):
-            data = datetime(anno, mese, giorno)
-            data_str = self._data_to_str(data)
-            tecnico, tipo = self.get_reperibile_data(data_str)
-            mese_calendario[data_str] = (tecnico, tipo)
+        for o in range(primo, primo + cal.monthrange(anno, mese)[1]):
+            voce = self._voce(o)
+            mese_calendario[self._ord_to_str(o)] = (voce[0], voce[1]) if voce else ("", "")
         
         return mese_calendario
 
+    def stato_rotazione_finale(self) -> Dict:
+        """
+        Stato di rotazione a fine periodo (di norma l'anno), da usare come partenza per il successivo:
+        {"next_tecnico_index": int, "next_aiutante_offset": int, "festivi": {key: indice}}.
+        """
+        next_tecnico_index = 0
+        if self.TECNICI:
+            next_tecnico_index = int(self.indice_rotazione % len(self.TECNICI))
+
+        next_aiutante_offset = int(self.aiutanti_offset or 0)
+        if self.AIUTANTI:
+            # Trova l'ultimo aiutante assegnato nell'anno e imposta il successivo come start per l'anno seguente
+            last_name = None
+            for o in range(self._fine, self._inizio - 1, -1):
+                voce = self._voce(o)
+                if voce is not None and voce[2]:
+                    last_name = voce[2]
+                    break
+            if last_name in self.AIUTANTI:
+                i = self.AIUTANTI.index(last_name)
+                next_name = self.AIUTANTI[(i + 1) % len(self.AIUTANTI)]
+                next_aiutante_offset = self.AIUTANTI.index(next_name)
+
+        return {
+            "next_tecnico_index": next_tecnico_index,
+            "next_aiutante_offset": next_aiutante_offset,
+            "festivi": dict(self.festivi_rotation_next),
+        }
+
+    def _segna_checkpoint(self, lunedi: int, passaggio: int):
+        """Memorizza l'indice di rotazione corrente per la settimana (0 = weekend, 1 = feriali)."""
+        voce = self._checkpoint.setdefault(lunedi, [None, None])
+        voce[passaggio] = self.indice_rotazione % max(1, len(self.TECNICI))
+
+    def _stato_iniziale(self) -> Dict:
+        """Configurazione di partenza da cui dipendono i checkpoint di rotazione."""
+        return {
+            "tecnici": list(self.TECNICI),
+            "rotation_start_index": int(self.ROTATION_START_INDEX or 0),
+            "aiutanti_offset": int(self.AIUTANTI_OFFSET or 0),
+            "festivi": {str(k): int(v) for k, v in self.FESTIVI_ROTATION_START.items()},
+            "inizio": self.inizio,
+            "fissi": {self._ord_to_str(o): nome for o, nome in sorted(self._fissi.items())},
+        }
+
+    def checkpoint_rotazione(self) -> Dict:
+        """
+        Checkpoint settimanali dello stato del generatore, serializzabili in JSON:
+        {"stato": <configurazione di partenza>, "settimane": {"YYYY-MM-DD" (lunedì): [w, f]}}
+        dove w è l'indice di rotazione prima del sabato e f quello prima del lunedì.
+
+        La rotazione festivi e la posizione aiutanti dipendono solo dallo stato di partenza
+        (per festività e per data), quindi bastano "stato" e i due indici per riprendere la
+        generazione esattamente da una qualunque settimana (vedi patch_assegnazioni).
+        """
+        return {
+            "stato": self._stato_iniziale(),
+            "settimane": {self._ord_to_str(o): list(v) for o, v in sorted(self._checkpoint.items())},
+        }
+
+    def _carica_checkpoint(self, checkpoint: Optional[Dict]) -> bool:
+        """Carica checkpoint salvati se compatibili con la configurazione dell'istanza."""
+        if not isinstance(checkpoint, dict) or checkpoint.get("stato") != self._stato_iniziale():
+            return False
+        settimane = checkpoint.get("settimane")
+        if not isinstance(settimane, dict):
+            return False
+        self._checkpoint = {}
+        for data_str, voce in settimane.items():
+            try:
+                self._checkpoint[self._str_to_ord(data_str)] = [
+                    None if v is None else int(v) for v in voce[:2]
+                ]
+            except Exception:
+                continue
+        return bool(self._checkpoint)
+
+    @classmethod
+    def genera_anni(
+        cls, anno_da: int, anno_a: int, stati: Optional[Dict[int, Dict]] = None, **config
+    ) -> Dict[int, "CalendarioReperibilita"]:
+        """
+        Genera in un'unica passata gli anni da anno_da ad anno_a (inclusi), portando avanti
+        indice di rotazione, offset aiutanti e rotazione festivi da un anno al successivo.
+
+        `stati` (anno -> stato_rotazione_finale()) fa da memo: la catena riparte dall'anno
+        più recente il cui predecessore è già noto, e viene aggiornato con ogni anno generato.
+        Senza memo, il primo anno parte dallo stato passato nei parametri del costruttore.
+        Ritorna i calendari effettivamente generati (sempre incluso anno_a).
+        """
+        if stati is None:
+            stati = {}
+        config.pop("anno", None)
+        stato: Dict = {
+            "next_tecnico_index": config.pop("rotation_start_index", None),
+            "next_aiutante_offset": config.pop("aiutanti_offset", None),
+            "festivi": config.pop("festivi_rotation_start", None),
+        }
+
+        inizio = anno_da
+        for anno in range(anno_a, anno_da, -1):
+            if anno - 1 in stati:
+                inizio = anno
+                break
+        if inizio - 1 in stati:
+            stato = stati[inizio - 1]
+
+        calendari: Dict[int, CalendarioReperibilita] = {}
+        for anno in range(inizio, anno_a + 1):
+            calendario = cls(
+                anno=anno,
+                rotation_start_index=stato.get("next_tecnico_index"),
+                aiutanti_offset=stato.get("next_aiutante_offset"),
+                festivi_rotation_start=stato.get("festivi"),
+                **config,
+            )
+            calendario.genera_calendario()
+            stato = calendario.stato_rotazione_finale()
+            stati[anno] = stato
+            calendari[anno] = calendario
+        return calendari
+
     @classmethod
-    def patch_assegnazioni(cls, assegnazioni_base: Dict[str, List], dal: str, al: str) -> Dict[str, List]:
+    def genera_squadre(
+        cls,
+        anno_da: int,
+        anno_a: int,
+        squadre: Dict[str, Dict],
+        stati: Optional[Dict[str, Dict[int, Dict]]] = None,
+        ferie: Optional[List[Dict[str, str]]] = None,
+    ) -> Dict[str, Dict[int, "CalendarioReperibilita"]]:
+        """
+        Genera in un unico lotto i calendari di più squadre (reperibilità indipendenti).
+
+        `squadre` associa al nome di ogni squadra i parametri del costruttore (tecnici, aiutanti,
+        date_aiutanti, rotation_start_index, ...): ogni squadra ha la propria rotazione, portata
+        avanti anno per anno come in genera_anni; `stati` (squadra -> memo di genera_anni) viene
+        aggiornato. Le ferie sono una lista unica: a ogni squadra arrivano solo quelle dei suoi
+        membri, così il costo resta lineare nel numero di persone anche con molte squadre.
+        """
+        if stati is None:
+            stati = {}
+
+        ferie_per_nome: Dict[str, List[Dict[str, str]]] = {}
+        for entry in ferie or []:
+            nome = (entry.get("nome") or "").strip()
+            if nome:
+                ferie_per_nome.setdefault(nome, []).append(entry)
+
+        calendari: Dict[str, Dict[int, CalendarioReperibilita]] = {}
+        for nome_squadra, parametri in squadre.items():
+            parametri = dict(parametri)
+            if ferie is not None:
+                membri = set(parametri.get("tecnici") or cls.TECNICI) | set(parametri.get("aiutanti") or [])
+                parametri["ferie"] = [e for nome in membri for e in ferie_per_nome.get(nome, [])]
+            calendari[nome_squadra] = cls.genera_anni(
+                anno_da, anno_a, stati.setdefault(nome_squadra, {}), **parametri
+            )
+        return calendari
+
+    @classmethod
+    def da_assegnazioni(cls, assegnazioni: Dict[str, List], **config) -> "CalendarioReperibilita":
+        """
+        Ricostruisce un calendario da assegnazioni salvate ({data: [tecnico, tipo, aiutante]}),
+        ad esempio la cache della PWA dopo patch o modifiche manuali, senza rigenerarlo:
+        colonne, contatori e blocchi (ferie + regola 7 giorni) tornano coerenti con le date.
+        I parametri sono quelli del costruttore; le date fuori dal periodo vengono ignorate.
+        """
+        calendario = cls(**config)
+        for data_str, arr in assegnazioni.items():
+            if not isinstance(arr, list) or len(arr) < 2:
+                continue
+            o = calendario._ord_per_str.get(data_str)
+            tecnico = calendario.tecnici.get(arr[0])
+            if o is None or tecnico is None or arr[1] not in TIPI_TURNO[1:] \
+                    or not calendario._inizio <= o <= calendario._fine:
+                continue
+            calendario._registra_turno(tecnico, o, arr[1])
+            calendario._conta_turno(tecnico.nome)
+            aiutante = arr[2] if len(arr) >= 3 else ""
+            if aiutante:
+                calendario._registra_aiutante(o, aiutante)
+                calendario._turni_aiutanti[calendario._pos_aiutante[aiutante]] += 1
+        calendario._ricostruisci_blocchi()
+        return calendario
+
+    @classmethod
+    def patch_assegnazioni(
+        cls,
+        assegnazioni_base: Dict[str, List],
+        dal: str,
+        al: str,
+        checkpoint: Optional[Dict] = None,
+        **config,
+    ) -> Dict[str, List]:
         """
         Rigenera solo un intervallo di date (dal/al) mantenendo il resto del calendario invariato.
 
         Nota: per rispettare la regola dei blocchi, l'intervallo viene automaticamente esteso
         di +/- GIORNI_BLOCCO e normalizzato per includere weekend completi.
+        I parametri opzionali (tecnici, aiutanti, ferie, ...) sono quelli del costruttore.
+
+        Il lavoro è locale alla finestra: si leggono solo le assegnazioni base nel suo
+        alone (quelle i cui blocchi possono toccarla) e le ferie vengono applicate solo
+        dentro la finestra.
+
+        Se `checkpoint` (da checkpoint_rotazione() della generazione che ha prodotto la base)
+        è compatibile con la configurazione, all'inizio della finestra si ripristina lo stato
+        di rotazione che la generazione aveva in quella settimana. Solo se gli input sono gli
+        stessi della base la finestra coincide con la generazione completa; con ferie o altri
+        input cambiati è una riparazione locale (il resto resta quello della base) e può
+        differire da ciò che darebbe una rigenerazione completa.
+        Senza checkpoint l'indice si ricava dall'ultimo evento prima della finestra (approssimazione).
+        I checkpoint delle settimane rigenerate vengono aggiornati nel dict ricevuto.
+
+        Il periodo di riferimento (a cui la finestra viene limitata e da cui parte la rotazione
+        passata nei parametri) è quello del costruttore (inizio/fine) se indicato; altrimenti
+        va dal 1 gennaio dell'anno di `dal` al 31 dicembre dell'anno di `al`, così una finestra
+        a cavallo d'anno (es. ferie tra dicembre e gennaio) si rigenera in modo continuo.
         """
 
         if not isinstance(assegnazioni_base, dict):
             raise ValueError("assegnazioni_base non valido")
 
-        tmp = cls()
-        try:
-            year = int(str(dal)[:4])
-        except Exception:
-            year = tmp.anno
-        tmp.anno = year
-        dal_dt = tmp._str_to_data(dal)
-        al_dt = tmp._str_to_data(al)
-        if al_dt < dal_dt:
+        if not config.get("inizio"):
+            try:
+                config["anno"] = int(str(dal)[:4])
+                if int(str(al)[:4]) > config["anno"] and not config.get("fine"):
+                    config["inizio"] = f"{config['anno']}-01-01"
+                    config["fine"] = f"{int(str(al)[:4])}-12-31"
+            except Exception:
+                pass
+        cal = cls(**config)
+        dal_o = cal._str_to_ord(dal)
+        al_o = cal._str_to_ord(al)
+        if al_o < dal_o:
             raise ValueError("Intervallo non valido: 'al' prima di 'dal'")
 
         # Estendi finestra per minimizzare propagazione oltre il periodo richiesto
-        start_dt = dal_dt - timedelta(days=tmp.GIORNI_BLOCCO)
-        end_dt = al_dt + timedelta(days=tmp.GIORNI_BLOCCO)
+        start = dal_o - cal.GIORNI_BLOCCO
+        end = al_o + cal.GIORNI_BLOCCO
 
         # Normalizza per includere weekend completi (se include domenica -> includi sabato; se include sabato -> includi domenica)
-        if start_dt.weekday() == 6:  # domenica
-            start_dt = start_dt - timedelta(days=1)
-        if end_dt.weekday() == 5:  # sabato
-            end_dt = end_dt + timedelta(days=1)
-
-        # Limita all'anno
-        year_start = datetime(year, 1, 1)
-        year_end = datetime(year, 12, 31)
-        if start_dt < year_start:
-            start_dt = year_start
-        if end_dt > year_end:
-            end_dt = year_end
-
-        start_str = tmp._data_to_str(start_dt)
-        end_str = tmp._data_to_str(end_dt)
-
-        cal = cls()
-        cal.anno = year
-        festivi = set(cls.get_festivi(year))
-        cal._applica_ferie()
-
-        # Carica assegnazioni base fuori finestra (lock)
-        for data_str, arr in assegnazioni_base.items():
+        if cal._weekday(start) == 6:  # domenica
+            start -= 1
+        if cal._weekday(end) == 5:  # sabato
+            end += 1
+
+        # Limita al periodo
+        year_start = cal._inizio
+        year_end = cal._fine
+        start = max(start, year_start)
+        end = min(end, year_end)
+
+        festivi_dettaglio = cal._festivi
+        festivi = cal._festivi_set
+        cal._applica_ferie(start, end)
+        esatto = cal._carica_checkpoint(checkpoint)
+
+        # Le festività del periodo che precedono la finestra hanno già fatto avanzare la propria
+        # rotazione (una volta per ricorrenza): conta solo quando una festività ricorre più
+        # volte nel periodo, cioè per finestre oltre il primo anno
+        for festivo, key in festivi_dettaglio:
+            if festivo >= start:
+                break
+            nome_fisso = cal._fissi.get(festivo)
+            if nome_fisso is None and cal._weekday(festivo) >= 5:
+                sabato = festivo if cal._weekday(festivo) == 5 else festivo - 1
+                nome_fisso = cal._fissi.get(sabato) or cal._fissi.get(sabato + 1)
+            if nome_fisso is not None and key not in cal.festivi_rotation_index:
+                cal.festivi_rotation_index[key] = cal._pos_tecnico[nome_fisso]
+            cal._avanza_rotazione_festivo(key, int(cal.festivi_rotation_index.get(key, 0) or 0))
+
+        # Carica le assegnazioni base fuori finestra (lock), solo nell'alone i cui blocchi
+        # possono ricadere nella finestra (il blocco weekend arriva fino a sabato + GIORNI_BLOCCO + 1)
+        alone = cal.GIORNI_BLOCCO + 2
+        giorni_alone = list(range(start - alone, start)) + list(range(end + 1, end + alone + 1))
+        for o in giorni_alone:
+            data_str = cal._ord_to_str(o)
+            arr = assegnazioni_base.get(data_str)
             if not isinstance(arr, list) or len(arr) < 2:
                 continue
-            if start_str <= data_str <= end_str:
-                continue
 
             tecnico_nome = arr[0]
             tipo = arr[1]
@@ -641,119 +1611,102 @@ class CalendarioReperibilita:
             if tecnico_nome not in cal.tecnici:
                 continue
             tecnico = cal.tecnici[tecnico_nome]
-            tecnico.giorni_reperibili[data_str] = tipo
+            cal._registra_turno(tecnico, o, tipo)
             if aiutante:
-                cal.aiutante_per_data[data_str] = aiutante
+                cal._registra_aiutante(o, aiutante)
 
             # Ricrea i blocchi per i turni importanti già fissati
-            try:
-                weekday = cal._str_to_data(data_str).weekday()
-            except Exception:
-                weekday = None
-
             if tipo == "festivo":
-                cal._aggiungi_blocco(tecnico, data_str)
-            elif tipo == "weekend" and weekday == 5:
-                cal._aggiungi_blocco_weekend(tecnico, data_str)
-
-        # Imposta l'indice rotazione in modo coerente (approssimazione: prossimo dopo ultimo evento prima della finestra)
-        last_event_tecnico = None
-        cur = year_start
-        while cur < start_dt:
-            d = tmp._data_to_str(cur)
-            arr = assegnazioni_base.get(d)
+                cal._aggiungi_blocco(tecnico, o)
+            elif tipo == "weekend" and cal._weekday(o) == 5:
+                cal._aggiungi_blocco_weekend(tecnico, o)
+
+        n_tecnici = max(1, len(cal.TECNICI))
+
+        def _indice_dopo(nome: str) -> Optional[int]:
+            if nome in cal._pos_tecnico:
+                return (cal._pos_tecnico[nome] + 1) % n_tecnici
+            return None
+
+        # Indice di partenza approssimato: prossimo dopo l'ultimo evento prima della finestra.
+        # Si cerca all'indietro dalla finestra: di norma basta il giorno precedente.
+        indice_approssimato = None
+        for o in range(start - 1, year_start - 1, -1):
+            arr = assegnazioni_base.get(cal._ord_to_str(o))
             if isinstance(arr, list) and len(arr) >= 2:
-                tecnico_nome = arr[0]
-                tipo = arr[1]
-                if tipo != "weekend" or cur.weekday() == 5:
-                    last_event_tecnico = tecnico_nome
-            cur += timedelta(days=1)
+                if arr[1] != "weekend" or cal._weekday(o) == 5:
+                    indice_approssimato = _indice_dopo(arr[0])
+                    break
 
-        if last_event_tecnico in cal.TECNICI:
-            cal.indice_rotazione = (cal.TECNICI.index(last_event_tecnico) + 1) % max(1, len(cal.TECNICI))
+        if indice_approssimato is not None:
+            cal.indice_rotazione = indice_approssimato
 
         # Pulisci (nel caso) le assegnazioni dentro finestra
-        for tecnico in cal.tecnici.values():
-            for data_str in list(tecnico.giorni_reperibili.keys()):
-                if start_str <= data_str <= end_str:
-                    tecnico.giorni_reperibili.pop(data_str, None)
-        for data_str in list(cal.aiutante_per_data.keys()):
-            if start_str <= data_str <= end_str:
-                cal.aiutante_per_data.pop(data_str, None)
-
-        # 1) Gestisci 1 gennaio SOLO per il 2026 (obbligatorio)
-        obbligatorio = f"{year}-01-01"
-        if year == 2026 and start_str <= obbligatorio <= end_str:
-            data_str = obbligatorio
-            tecnico = cal.tecnici.get("Dardha")
-            if tecnico is None:
-                raise ValueError("Tecnico obbligatorio 'Dardha' mancante")
-            if data_str in tecnico.giorni_bloccati:
-                raise ValueError(f"Conflitto ferie: Dardha è in ferie il {data_str} (obbligatorio)")
-            tecnico.giorni_reperibili[data_str] = "festivo"
-            cal._aggiungi_blocco(tecnico, data_str)
-            cal.aiutante_per_data[data_str] = cal._assegna_aiutante(data_str)
-
-        # 2) Festivi nella finestra (replica la logica principale)
-        for festivo_str in festivi:
-            if not (start_str <= festivo_str <= end_str):
-                continue
-            if year == 2026 and festivo_str == obbligatorio:
+        for o in range(start, end + 1):
+            cal._rimuovi_turno(o)
+
+        # 1) Assegnazioni fisse nella finestra (es. il 1 gennaio 2026 a Dardha)
+        cal._applica_fissi(start, end)
+
+        # 2) Festivi nella finestra, con la rotazione dedicata per festività (come genera_calendario)
+        for festivo, key in festivi_dettaglio:
+            if not (start <= festivo <= end):
                 continue
 
-            festivo_data = cal._str_to_data(festivo_str)
             # Se già assegnato (es. da weekend/fisso), salta
-            if any(festivo_str in t.giorni_reperibili for t in cal.tecnici.values()):
+            if cal._assegnato(festivo):
                 continue
 
-            if festivo_data.weekday() in [5, 6]:
+            weekday = cal._weekday(festivo)
+            if weekday in [5, 6]:
                 # Festivo in weekend: assegna weekend completo sul sabato
-                sabato_str = festivo_str if festivo_data.weekday() == 5 else cal._data_to_str(festivo_data - timedelta(days=1))
-                domenica_str = cal._data_to_str(cal._str_to_data(sabato_str) + timedelta(days=1))
-                if not (start_str <= sabato_str <= end_str and start_str <= domenica_str <= end_str):
-                    continue
-                # Se già assegnato, salta
-                if any(sabato_str in t.giorni_reperibili for t in cal.tecnici.values()):
+                sabato = festivo if weekday == 5 else festivo - 1
+                if cal._assegnato(sabato):
                     continue
-                cal._assegna_weekend(sabato_str)
+                cal._assegna_weekend_con_rotazione_festivo(sabato, key)
             else:
-                cal._assegna_turno(festivo_str, "festivo")
+                cal._assegna_festivo_con_rotazione(festivo, key)
 
         # 3) Weekend nella finestra (solo se non festivo)
-        cur = start_dt
-        while cur <= end_dt:
-            if cur.weekday() == 5:
-                sabato_str = tmp._data_to_str(cur)
-                domenica_str = tmp._data_to_str(cur + timedelta(days=1))
-                if sabato_str in festivi or domenica_str in festivi:
-                    cur += timedelta(days=1)
-                    continue
-                if any(sabato_str in t.giorni_reperibili for t in cal.tecnici.values()):
-                    cur += timedelta(days=1)
-                    continue
-                if start_str <= sabato_str <= end_str and start_str <= domenica_str <= end_str:
-                    cal._assegna_weekend(sabato_str)
-            cur += timedelta(days=1)
-
-        # 4) Feriali nella finestra
-        cur = start_dt
-        while cur <= end_dt:
-            data_str = tmp._data_to_str(cur)
-            if cur.weekday() < 5:
-                è_festivo_feriale = (data_str in festivi and cur.weekday() < 5)
-                if not è_festivo_feriale:
-                    if not any(data_str in t.giorni_reperibili for t in cal.tecnici.values()):
-                        cal._assegna_turno(data_str, "feriale")
-            cur += timedelta(days=1)
+        primo_sabato = start + (5 - cal._weekday(start)) % 7
+        if esatto and primo_sabato <= end:
+            punto = cal._checkpoint.get(primo_sabato - 5, [None, None])[0]
+            if punto is not None:
+                cal.indice_rotazione = punto
+        for sabato in range(primo_sabato, end + 1, 7):
+            cal._segna_checkpoint(sabato - 5, 0)
+            if sabato in festivi or (sabato + 1) in festivi:
+                continue
+            if cal._assegnato(sabato) or cal._assegnato(sabato + 1):
+                continue
+            cal._assegna_weekend(sabato)
+
+        # 4) Feriali nella finestra: con i checkpoint si riparte dal lunedì della settimana
+        # e si riallinea l'indice sui feriali base tra quel lunedì e l'inizio finestra
+        lunedi = start - cal._weekday(start)
+        punto = cal._checkpoint.get(lunedi, [None, None])[1] if esatto else None
+        if punto is not None:
+            for o in range(max(lunedi, year_start), start):
+                arr = assegnazioni_base.get(cal._ord_to_str(o))
+                if isinstance(arr, list) and len(arr) >= 2 and arr[1] == "feriale":
+                    punto = _indice_dopo(arr[0])
+            if punto is not None:
+                cal.indice_rotazione = punto
+        for o in range(start, end + 1):
+            if o != start and cal._weekday(o) == 0:
+                cal._segna_checkpoint(o, 1)
+            if cal._weekday(o) < 5 and o not in festivi and not cal._assegnato(o):
+                cal._assegna_turno(o, "feriale")
+
+        # Aggiorna i checkpoint ricevuti per le settimane rigenerate
+        if esatto:
+            checkpoint["settimane"].update(cal.checkpoint_rotazione()["settimane"])
 
         # Merge: sostituisci solo le date nella finestra
         merged: Dict[str, List] = dict(assegnazioni_base)
-        cur = start_dt
-        while cur <= end_dt:
-            data_str = tmp._data_to_str(cur)
-            tecnico_nome, tipo = cal.get_reperibile_data(data_str)
-            if tecnico_nome:
-                merged[data_str] = [tecnico_nome, tipo, cal.aiutante_per_data.get(data_str, "")]
-            cur += timedelta(days=1)
+        for o in range(start, end + 1):
+            voce = cal._voce(o)
+            if voce is not None:
+                merged[cal._ord_to_str(o)] = [voce[0], voce[1], voce[2]]
 
         return merged
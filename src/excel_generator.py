@@ -38,8 +38,9 @@ class GeneratoreExcel:
         self.calendario = calendario
         self.anno = int(getattr(calendario, "anno", 2026) or 2026)
         # Cache assegnazioni per allineare Excel a UI/API (tecnico, tipo, aiutante)
+        # (vista materializzata del calendario, letta senza copiarla)
         try:
-            self._assegnazioni = dict(getattr(calendario, "assegnazioni", {}) or {})
+            self._assegnazioni = getattr(calendario, "assegnazioni", {}) or {}
         except Exception:
             self._assegnazioni = {}
         if hasattr(calendario, "get_festivi"):
@@ -0,0 +1,179 @@
+"""
+Modulo per la verifica di fattibilità prima della generazione.
+Dalle sole ferie e dalle regole dei blocchi stima, giorno per giorno, se il turno
+potrà essere coperto, senza generare il calendario.
+"""
+
+from typing import Dict, List, Optional
+
+from calendar_generator import CalendarioReperibilita
+
+
+def _differenze(n: int) -> List[int]:
+    return [0] * (n + 1)
+
+
+def _aggiungi(diff: List[int], dal: int, al: int, quanto: int = 1):
+    """Somma `quanto` sull'intervallo [dal, al] di un array alle differenze (estremi già nell'array)."""
+    dal = max(dal, 0)
+    al = min(al, len(diff) - 2)
+    if al >= dal:
+        diff[dal] += quanto
+        diff[al + 1] -= quanto
+
+
+def _cumula(diff: List[int]) -> List[int]:
+    out = []
+    totale = 0
+    for v in diff[:-1]:
+        totale += v
+        out.append(totale)
+    return out
+
+
+def verifica_fattibilita(
+    calendario: CalendarioReperibilita, dal: Optional[str] = None, al: Optional[str] = None
+) -> Dict:
+    """
+    Verifica di capacità su un calendario non ancora generato (costo lineare in giorni e periodi di ferie).
+
+    Per ogni turno del periodo del calendario (di norma l'anno: feriale, festivo o weekend intero) conta i tecnici non in ferie
+    e i turni importanti vicini il cui blocco di 7 giorni lo copre: ognuno di questi può
+    togliere un tecnico, quindi servono almeno 1 + blocchi tecnici liberi.
+
+    - impossibile: nessun tecnico libero, oppure i liberi sono tutti obbligati da un turno
+      importante vicino (assegnazione fissa o unico libero), oppure un'assegnazione fissa cade
+      nelle ferie del titolare; la generazione fallirebbe o scriverebbe "ERRORE: Nessun tecnico disponibile";
+    - fragile: i tecnici liberi non bastano nel caso peggiore, la copertura dipende dalla rotazione.
+
+    Args:
+        calendario: istanza configurata (tecnici, ferie, anno o periodo); non serve genera_calendario()
+        dal, al: limita il report ai turni che toccano l'intervallo (YYYY-MM-DD)
+
+    Returns:
+        {"anno", "fattibile", "impossibili": [...], "fragili": [...]} con voci
+        {"data", "tipo", "disponibili", "necessari"} (per i weekend la data è il sabato).
+    """
+    anno = calendario.anno
+    blocco = calendario.GIORNI_BLOCCO
+    inizio = calendario._inizio
+    fine = calendario._fine
+    # Indici relativi a `base`, con margine per i weekend e i blocchi ai bordi del periodo
+    base = inizio - blocco - 2
+    n_giorni = fine + blocco + 3 - base
+    n_tecnici = len(calendario.tecnici)
+
+    festivi = calendario._festivi_set
+    primo_sabato = inizio - 1 + (5 - calendario._weekday(inizio - 1)) % 7
+    sabati = list(range(primo_sabato, fine + 1, 7))
+
+    # Persone in ferie per giorno, e per weekend (almeno uno dei due giorni)
+    ferie_giorno = _differenze(n_giorni)
+    ferie_weekend = _differenze(len(sabati))
+    for nome, a, b in calendario.ferie_tecnici:
+        if nome not in calendario.tecnici:
+            continue
+        _aggiungi(ferie_giorno, a - base, b - base)
+        primo = max(0, -((primo_sabato - (a - 1)) // 7))
+        ultimo = (b - primo_sabato) // 7
+        _aggiungi(ferie_weekend, primo, min(ultimo, len(sabati) - 1))
+    ferie_giorno = _cumula(ferie_giorno)
+    ferie_weekend = _cumula(ferie_weekend)
+
+    # Quanti turni importanti (weekend, festivi feriali) bloccano ciascun giorno
+    coperture = _differenze(n_giorni)
+    for sabato in sabati:
+        _aggiungi(coperture, sabato - blocco - base, sabato - 1 - base)
+        _aggiungi(coperture, sabato + 2 - base, sabato + blocco + 1 - base)
+    for festivo in festivi:
+        if calendario._weekday(festivo) < 5:
+            _aggiungi(coperture, festivo - blocco - base, festivo - 1 - base)
+            _aggiungi(coperture, festivo + 1 - base, festivo + blocco - base)
+    coperture = _cumula(coperture)
+
+    filtro_dal = calendario._str_to_ord(dal) if dal else inizio
+    filtro_al = calendario._str_to_ord(al) if al else fine
+
+    def _liberi(giorni) -> List[str]:
+        return [
+            nome for nome in calendario.tecnici
+            if not any(calendario.ferie_tecnici.in_ferie(nome, g) for g in giorni)
+        ]
+
+    # Turni importanti con un solo tecnico libero: quel tecnico è obbligato e il suo blocco è certo
+    forzati: List[tuple] = []
+    for k, sabato in enumerate(sabati):
+        if n_tecnici - ferie_weekend[k] == 1:
+            forzati.append((_liberi((sabato, sabato + 1))[0], sabato - blocco, sabato + blocco + 1, (sabato, sabato + 1)))
+    for festivo in festivi:
+        if calendario._weekday(festivo) < 5 and n_tecnici - ferie_giorno[festivo - base] == 1:
+            forzati.append((_liberi((festivo,))[0], festivo - blocco, festivo + blocco, (festivo,)))
+    for o, nome in calendario._fissi.items():
+        if calendario._weekday(o) >= 5:
+            sabato = o if calendario._weekday(o) == 5 else o - 1
+            forzati.append((nome, sabato - blocco, sabato + blocco + 1, (sabato, sabato + 1)))
+        elif o in festivi:
+            forzati.append((nome, o - blocco, o + blocco, (o,)))
+
+    turni = []
+    for k, sabato in enumerate(sabati):
+        if sabato + 1 >= filtro_dal and sabato <= filtro_al:
+            blocchi = max(coperture[sabato - base], coperture[sabato + 1 - base])
+            turni.append((sabato, "weekend", (sabato, sabato + 1), n_tecnici - ferie_weekend[k], blocchi))
+    for o in range(max(inizio, filtro_dal), min(fine, filtro_al) + 1):
+        if calendario._weekday(o) >= 5:
+            continue
+        tipo = "festivo" if o in festivi else "feriale"
+        turni.append((o, tipo, (o,), n_tecnici - ferie_giorno[o - base], coperture[o - base]))
+    turni.sort()
+
+    impossibili = []
+    fragili = []
+    for o, tipo, giorni, disponibili, blocchi in turni:
+        voce = {
+            "data": calendario._ord_to_str(o),
+            "tipo": tipo,
+            "disponibili": disponibili,
+            "necessari": blocchi + 1,
+        }
+        if disponibili <= 0:
+            impossibili.append(voce)
+        elif disponibili <= blocchi:
+            # Caso dubbio: si escludono i tecnici liberi già obbligati da un turno vicino
+            vincolati = {
+                nome for nome, dal_o, al_o, propri in forzati
+                if propri != giorni and any(dal_o <= g <= al_o for g in giorni)
+            }
+            if all(nome in vincolati for nome in _liberi(giorni)):
+                voce["motivo"] = "tecnici liberi già obbligati da turni vicini"
+                impossibili.append(voce)
+            else:
+                fragili.append(voce)
+
+    # Assegnazioni fisse che cadono nelle ferie del titolare (la generazione fallirebbe)
+    for o, nome in sorted(calendario._fissi.items()):
+        if not (inizio <= o <= fine and filtro_dal <= o <= filtro_al):
+            continue
+        # Un giorno di weekend fissa l'intero weekend
+        if calendario._weekday(o) >= 5:
+            sabato = o if calendario._weekday(o) == 5 else o - 1
+            giorni = (sabato, sabato + 1)
+        else:
+            giorni = (o,)
+        in_ferie = [g for g in giorni if calendario.ferie_tecnici.in_ferie(nome, g)]
+        if in_ferie:
+            impossibili.append({
+                "data": calendario._ord_to_str(in_ferie[0]),
+                "tipo": "fisso",
+                "disponibili": 0,
+                "necessari": 1,
+                "motivo": f"{nome} è in ferie (assegnazione fissa)",
+            })
+    impossibili.sort(key=lambda voce: voce["data"])
+
+    return {
+        "anno": anno,
+        "fattibile": not impossibili,
+        "impossibili": impossibili,
+        "fragili": fragili,
+    }
@@ -0,0 +1,255 @@
+"""
+Modulo di ottimizzazione dell'equità del calendario.
+Dopo la generazione a rotazione (greedy), una ricerca locale sposta o scambia turni
+tra tecnici per ridurre lo scarto di turni totali, weekend e festivi,
+rispettando ferie e regola dei 7 giorni, entro un budget di tempo in millisecondi.
+"""
+
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from calendar_generator import CalendarioReperibilita
+
+
+BUDGET_MS_DEFAULT = 200
+
+# Pesi dei tre contatori nell'obiettivo (turni totali, weekend, festivi)
+PESI = (1, 2, 2)
+
+# Dopo tanti tentativi consecutivi senza miglioramento si considera raggiunto un ottimo locale
+TENTATIVI_MAX_SENZA_MIGLIORAMENTO = 20000
+
+
+class _Unita:
+    """Un turno indivisibile: un giorno feriale/festivo o un weekend (sabato + domenica)."""
+
+    __slots__ = ("giorni", "tipo", "tecnico")
+
+    def __init__(self, giorni: Tuple[int, ...], tipo: str, tecnico: str):
+        self.giorni = giorni
+        self.tipo = tipo
+        self.tecnico = tecnico
+
+    @property
+    def importante(self) -> bool:
+        return self.tipo in ("weekend", "festivo")
+
+    def blocca(self, o: int) -> bool:
+        """Indica se il blocco di 7 giorni di questo turno copre il giorno o."""
+        if self.tipo == "weekend":
+            sabato = self.giorni[0]
+            return sabato - CalendarioReperibilita.GIORNI_BLOCCO <= o <= sabato - 1 or \
+                sabato + 2 <= o <= sabato + CalendarioReperibilita.GIORNI_BLOCCO + 1
+        if self.tipo == "festivo":
+            giorno = self.giorni[0]
+            return o != giorno and abs(o - giorno) <= CalendarioReperibilita.GIORNI_BLOCCO
+        return False
+
+
+class _Stato:
+    """Stato della ricerca: unità, occupazione per tecnico e contatori."""
+
+    def __init__(self, calendario: CalendarioReperibilita, fissi: set):
+        self.calendario = calendario
+        self.tecnici: List[str] = list(calendario.TECNICI)
+        self.unita: List[_Unita] = []
+        self.mobili: List[int] = []
+        self.occupazione: Dict[str, Dict[int, int]] = {nome: {} for nome in self.tecnici}
+        self.contatori: Dict[str, List[int]] = {nome: [0, 0, 0] for nome in self.tecnici}
+
+        inizio = calendario._inizio
+        fine = calendario._fine
+        per_giorno = {o: calendario._voce(o) for o in calendario._giorni_assegnati()}
+        for o in per_giorno:
+            nome, tipo, _ = per_giorno[o]
+            if nome not in self.occupazione:
+                continue
+            if tipo == "weekend":
+                # Il weekend è un'unica unità ancorata al sabato
+                if calendario._weekday(o) != 5:
+                    if o - 1 in per_giorno and per_giorno[o - 1][:2] == (nome, tipo):
+                        continue
+                    giorni: Tuple[int, ...] = (o,)
+                elif o + 1 in per_giorno and per_giorno[o + 1][:2] == (nome, tipo):
+                    giorni = (o, o + 1)
+                else:
+                    giorni = (o,)
+            else:
+                giorni = (o,)
+
+            uid = len(self.unita)
+            unita = _Unita(giorni, tipo, nome)
+            self.unita.append(unita)
+            for g in giorni:
+                self.occupazione[nome][g] = uid
+            self._conta(unita, nome, +1)
+            # Restano fermi i turni fissati e quelli a cavallo dei bordi del periodo
+            if not (any(g in fissi for g in giorni) or giorni[0] < inizio or giorni[-1] > fine or len(giorni) == 1 and tipo == "weekend"):
+                self.mobili.append(uid)
+
+    def _conta(self, unita: _Unita, nome: str, segno: int):
+        c = self.contatori[nome]
+        c[0] += segno * len(unita.giorni)
+        if unita.tipo == "weekend":
+            c[1] += segno
+        elif unita.tipo == "festivo":
+            c[2] += segno
+
+    def delta(self, variazioni: Dict[str, Tuple[int, int, int]]) -> int:
+        """Variazione dell'obiettivo applicando le variazioni di contatori indicate."""
+        totale = 0
+        for nome, dv in variazioni.items():
+            c = self.contatori[nome]
+            for k, p in enumerate(PESI):
+                nuovo = c[k] + dv[k]
+                totale += p * (nuovo * nuovo - c[k] * c[k])
+        return totale
+
+    def vettore(self, unita: _Unita) -> Tuple[int, int, int]:
+        return (
+            len(unita.giorni),
+            1 if unita.tipo == "weekend" else 0,
+            1 if unita.tipo == "festivo" else 0,
+        )
+
+    def ammissibile(self, nome: str, uid: int, escludi: Tuple[int, ...]) -> bool:
+        """Il tecnico può prendere l'unità (ignorando le unità in `escludi`)?"""
+        unita = self.unita[uid]
+        occupazione = self.occupazione[nome]
+        blocco = CalendarioReperibilita.GIORNI_BLOCCO + 1
+        for g in unita.giorni:
+            if self.calendario.ferie_tecnici.in_ferie(nome, g):
+                return False
+            # Nessun turno importante del tecnico deve bloccare i giorni dell'unità
+            for o in range(g - blocco, g + blocco + 1):
+                altro = occupazione.get(o)
+                if altro is None or altro == uid or altro in escludi:
+                    continue
+                if o in unita.giorni:
+                    return False
+                if self.unita[altro].blocca(g):
+                    return False
+                # ...e se l'unità è importante, il suo blocco non deve coprire altri turni
+                if unita.importante and unita.blocca(o):
+                    return False
+        return True
+
+    def sposta(self, uid: int, nome: str):
+        unita = self.unita[uid]
+        for g in unita.giorni:
+            del self.occupazione[unita.tecnico][g]
+            self.occupazione[nome][g] = uid
+        self._conta(unita, unita.tecnico, -1)
+        self._conta(unita, nome, +1)
+        unita.tecnico = nome
+
+
+def _scarti(contatori: Dict[str, List[int]]) -> Dict[str, int]:
+    """Differenza massimo - minimo per turni totali, weekend e festivi."""
+    out = {}
+    for k, chiave in enumerate(("turni", "weekend", "festivi")):
+        valori = [c[k] for c in contatori.values()]
+        out[chiave] = (max(valori) - min(valori)) if valori else 0
+    return out
+
+
+def ottimizza_equita(
+    calendario: CalendarioReperibilita,
+    budget_ms: int = BUDGET_MS_DEFAULT,
+    seed: int = 0,
+    fissi: Optional[List[str]] = None,
+) -> Dict:
+    """
+    Migliora l'equità di un calendario già generato (modificato sul posto).
+
+    Ricerca locale a discesa: sposta un turno su un altro tecnico oppure scambia due turni
+    tra tecnici, accettando solo le mosse che riducono la somma pesata dei quadrati dei
+    contatori (turni totali, weekend, festivi). Ogni mossa rispetta ferie e regola dei
+    7 giorni; i turni in `fissi` (date YYYY-MM-DD) e le assegnazioni fisse del calendario
+    non vengono toccati.
+
+    Args:
+        calendario: calendario su cui è già stato chiamato genera_calendario()
+        budget_ms: tempo massimo di ricerca in millisecondi
+        seed: seme del generatore casuale (stesso seed e budget sufficiente -> stesso risultato)
+        fissi: date da non modificare, oltre alle assegnazioni fisse
+
+    Returns:
+        {"budget_ms", "durata_ms", "mosse", "prima": {...}, "dopo": {...}, "miglioramento": {...}}
+        dove prima/dopo riportano lo scarto (max - min) di turni, weekend e festivi.
+    """
+    avvio = time.perf_counter()
+    scadenza = avvio + max(0, int(budget_ms)) / 1000.0
+
+    date_fisse = {calendario._str_to_ord(d) for d in (fissi or [])} | set(calendario._fissi)
+
+    stato = _Stato(calendario, date_fisse)
+    prima = _scarti(stato.contatori)
+    rng = random.Random(seed)
+    tecnici = stato.tecnici
+    mosse = 0
+    senza_miglioramento = 0
+    tentativi = 0
+
+    if len(tecnici) >= 2 and stato.mobili:
+        while senza_miglioramento < TENTATIVI_MAX_SENZA_MIGLIORAMENTO:
+            tentativi += 1
+            if tentativi % 64 == 0 and time.perf_counter() >= scadenza:
+                break
+
+            uid = rng.choice(stato.mobili)
+            unita = stato.unita[uid]
+            da = unita.tecnico
+            vettore = stato.vettore(unita)
+
+            if rng.random() < 0.5:
+                # Spostamento: l'unità passa a un altro tecnico
+                verso = rng.choice(tecnici)
+                if verso == da:
+                    continue
+                variazioni = {
+                    da: tuple(-v for v in vettore),
+                    verso: vettore,
+                }
+                if stato.delta(variazioni) < 0 and stato.ammissibile(verso, uid, ()):
+                    stato.sposta(uid, verso)
+                    mosse += 1
+                    senza_miglioramento = 0
+                    continue
+            else:
+                # Scambio: due unità di tecnici diversi si scambiano di titolare
+                altro_uid = rng.choice(stato.mobili)
+                altra = stato.unita[altro_uid]
+                verso = altra.tecnico
+                if verso == da:
+                    continue
+                altro_vettore = stato.vettore(altra)
+                diff = tuple(a - b for a, b in zip(altro_vettore, vettore))
+                variazioni = {da: diff, verso: tuple(-v for v in diff)}
+                if (stato.delta(variazioni) < 0
+                        and stato.ammissibile(verso, uid, (altro_uid,))
+                        and stato.ammissibile(da, altro_uid, (uid,))):
+                    stato.sposta(uid, verso)
+                    stato.sposta(altro_uid, da)
+                    mosse += 1
+                    senza_miglioramento = 0
+                    continue
+            senza_miglioramento += 1
+
+    # Riporta le assegnazioni ottimizzate sul calendario
+    for unita in stato.unita:
+        for g in unita.giorni:
+            if calendario._voce(g)[0] != unita.tecnico:
+                calendario._cambia_tecnico(g, unita.tecnico)
+    calendario._ricostruisci_blocchi()
+
+    dopo = _scarti(stato.contatori)
+    return {
+        "budget_ms": int(budget_ms),
+        "durata_ms": round((time.perf_counter() - avvio) * 1000, 1),
+        "mosse": mosse,
+        "prima": prima,
+        "dopo": dopo,
+        "miglioramento": {k: prima[k] - dopo[k] for k in prima},
+    }
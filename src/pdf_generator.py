@@ -44,8 +44,9 @@ class PDFCalendarioGenerator:
         self.anno = int(getattr(calendario, "anno", 2026) or 2026)
         self._generated_at = datetime.now()
         # Cache delle assegnazioni per allineare il PDF alla stessa fonte dati dell'API/UI
+        # (vista materializzata del calendario, letta senza copiarla)
         try:
-            self._assegnazioni = dict(getattr(calendario, "assegnazioni", {}) or {})
+            self._assegnazioni = getattr(calendario, "assegnazioni", {}) or {}
         except Exception:
             self._assegnazioni = {}
         # Festività per anno (fallback compatibilità)
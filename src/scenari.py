@@ -0,0 +1,147 @@
+"""
+Modulo per il confronto di scenari "what-if" (es. piani ferie alternativi).
+Genera più varianti della configurazione in parallelo (processi separati)
+e ne confronta equità e assegnazioni rispetto al calendario di base.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from calendar_generator import CalendarioReperibilita
+
+
+# Parametri del costruttore che uno scenario può sostituire
+PARAMETRI_SCENARIO = ("tecnici", "aiutanti", "date_aiutanti", "ferie")
+
+
+def _genera_scenario(parametri: Dict) -> Dict:
+    """Genera un calendario e ne ritorna i dati serializzabili (eseguita nei processi worker)."""
+    try:
+        calendario = CalendarioReperibilita(**parametri)
+        calendario.genera_calendario()
+    except Exception as e:
+        # Uno scenario non generabile (es. conflitto ferie) non deve bloccare gli altri
+        return {"errore": str(e)}
+    return _riepilogo(calendario)
+
+
+def _riepilogo(calendario: CalendarioReperibilita) -> Dict:
+    """Assegnazioni e contatori di un calendario generato."""
+    return {
+        "assegnazioni": calendario.assegnazioni,
+        "statistiche": dict(calendario.contatori_turni),
+        "statistiche_aiutanti": dict(calendario.contatori_aiutanti),
+    }
+
+
+def _equita(contatori: Dict[str, int]) -> Dict[str, int]:
+    """Minimo, massimo e differenza dei turni per tecnico."""
+    valori = list(contatori.values())
+    if not valori:
+        return {"min": 0, "max": 0, "differenza": 0}
+    return {"min": min(valori), "max": max(valori), "differenza": max(valori) - min(valori)}
+
+
+def _giorni_scoperti(anno: int, assegnazioni: Dict[str, List]) -> List[str]:
+    """Date dell'anno senza alcun tecnico assegnato."""
+    scoperti = []
+    giorno = date(anno, 1, 1)
+    while giorno.year == anno:
+        data_str = giorno.isoformat()
+        if data_str not in assegnazioni:
+            scoperti.append(data_str)
+        giorno += timedelta(days=1)
+    return scoperti
+
+
+def diff_assegnazioni(base: Dict[str, List], altra: Dict[str, List]) -> List[Dict]:
+    """Ritorna le date in cui due insiemi di assegnazioni differiscono."""
+    diff = []
+    for data_str in sorted(set(base) | set(altra)):
+        prima = base.get(data_str)
+        dopo = altra.get(data_str)
+        if prima != dopo:
+            diff.append({"data": data_str, "base": prima, "scenario": dopo})
+    return diff
+
+
+def confronta_scenari(
+    parametri_base: Dict,
+    scenari: List[Dict],
+    base: Optional[CalendarioReperibilita] = None,
+    max_workers: Optional[int] = None,
+) -> Dict:
+    """
+    Confronta N scenari alternativi con il calendario di base.
+
+    Args:
+        parametri_base: parametri del costruttore di CalendarioReperibilita (anno, tecnici, ferie, ...)
+        scenari: lista di dict {"nome": ..., <parametro>: valore, "ferie_aggiuntive": [...]}
+            dove <parametro> è uno di PARAMETRI_SCENARIO (sostituisce il valore di base)
+            e "ferie_aggiuntive" si somma alle ferie di base.
+        base: calendario di base già generato (se None viene generato insieme agli scenari)
+        max_workers: numero di processi (None = default di ProcessPoolExecutor, 1 = seriale).
+            Nell'EXE (PyInstaller) si lavora sempre in modo seriale.
+
+    Returns:
+        {"base": {...}, "scenari": [{"nome", "statistiche", "equita", "giorni_scoperti", "diff", ...}]}
+        (uno scenario non generabile riporta solo {"nome", "errore"})
+    """
+    anno = int(parametri_base.get("anno", CalendarioReperibilita.ANNO))
+
+    lavori: List[Dict] = []
+    for scenario in scenari:
+        parametri = dict(parametri_base)
+        for chiave in PARAMETRI_SCENARIO:
+            if chiave in scenario:
+                parametri[chiave] = scenario[chiave]
+        aggiuntive = scenario.get("ferie_aggiuntive") or []
+        if aggiuntive:
+            parametri["ferie"] = list(parametri.get("ferie") or []) + list(aggiuntive)
+        lavori.append(parametri)
+    if base is None:
+        lavori.append(dict(parametri_base))
+
+    if max_workers == 1 or len(lavori) <= 1 or getattr(sys, "frozen", False):
+        risultati = [_genera_scenario(p) for p in lavori]
+    else:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                risultati = list(executor.map(_genera_scenario, lavori))
+        except (OSError, RuntimeError):
+            # Ambienti senza multiprocessing (es. alcuni EXE congelati): esecuzione seriale
+            risultati = [_genera_scenario(p) for p in lavori]
+
+    riepilogo_base = _riepilogo(base) if base is not None else risultati.pop()
+    if "errore" in riepilogo_base:
+        raise ValueError(riepilogo_base["errore"])
+    assegnazioni_base = riepilogo_base["assegnazioni"]
+
+    out_scenari = []
+    for scenario, risultato in zip(scenari, risultati):
+        if "errore" in risultato:
+            out_scenari.append({"nome": scenario.get("nome", ""), "errore": risultato["errore"]})
+            continue
+        diff = diff_assegnazioni(assegnazioni_base, risultato["assegnazioni"])
+        out_scenari.append({
+            "nome": scenario.get("nome", ""),
+            "statistiche": risultato["statistiche"],
+            "statistiche_aiutanti": risultato["statistiche_aiutanti"],
+            "equita": _equita(risultato["statistiche"]),
+            "giorni_scoperti": _giorni_scoperti(anno, risultato["assegnazioni"]),
+            "giorni_cambiati": len(diff),
+            "diff": diff,
+        })
+
+    return {
+        "anno": anno,
+        "base": {
+            "statistiche": riepilogo_base["statistiche"],
+            "statistiche_aiutanti": riepilogo_base["statistiche_aiutanti"],
+            "equita": _equita(riepilogo_base["statistiche"]),
+            "giorni_scoperti": _giorni_scoperti(anno, assegnazioni_base),
+        },
+        "scenari": out_scenari,
+    }
@@ -116,11 +116,15 @@ class ValidatoreCalendario:
         errori = []
 
         anno = int(getattr(self.calendario, "anno", 2026) or 2026)
-        if anno != 2026:
-            # Negli altri anni il 1 gennaio segue la rotazione normale.
+        if anno != 2026 or "Dardha" not in self.calendario.tecnici:
+            # Negli altri anni (o nelle squadre senza Dardha) il 1 gennaio segue la rotazione normale.
             return True, []
 
         capodanno_str = "2026-01-01"
+        capodanno = datetime.strptime(capodanno_str, "%Y-%m-%d").toordinal()
+        if not self.calendario._inizio <= capodanno <= self.calendario._fine:
+            # Calendario su un orizzonte che non comprende il Capodanno 2026
+            return True, []
         
         assegnato = False
         for tecnico_nome, tecnico in self.calendario.tecnici.items():
@@ -135,6 +139,24 @@ class ValidatoreCalendario:
         
         return len(errori) == 0, errori
     
+    def valida_assegnazioni_fisse(self) -> Tuple[bool, List[str]]:
+        """Valida che le assegnazioni fisse del periodo del calendario siano rispettate e compatibili tra loro."""
+        errori = []
+        calendario = self.calendario
+        for o, nome in sorted(calendario._fissi.items()):
+            if not calendario._inizio <= o <= calendario._fine:
+                continue
+            data_str = calendario._ord_to_str(o)
+            assegnato = calendario.get_reperibile_data(data_str)[0]
+            if assegnato != nome:
+                errori.append(
+                    f"ERRORE: {data_str} assegnato a {assegnato or 'nessuno'}, deve essere {nome} (assegnazione fissa)"
+                )
+        # Assegnazioni fisse che violano tra loro la regola dei 7 giorni
+        for conflitto in calendario.conflitti_fissi():
+            errori.append(f"ERRORE: {conflitto} (assegnazioni fisse)")
+        return len(errori) == 0, errori
+    
     def valida_equita_turni(self) -> Tuple[bool, List[str]]:
         """Valida che i turni siano distribuiti equamente."""
         errori = []
@@ -158,6 +180,7 @@ class ValidatoreCalendario:
             "Regola 7 giorni": self.valida_regola_7_giorni(),
             "Assegnazione unica per data": self.valida_assegnazione_unica_per_data(),
             "Capodanno a Dardha (solo 2026)": self.valida_capodanno(),
+            "Assegnazioni fisse": self.valida_assegnazioni_fisse(),
             "Equità turni": self.valida_equita_turni(),
         }
         return risultati
@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from datetime import datetime, timedelta
 from calendar_generator import CalendarioReperibilita
 from validatore import ValidatoreCalendario
+from fattibilita import verifica_fattibilita
 
 
 def test_blocco_7_giorni():
@@ -35,7 +36,7 @@ def test_blocco_7_giorni():
             if i != 0:
                 data_bloccata = data + timedelta(days=i)
                 data_bloccata_str = data_bloccata.strftime("%Y-%m-%d")
-                if data_bloccata_str in dardha.giorni_bloccati:
+                if dardha.bloccato(data_bloccata_str):
                     giorni_bloccati.append(f"{data_bloccata_str}")
         
         print(f"    Giorni bloccati: {len(giorni_bloccati)}")
@@ -186,6 +187,869 @@ def test_feriali():
         print(f"  {tecnico:15} [{barra:<20}] {contatore}")
 
 
+def test_indice_assegnazioni():
+    """Test della coerenza dell'indice data -> assegnazione."""
+    print("\n" + "="*60)
+    print("TEST: INDICE ASSEGNAZIONI")
+    print("="*60)
+    
+    calendario = CalendarioReperibilita()
+    calendario.genera_calendario()
+    
+    # Ricostruisce le assegnazioni scorrendo tutti i tecnici (vecchio metodo)
+    attese = {}
+    for tecnico_nome, tecnico in calendario.tecnici.items():
+        for data_str, tipo in tecnico.giorni_reperibili.items():
+            if data_str.startswith(f"{calendario.anno}-"):
+                attese[data_str] = (tecnico_nome, tipo)
+    
+    ottenute = {
+        data_str: (arr[0], arr[1])
+        for data_str, arr in calendario.assegnazioni.items()
+    }
+    
+    print(f"\nDate assegnate: {len(ottenute)}")
+    if attese == ottenute:
+        print("✅ PASSATO: Indice coerente con i turni dei tecnici")
+    else:
+        print("❌ FALLITO: Indice non coerente con i turni dei tecnici")
+    assert attese == ottenute
+
+
+def test_ferie():
+    """Test del rispetto delle ferie (nessun turno durante il periodo)."""
+    print("\n" + "="*60)
+    print("TEST: FERIE")
+    print("="*60)
+    
+    calendario = CalendarioReperibilita(ferie=[
+        {"tipo": "tecnico", "nome": "Likaj", "dal": "2026-03-02", "al": "2026-03-20"},
+        {"tipo": "tecnico", "nome": "Likaj", "dal": "2026-03-21", "al": "2026-04-05"},
+    ])
+    calendario.genera_calendario()
+    
+    intervalli = calendario.ferie_tecnici.intervalli("Likaj")
+    print(f"\nIntervalli ferie Likaj: {len(intervalli)}")
+    
+    turni_in_ferie = [
+        data_str for data_str in calendario.tecnici["Likaj"].giorni_reperibili
+        if calendario.in_ferie("Likaj", data_str)
+    ]
+    in_ferie = calendario.in_ferie_tra("2026-04-01", "2026-04-30")
+    
+    if not turni_in_ferie and len(intervalli) == 1 and in_ferie == ["Likaj"]:
+        print("✅ PASSATO: Nessun turno assegnato durante le ferie")
+    else:
+        print(f"❌ FALLITO: Turni durante le ferie: {turni_in_ferie}")
+    assert not turni_in_ferie
+    assert len(intervalli) == 1
+    assert in_ferie == ["Likaj"]
+
+
+def test_configurazione_per_istanza():
+    """Test della configurazione per istanza (generazioni parallele indipendenti)."""
+    print("\n" + "="*60)
+    print("TEST: CONFIGURAZIONE PER ISTANZA")
+    print("="*60)
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    tecnici_classe = list(CalendarioReperibilita.TECNICI)
+    configurazioni = [
+        {"anno": 2027, "tecnici": ["Likaj", "Ferraris", "Zanotto"]},
+        {"anno": 2028},
+        {"anno": 2027, "tecnici": ["Likaj", "Ferraris", "Zanotto"]},
+    ]
+    
+    def genera(config):
+        calendario = CalendarioReperibilita(**config)
+        calendario.genera_calendario()
+        return calendario
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        calendari = list(executor.map(genera, configurazioni))
+    
+    for calendario in calendari:
+        print(f"  {calendario.anno}: {len(calendario.TECNICI)} tecnici, {len(calendario.assegnazioni)} giorni")
+    
+    ok = (
+        calendari[0].assegnazioni == calendari[2].assegnazioni
+        and set(calendari[0].contatori_turni) == {"Likaj", "Ferraris", "Zanotto"}
+        and calendari[1].anno == 2028
+        and CalendarioReperibilita.TECNICI == tecnici_classe
+    )
+    if ok:
+        print("✅ PASSATO: Istanze indipendenti, attributi di classe invariati")
+    else:
+        print("❌ FALLITO: Configurazione condivisa tra istanze")
+    assert ok
+
+
+def test_generazione_multi_anno():
+    """Test della generazione in catena di più anni (continuità di rotazione)."""
+    print("\n" + "="*60)
+    print("TEST: GENERAZIONE MULTI-ANNO")
+    print("="*60)
+    
+    # Catena manuale anno per anno
+    stato = {}
+    sequenziale = {}
+    for anno in range(2026, 2030):
+        calendario = CalendarioReperibilita(
+            anno=anno,
+            rotation_start_index=stato.get("next_tecnico_index"),
+            aiutanti_offset=stato.get("next_aiutante_offset"),
+            festivi_rotation_start=stato.get("festivi"),
+        )
+        calendario.genera_calendario()
+        stato = calendario.stato_rotazione_finale()
+        sequenziale[anno] = calendario.assegnazioni
+    
+    # Catena in un'unica chiamata, poi salto diretto con memo già popolato
+    stati = {}
+    calendari = CalendarioReperibilita.genera_anni(2026, 2029, stati)
+    solo_ultimo = CalendarioReperibilita.genera_anni(2026, 2029, stati)
+    
+    for anno in sorted(stati):
+        print(f"  {anno}: prossimo tecnico = {stati[anno]['next_tecnico_index']}")
+    
+    ok = (
+        all(calendari[anno].assegnazioni == sequenziale[anno] for anno in sequenziale)
+        and list(solo_ultimo) == [2029]
+        and solo_ultimo[2029].assegnazioni == sequenziale[2029]
+    )
+    if ok:
+        print("✅ PASSATO: Catena multi-anno identica alla generazione sequenziale")
+    else:
+        print("❌ FALLITO: Catena multi-anno diversa dalla generazione sequenziale")
+    assert ok
+
+
+def test_scenari_ferie():
+    """Test del confronto di scenari ferie alternativi."""
+    print("\n" + "="*60)
+    print("TEST: SCENARI FERIE")
+    print("="*60)
+    
+    from scenari import confronta_scenari
+    
+    ferie_agosto = [{"tipo": "tecnico", "nome": "Mancin", "dal": "2026-08-01", "al": "2026-08-31"}]
+    risultato = confronta_scenari(
+        {"anno": 2026},
+        [{"nome": "nessuna ferie"}, {"nome": "Mancin ad agosto", "ferie_aggiuntive": ferie_agosto}],
+        max_workers=2,
+    )
+    
+    for scenario in risultato["scenari"]:
+        print(f"  {scenario['nome']:20} diff turni = {scenario['equita']['differenza']}, "
+              f"giorni cambiati = {scenario['giorni_cambiati']}")
+    
+    invariato, agosto = risultato["scenari"]
+    mancin_agosto = [
+        d["data"] for d in agosto["diff"]
+        if d["data"].startswith("2026-08") and d["scenario"] and d["scenario"][0] == "Mancin"
+    ]
+    ok = invariato["giorni_cambiati"] == 0 and agosto["giorni_cambiati"] > 0 and not mancin_agosto
+    if ok:
+        print("✅ PASSATO: Scenari confrontati correttamente con la base")
+    else:
+        print("❌ FALLITO: Confronto scenari non coerente")
+    assert ok
+
+
+def test_patch_da_checkpoint():
+    """Test della rigenerazione parziale che riparte dai checkpoint di rotazione."""
+    print("\n" + "="*60)
+    print("TEST: RIGENERAZIONE PARZIALE DA CHECKPOINT")
+    print("="*60)
+    
+    parametri = {
+        "rotation_start_index": 2,
+        "ferie": [{"nome": "Likaj", "dal": "2027-03-09", "al": "2027-03-20"}],
+    }
+    calendario = CalendarioReperibilita(anno=2027, **parametri)
+    calendario.genera_calendario()
+    base = calendario.assegnazioni
+    checkpoint = calendario.checkpoint_rotazione()
+    # Le ferie cadono dentro una delle finestre: il tecnico non deve comparire in quei giorni
+    in_ferie = [d for d in base if "2027-03-09" <= d <= "2027-03-20" and base[d][0] == "Likaj"]
+    senza_ferie = CalendarioReperibilita(anno=2027, rotation_start_index=2)
+    senza_ferie.genera_calendario()
+    effetto_ferie = any(senza_ferie.assegnazioni[d][0] == "Likaj" for d in base if "2027-03-09" <= d <= "2027-03-20")
+    
+    # A parità di input, ogni finestra rigenerata deve coincidere con la generazione completa
+    finestre = [("2027-01-01", "2027-01-05"), ("2027-03-10", "2027-03-18"),
+                ("2027-08-12", "2027-08-20"), ("2027-12-20", "2027-12-31")]
+    diversi = []
+    for dal, al in finestre:
+        merged = CalendarioReperibilita.patch_assegnazioni(
+            base, dal, al, checkpoint=checkpoint, **parametri
+        )
+        if merged != base:
+            diversi.append((dal, al))
+        print(f"  {dal} -> {al}: {'identico' if merged == base else 'diverso'}")
+    
+    if not diversi and not in_ferie and effetto_ferie:
+        print("✅ PASSATO: Rigenerazione parziale identica alla generazione completa")
+    else:
+        print(f"❌ FALLITO: Finestre diverse dalla generazione completa: {diversi}, Likaj in ferie: {in_ferie}")
+    assert not diversi and not in_ferie and effetto_ferie
+
+
+def test_ottimizzazione_equita():
+    """Test dell'ottimizzatore di equità (ricerca locale con budget di tempo)."""
+    print("\n" + "="*60)
+    print("TEST: OTTIMIZZAZIONE EQUITÀ")
+    print("="*60)
+    from ottimizzatore import ottimizza_equita
+    
+    calendario = CalendarioReperibilita(
+        anno=2026, ferie=[{"nome": "Likaj", "dal": "2026-07-01", "al": "2026-07-31"}]
+    )
+    calendario.genera_calendario()
+    giorni_prima = set(calendario.assegnazioni)
+    
+    report = ottimizza_equita(calendario, budget_ms=100)
+    print(f"  Scarto prima: {report['prima']}")
+    print(f"  Scarto dopo:  {report['dopo']} ({report['mosse']} mosse in {report['durata_ms']} ms)")
+    
+    validatore = ValidatoreCalendario(calendario)
+    regola_ok, errori = validatore.valida_regola_7_giorni()
+    ferie_ok = not any(
+        calendario.in_ferie(tecnico, data_str)
+        for data_str, (tecnico, _, _) in calendario.assegnazioni.items()
+    )
+    ok = (
+        regola_ok and ferie_ok
+        and validatore.valida_capodanno()[0]
+        and set(calendario.assegnazioni) == giorni_prima
+        and all(report["dopo"][k] <= report["prima"][k] for k in report["prima"])
+        and report["dopo"]["turni"] < report["prima"]["turni"]
+    )
+    if ok:
+        print("✅ PASSATO: Equità migliorata rispettando ferie e regola 7 giorni")
+    else:
+        print(f"❌ FALLITO: Ottimizzazione non valida ({errori[:3]})")
+    assert ok
+
+
+def test_generazione_squadre():
+    """Test della generazione in lotto di più squadre (rotazioni indipendenti)."""
+    print("\n" + "="*60)
+    print("TEST: GENERAZIONE MULTI-SQUADRA")
+    print("="*60)
+    import time
+    
+    def squadre_di(n):
+        return {
+            f"squadra{s}": {"tecnici": [f"T{s}_{i}" for i in range(8)], "rotation_start_index": s % 8}
+            for s in range(n)
+        }
+    ferie = [{"nome": f"T{s}_0", "dal": "2026-07-01", "al": "2026-07-20"} for s in range(25)]
+    
+    tempi = {}
+    for n in (1, 5, 25):
+        inizio = time.perf_counter()
+        calendari = CalendarioReperibilita.genera_squadre(2026, 2026, squadre_di(n), ferie=ferie)
+        tempi[n] = (time.perf_counter() - inizio) * 1000
+        print(f"  {n:>2} squadre ({n * 8} tecnici): {tempi[n]:.1f} ms")
+    
+    # Ogni squadra usa solo i propri tecnici, copre tutto l'anno e rispetta ferie e regola 7 giorni
+    ok = len(calendari) == 25
+    for nome, per_anno in calendari.items():
+        calendario = per_anno[2026]
+        membri = set(squadre_di(25)[nome]["tecnici"])
+        assegnazioni = calendario.assegnazioni
+        ok = ok and len(assegnazioni) == 365
+        ok = ok and all(v[0] in membri for v in assegnazioni.values())
+        ok = ok and not any(calendario.in_ferie(v[0], d) for d, v in assegnazioni.items())
+        ok = ok and ValidatoreCalendario(calendario).valida_regola_7_giorni()[0]
+    
+    # Una squadra generata nel lotto coincide con la stessa squadra generata da sola
+    da_sola = CalendarioReperibilita(
+        anno=2026, tecnici=squadre_di(25)["squadra3"]["tecnici"], rotation_start_index=3, ferie=ferie
+    )
+    da_sola.genera_calendario()
+    ok = ok and calendari["squadra3"][2026].assegnazioni == da_sola.assegnazioni
+    
+    if ok:
+        print("✅ PASSATO: Squadre indipendenti generate correttamente in lotto")
+    else:
+        print("❌ FALLITO: Generazione multi-squadra non corretta")
+    assert ok
+
+
+def test_copia_calendario():
+    """Test della copia del calendario (stato colonnare copiato in blocco)."""
+    print("\n" + "="*60)
+    print("TEST: COPIA CALENDARIO")
+    print("="*60)
+    
+    calendario = CalendarioReperibilita()
+    calendario.genera_calendario()
+    originale = calendario.assegnazioni
+    contatori = calendario.contatori_turni
+    
+    copia = calendario.copia()
+    tecnico, tipo = copia.get_reperibile_data("2026-03-03")
+    altro = next(nome for nome in copia.TECNICI if nome != tecnico)
+    copia._cambia_tecnico(copia._str_to_ord("2026-03-03"), altro)
+    print(f"  2026-03-03: originale {tecnico}, copia {copia.get_reperibile_data('2026-03-03')[0]}")
+    
+    ok = (
+        calendario.assegnazioni == originale
+        and calendario.contatori_turni == contatori
+        and copia.get_reperibile_data("2026-03-03") == (altro, tipo)
+        and "2026-03-03" in copia.tecnici[altro].giorni_reperibili
+        and "2026-03-03" not in calendario.tecnici[altro].giorni_reperibili
+        and copia.contatori_turni[altro] == contatori[altro] + 1
+    )
+    if ok:
+        print("✅ PASSATO: La copia è indipendente dall'originale")
+    else:
+        print("❌ FALLITO: La copia condivide lo stato con l'originale")
+    assert ok
+
+
+def test_tabella_festivi():
+    """Test della tabella festività memoizzata per anno."""
+    print("\n" + "="*60)
+    print("TEST: TABELLA FESTIVITÀ")
+    print("="*60)
+    from calendar_generator import tabella_festivi
+    
+    tabella = tabella_festivi(2027)
+    for data_str, key in tabella.dettaglio:
+        print(f"  {data_str} → {key}")
+    
+    ok = (
+        tabella_festivi(2027) is tabella
+        and "2027-03-28" in tabella.date  # Pasqua 2027
+        and [datetime.fromordinal(o).strftime("%Y-%m-%d") for o, _ in tabella.ordinali] == list(tabella.date)
+        and CalendarioReperibilita.get_festivi(2027) == list(tabella.date)
+        and CalendarioReperibilita.get_festivi(2027) is not CalendarioReperibilita.get_festivi(2027)
+    )
+    if ok:
+        print("✅ PASSATO: Tabella festività coerente e condivisa")
+    else:
+        print("❌ FALLITO: Tabella festività non coerente")
+    assert ok
+
+
+def test_iter_assegnazioni():
+    """Test dell'iteratore per intervallo e della vista materializzata delle assegnazioni."""
+    print("\n" + "="*60)
+    print("TEST: ITERATORE ASSEGNAZIONI")
+    print("="*60)
+    
+    calendario = CalendarioReperibilita()
+    calendario.genera_calendario()
+    
+    vista = calendario.assegnazioni
+    marzo = dict(calendario.iter_assegnazioni("2026-03-01", "2026-03-31"))
+    print(f"  Giorni di marzo: {len(marzo)}")
+    
+    # Una modifica invalida la vista: il nuovo accesso riflette il cambio
+    o = calendario._str_to_ord("2026-03-03")
+    tecnico = vista["2026-03-03"][0]
+    altro = next(nome for nome in calendario.TECNICI if nome != tecnico)
+    calendario._cambia_tecnico(o, altro)
+    
+    ok = (
+        calendario.assegnazioni is not vista
+        and calendario.assegnazioni is calendario.assegnazioni
+        and len(marzo) == 31
+        and all(vista[data_str] == voce for data_str, voce in marzo.items())
+        and dict(calendario.iter_assegnazioni("2025-12-01", "2026-01-02")) == {
+            k: v for k, v in calendario.assegnazioni.items() if k <= "2026-01-02"
+        }
+        and calendario.assegnazioni["2026-03-03"][0] == altro
+    )
+    if ok:
+        print("✅ PASSATO: Iteratore per intervallo e vista invalidata alla modifica")
+    else:
+        print("❌ FALLITO: Iteratore o vista delle assegnazioni non coerenti")
+    assert ok
+
+
+def test_get_range():
+    """Test della query per intervallo di date."""
+    print("\n" + "="*60)
+    print("TEST: QUERY PER INTERVALLO")
+    print("="*60)
+    
+    calendario = CalendarioReperibilita()
+    calendario.genera_calendario()
+    
+    quattordici = calendario.get_range("2026-06-10", "2026-06-23")
+    trimestre = calendario.get_range("2026-07-01", "2026-09-30")
+    print(f"  Giorni: 14 -> {len(quattordici)}, trimestre -> {len(trimestre)}")
+    
+    try:
+        calendario.get_range("2026-02-01", "2026-01-01")
+        intervallo_invertito_rifiutato = False
+    except ValueError:
+        intervallo_invertito_rifiutato = True
+    
+    ok = (
+        len(quattordici) == 14
+        and len(trimestre) == 92
+        and all(calendario.assegnazioni[d] == v for d, v in trimestre.items())
+        and min(calendario.get_range("2025-12-01", "2026-01-31")) == "2026-01-01"
+        and intervallo_invertito_rifiutato
+    )
+    if ok:
+        print("✅ PASSATO: Intervalli coerenti con il calendario completo")
+    else:
+        print("❌ FALLITO: Query per intervallo non coerente")
+    assert ok
+
+
+def test_disponibilita():
+    """Test dell'indice di disponibilità per le sostituzioni."""
+    print("\n" + "="*60)
+    print("TEST: DISPONIBILITÀ PER DATA")
+    print("="*60)
+    
+    ferie = [{"nome": "Likaj", "dal": "2026-03-01", "al": "2026-03-20"}]
+    calendario = CalendarioReperibilita(ferie=ferie)
+    calendario.genera_calendario()
+    
+    # Ogni candidato deve poter prendere il turno senza violare ferie e regola dei 7 giorni
+    data_str = "2026-03-10"
+    liberi = calendario.disponibili(data_str)["tecnici"]
+    titolare = calendario.get_reperibile_data(data_str)[0]
+    print(f"  Titolare {titolare}, disponibili: {', '.join(liberi)}")
+    
+    ok = bool(liberi) and titolare not in liberi and "Likaj" not in liberi
+    for nome in liberi:
+        prova = calendario.copia()
+        prova._cambia_tecnico(prova._str_to_ord(data_str), nome)
+        prova._ricostruisci_blocchi()
+        ok = ok and ValidatoreCalendario(prova).valida_regola_7_giorni()[0]
+    
+    turni = calendario.contatori_turni
+    ok = ok and [turni[n] for n in liberi] == sorted(turni[n] for n in liberi)
+    
+    # Ricostruito dalle assegnazioni salvate, il calendario risponde allo stesso modo
+    ricostruito = CalendarioReperibilita.da_assegnazioni(calendario.assegnazioni, ferie=ferie)
+    ok = ok and ricostruito.disponibili(data_str) == calendario.disponibili(data_str)
+    if ok:
+        print("✅ PASSATO: Disponibili ordinati per carico e compatibili con le regole")
+    else:
+        print("❌ FALLITO: Indice di disponibilità non coerente")
+    assert ok
+
+
+def test_scambio_turni():
+    """Test del cambio turno con verifica locale delle regole."""
+    print("\n" + "="*60)
+    print("TEST: SCAMBIO TURNI")
+    print("="*60)
+    
+    calendario = CalendarioReperibilita()
+    calendario.genera_calendario()
+    prima = dict(calendario.assegnazioni)
+    
+    # Cessione valida: il primo tecnico disponibile prende il turno
+    data_str = "2026-03-10"
+    sostituto = calendario.disponibili(data_str)["tecnici"][0]
+    modificate = calendario.scambia(data_str, tecnico=sostituto)
+    print(f"  {data_str} ceduto a {sostituto}: {modificate}")
+    
+    # Due weekend consecutivi allo stesso tecnico violano la regola dei 7 giorni
+    sabato = "2026-05-09"
+    titolare = calendario.get_reperibile_data(sabato)[0]
+    try:
+        calendario.scambia("2026-05-16", tecnico=titolare)
+        violazione_rifiutata = False
+    except ValueError as e:
+        print(f"  Rifiutato: {e}")
+        violazione_rifiutata = True
+    
+    validatore = ValidatoreCalendario(calendario)
+    ok = (
+        modificate == [data_str]
+        and calendario.assegnazioni[data_str][0] == sostituto
+        and violazione_rifiutata
+        and calendario.assegnazioni["2026-05-16"] == prima["2026-05-16"]
+        and validatore.valida_regola_7_giorni()[0]
+        and validatore.valida_assegnazione_unica_per_data()[0]
+        and sum(calendario.contatori_turni.values()) == len(prima)
+    )
+    if ok:
+        print("✅ PASSATO: Cessione applicata e violazione rifiutata senza modifiche")
+    else:
+        print("❌ FALLITO: Scambio turni non coerente")
+    assert ok
+
+
+def test_verifica_fattibilita():
+    """Test della verifica di copertura prima della generazione."""
+    print("\n" + "="*60)
+    print("TEST: VERIFICA FATTIBILITÀ")
+    print("="*60)
+    
+    tecnici = CalendarioReperibilita.TECNICI
+    
+    def ferie_per(quanti):
+        return [{"nome": nome, "dal": "2026-05-04", "al": "2026-05-17"} for nome in tecnici[:quanti]]
+    
+    senza_ferie = verifica_fattibilita(CalendarioReperibilita())
+    fragile = verifica_fattibilita(CalendarioReperibilita(ferie=ferie_per(7)))
+    impossibile = verifica_fattibilita(CalendarioReperibilita(ferie=ferie_per(8)), "2026-05-01", "2026-05-31")
+    print(f"  7 in ferie: {len(fragile['fragili'])} turni fragili")
+    print(f"  8 in ferie: {len(impossibile['impossibili'])} turni impossibili")
+    
+    # Dove la verifica segnala turni impossibili la generazione lascia davvero giorni scoperti
+    calendario = CalendarioReperibilita(ferie=ferie_per(8))
+    calendario.genera_calendario()
+    scoperti = [v["data"] for v in impossibile["impossibili"] if v["data"] not in calendario.assegnazioni]
+    
+    ok = (
+        senza_ferie["fattibile"] and not senza_ferie["fragili"]
+        and fragile["fattibile"] and fragile["fragili"]
+        and not impossibile["fattibile"]
+        and scoperti
+    )
+    if ok:
+        print("✅ PASSATO: Copertura impossibile o fragile individuata senza generare")
+    else:
+        print("❌ FALLITO: Verifica di fattibilità non coerente")
+    assert ok
+
+
+def test_assegnazioni_fisse():
+    """Test delle assegnazioni fisse (oltre al Capodanno 2026 di default)."""
+    print("\n" + "="*60)
+    print("TEST: ASSEGNAZIONI FISSE")
+    print("="*60)
+    
+    from ottimizzatore import ottimizza_equita
+    
+    fisse = {"2026-04-25": "Casazza", "2026-06-07": "Terazzi", "2026-09-15": "Likaj"}
+    calendario = CalendarioReperibilita(assegnazioni_fisse=fisse)
+    calendario.genera_calendario()
+    assegnazioni = calendario.assegnazioni
+    
+    for data_str in sorted(fisse):
+        print(f"  {data_str}: {assegnazioni[data_str][0]} ({assegnazioni[data_str][1]})")
+    
+    # La rigenerazione parziale e l'ottimizzazione non toccano i turni fissati
+    patch = CalendarioReperibilita.patch_assegnazioni(
+        assegnazioni, "2026-04-20", "2026-06-10", assegnazioni_fisse=fisse
+    )
+    ottimizza_equita(calendario, budget_ms=50)
+    
+    validatore = ValidatoreCalendario(calendario)
+    ok = (
+        all(assegnazioni[d][0] == nome for d, nome in fisse.items())
+        and assegnazioni["2026-06-06"] == assegnazioni["2026-06-07"]
+        and assegnazioni["2026-01-01"][0] == "Dardha"
+        and all(patch[d][0] == nome for d, nome in fisse.items())
+        and all(calendario.assegnazioni[d][0] == nome for d, nome in fisse.items())
+        and validatore.valida_assegnazioni_fisse()[0]
+        and validatore.valida_regola_7_giorni()[0]
+    )
+    
+    # Un'assegnazione fissa nelle ferie del titolare è un conflitto
+    try:
+        CalendarioReperibilita(
+            assegnazioni_fisse=fisse, ferie=[{"nome": "Likaj", "dal": "2026-09-14", "al": "2026-09-16"}]
+        ).genera_calendario()
+        ok = False
+    except ValueError as e:
+        print(f"  Conflitto rilevato: {e}")
+    
+    # ...e la verifica di fattibilità lo segnala già prima di generare (anche sull'altro giorno del weekend)
+    esito = verifica_fattibilita(CalendarioReperibilita(
+        assegnazioni_fisse=fisse, ferie=[{"nome": "Terazzi", "dal": "2026-06-06", "al": "2026-06-06"}]
+    ))
+    ok = ok and [v["data"] for v in esito["impossibili"] if v["tipo"] == "fisso"] == ["2026-06-06"]
+    
+    # Due turni importanti fissati allo stesso tecnico entro 7 giorni violano la regola dei blocchi
+    vicini = {"2026-03-07": "Likaj", "2026-03-15": "Likaj"}
+    conflitti = CalendarioReperibilita(assegnazioni_fisse=vicini).conflitti_fissi()
+    print(f"  Fissi vicini: {conflitti}")
+    ok = ok and len(conflitti) == 1
+    try:
+        CalendarioReperibilita(assegnazioni_fisse=vicini).genera_calendario()
+        ok = False
+    except ValueError as e:
+        print(f"  Conflitto rilevato: {e}")
+    ok = ok and CalendarioReperibilita(assegnazioni_fisse={"2026-03-07": "Likaj", "2026-03-21": "Likaj"}).conflitti_fissi() == []
+    if ok:
+        print("✅ PASSATO: Turni fissati rispettati da generazione, patch e ottimizzazione")
+    else:
+        print("❌ FALLITO: Assegnazioni fisse non rispettate")
+    assert ok
+
+
+def test_orizzonte_mobile():
+    """Test del calendario su un orizzonte mobile a cavallo d'anno."""
+    print("\n" + "="*60)
+    print("TEST: ORIZZONTE MOBILE")
+    print("="*60)
+    
+    calendario = CalendarioReperibilita(inizio="2026-10-17")
+    calendario.genera_calendario()
+    assegnazioni = calendario.assegnazioni
+    print(f"  Periodo: {calendario.inizio} -> {calendario.fine} ({len(assegnazioni)} giorni)")
+    
+    validatore = ValidatoreCalendario(calendario)
+    ok = (
+        calendario.fine == "2027-10-16"
+        and min(assegnazioni) == "2026-10-17"
+        and max(assegnazioni) == "2027-10-16"
+        and validatore.valida_regola_7_giorni()[0]
+        and validatore.valida_assegnazione_unica_per_data()[0]
+    )
+    
+    # Rigenerazione parziale a cavallo di Capodanno: dal checkpoint torna identica,
+    # con ferie nuove il tecnico sparisce dalla finestra
+    due_anni = CalendarioReperibilita(inizio="2026-01-01", fine="2027-12-31")
+    due_anni.genera_calendario()
+    base = due_anni.assegnazioni
+    patch = CalendarioReperibilita.patch_assegnazioni(
+        base, "2026-12-20", "2027-01-10", checkpoint=due_anni.checkpoint_rotazione()
+    )
+    ferie = [{"nome": "Likaj", "dal": "2026-12-20", "al": "2027-01-10"}]
+    patch_ferie = CalendarioReperibilita.patch_assegnazioni(base, "2026-12-20", "2027-01-10", ferie=ferie)
+    rigenerato = CalendarioReperibilita.da_assegnazioni(
+        patch_ferie, inizio="2026-01-01", fine="2027-12-31", ferie=ferie
+    )
+    ok = (
+        ok
+        and patch == base
+        and not any(patch_ferie[d][0] == "Likaj" for d in patch_ferie if "2026-12-20" <= d <= "2027-01-10")
+        and ValidatoreCalendario(rigenerato).valida_regola_7_giorni()[0]
+    )
+    if ok:
+        print("✅ PASSATO: Orizzonte mobile e patch a cavallo d'anno corretti")
+    else:
+        print("❌ FALLITO: Orizzonte mobile non valido")
+    assert ok
+
+
+def _app_di_prova():
+    """Modulo app_pwa e test client Flask con config.json in una cartella temporanea."""
+    import json
+    import tempfile
+    from pathlib import Path
+    cartella = Path(tempfile.mkdtemp())
+    # Al primo import DATA_DIR punta alla cartella temporanea (non a pwa_data)
+    os.environ.setdefault("REPAPP_DATA_DIR", str(cartella))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app_pwa
+    app_pwa.CONFIG_FILE = cartella / "config.json"
+    app_pwa.CONFIG_LOCK_FILE = cartella / "config.json.lock"
+    with app_pwa._config_lock:
+        app_pwa._config_cache.update(chiave=None, config=None, impronta=None)
+    with app_pwa._calendari_lock:
+        app_pwa._calendari_generati.clear()
+
+    def versione_su_disco():
+        with open(app_pwa.CONFIG_FILE) as f:
+            return json.load(f)["versione"]
+
+    def salva_esterno(modifica):
+        """Modifica config.json come farebbe un altro processo (senza passare dall'app)."""
+        with open(app_pwa.CONFIG_FILE) as f:
+            dati = json.load(f)
+        modifica(dati)
+        dati["versione"] += 1
+        with open(app_pwa.CONFIG_FILE, "w") as f:
+            json.dump(dati, f)
+
+    app_pwa.versione_su_disco = versione_su_disco
+    app_pwa.salva_esterno = salva_esterno
+    return app_pwa, app_pwa.app.test_client()
+
+
+def test_app_cache_config():
+    """Test della config in memoria dell'app: modifiche esterne rilette, copie indipendenti."""
+    print("\n" + "="*60)
+    print("TEST: APP - CACHE DELLA CONFIG")
+    print("="*60)
+    
+    app_pwa, client = _app_di_prova()
+    client.post("/api/tecnici", json={"nome": "Rossi"})
+    client.get("/api/calendario?anno=2026")
+    
+    # Modifica esterna di config.json: la richiesta successiva la vede
+    app_pwa.salva_esterno(lambda dati: dati["tecnici"].append("Bianchi"))
+    tecnici = client.get("/api/tecnici").get_json()["tecnici"]
+    print(f"  Dopo la modifica esterna: {tecnici}")
+    ok = "Rossi" in tecnici and "Bianchi" in tecnici
+    
+    # Ogni handler riceve una copia: modificarla (anche dentro calendario_cache) non tocca la cache
+    client.get("/api/calendario?anno=2026")
+    copia = app_pwa.leggi_config()
+    copia["tecnici"].append("Verdi")
+    voce = copia["calendario_cache"]["2026"]
+    voce["assegnazioni"]["2026-03-02"] = ["Verdi", "feriale", ""]
+    voce["checkpoint"]["settimane"].clear()
+    rilettura = app_pwa.leggi_config()
+    ok = (
+        ok
+        and "Verdi" not in rilettura["tecnici"]
+        and rilettura["calendario_cache"]["2026"]["assegnazioni"]["2026-03-02"][0] != "Verdi"
+        and len(rilettura["calendario_cache"]["2026"]["checkpoint"]["settimane"]) > 0
+    )
+    
+    # Solo la prima lettura di un anno lo salva in cache: le GET ripetute (anche alternando
+    # gli anni) non riscrivono config.json
+    client.get("/api/calendario?anno=2027")
+    versione = app_pwa.versione_su_disco()
+    for anno in (2026, 2027, 2026, 2027):
+        client.get(f"/api/calendario?anno={anno}")
+    print(f"  Versione dopo le GET: {versione} -> {app_pwa.versione_su_disco()}")
+    ok = ok and app_pwa.versione_su_disco() == versione
+    if ok:
+        print("✅ PASSATO: Config riletta dopo modifiche esterne, copie indipendenti, nessun salvataggio in lettura")
+    else:
+        print("❌ FALLITO: Cache della config non coerente")
+    assert ok
+
+
+def test_app_conflitti_versione():
+    """Test dei salvataggi concorrenti: 409 con versione vecchia, nuovo tentativo altrimenti."""
+    print("\n" + "="*60)
+    print("TEST: APP - CONFLITTI DI VERSIONE")
+    print("="*60)
+    
+    app_pwa, client = _app_di_prova()
+    client.post("/api/tecnici", json={"nome": "Rossi"})
+    config = client.get("/api/config").get_json()
+    
+    # Versione letta prima di un altro salvataggio: 409
+    app_pwa.salva_esterno(lambda dati: None)
+    risposta = client.post("/api/config", json=config)
+    print(f"  Versione vecchia: {risposta.status_code}")
+    ok = risposta.status_code == 409
+    ok = ok and client.post("/api/config", data="null", content_type="application/json").status_code == 400
+    
+    # Un salvataggio esterno durante l'handler fa ripetere la richiesta, che poi riesce
+    salva_config = app_pwa.salva_config
+    interferenze = []
+    
+    def salva_dopo_interferenza(config):
+        if not interferenze:
+            interferenze.append(1)
+            app_pwa.salva_esterno(lambda dati: dati["aiutanti"].append("esterno"))
+        return salva_config(config)
+    
+    app_pwa.salva_config = salva_dopo_interferenza
+    try:
+        risposta = client.post("/api/tecnici", json={"nome": "Bianchi"})
+        del interferenze[:]
+        config.pop("versione")
+        senza_versione = client.post("/api/config", json=dict(config, tecnici=config["tecnici"] + ["Verdi"]))
+    finally:
+        app_pwa.salva_config = salva_config
+    finale = app_pwa.leggi_config()
+    print(f"  Con interferenza: {risposta.status_code}, senza versione: {senza_versione.status_code}")
+    ok = (
+        ok
+        and risposta.status_code == 200
+        and senza_versione.status_code == 200
+        and "Verdi" in finale["tecnici"]
+    )
+    if ok:
+        print("✅ PASSATO: 409 sulla versione vecchia, nuovo tentativo dopo un salvataggio concorrente")
+    else:
+        print("❌ FALLITO: Gestione dei conflitti di versione errata")
+    assert ok
+
+
+def test_app_etag_calendario():
+    """Test delle GET condizionali sul calendario (ETag / If-None-Match)."""
+    print("\n" + "="*60)
+    print("TEST: APP - ETAG DEL CALENDARIO")
+    print("="*60)
+    
+    app_pwa, client = _app_di_prova()
+    client.post("/api/tecnici", json={"nome": "Rossi"})
+    client.get("/api/calendario?anno=2026")
+    risposta = client.get("/api/calendario?anno=2026")
+    etag = risposta.headers.get("ETag")
+    ok = risposta.status_code == 200 and etag is not None
+    non_modificato = client.get("/api/calendario?anno=2026", headers={"If-None-Match": etag})
+    print(f"  Stesso ETag: {non_modificato.status_code}")
+    ok = ok and non_modificato.status_code == 304
+    
+    # Dopo un salvataggio la stessa richiesta risponde 200 con un ETag nuovo
+    client.post("/api/ferie", json={"tipo": "tecnico", "nome": "Likaj", "dal": "2026-06-01", "al": "2026-06-05"})
+    dopo = client.get("/api/calendario?anno=2026", headers={"If-None-Match": etag})
+    print(f"  Dopo il salvataggio: {dopo.status_code}")
+    ok = ok and dopo.status_code == 200 and dopo.headers.get("ETag") not in (None, etag)
+    
+    # Un salvataggio durante l'handler non dà l'ETag nuovo ai dati letti prima
+    cache_valida = app_pwa._cache_valida
+    
+    def cache_con_salvataggio(config, anno):
+        app_pwa._cache_valida = cache_valida
+        app_pwa.salva_esterno(lambda dati: None)
+        return cache_valida(config, anno)
+    
+    app_pwa._cache_valida = cache_con_salvataggio
+    try:
+        durante = client.get("/api/calendario?anno=2026")
+    finally:
+        app_pwa._cache_valida = cache_valida
+    rivalidata = client.get("/api/calendario?anno=2026", headers={"If-None-Match": durante.headers.get("ETag")})
+    print(f"  Rivalidazione dopo un salvataggio concorrente: {rivalidata.status_code}")
+    ok = ok and rivalidata.status_code == 200
+    if ok:
+        print("✅ PASSATO: 304 con ETag corrispondente, ETag nuovo dopo ogni salvataggio")
+    else:
+        print("❌ FALLITO: ETag del calendario errato")
+    assert ok
+
+
+def test_app_cache_calendario():
+    """Test della cache per anno del calendario: scambi conservati, patch a cavallo d'anno."""
+    print("\n" + "="*60)
+    print("TEST: APP - CACHE DEL CALENDARIO")
+    print("="*60)
+    
+    app_pwa, client = _app_di_prova()
+    client.post("/api/tecnici", json={"nome": "Rossi"})
+    assegnazioni = client.get("/api/calendario?anno=2026").get_json()["assegnazioni"]
+    titolare = assegnazioni["2026-03-02"][0]
+    sostituto = client.get("/api/calendario/disponibili?data=2026-03-02").get_json()["tecnici"][0]
+    client.post("/api/calendario/scambio", json={"data": "2026-03-02", "tecnico": sostituto["nome"]})
+    
+    # Lo scambio resta dopo le letture (anche di un altro anno); rigenerare lo annulla
+    client.get("/api/calendario?anno=2027")
+    letto = client.get("/api/calendario?anno=2026").get_json()["assegnazioni"]["2026-03-02"][0]
+    intervallo = client.get("/api/calendario/range?dal=2026-03-02&al=2026-03-02").get_json()["assegnazioni"]
+    print(f"  2026-03-02: {titolare} -> {letto}")
+    ok = letto == sostituto["nome"] != titolare and intervallo["2026-03-02"][0] == letto
+    rigenerato = client.post("/api/calendario/rigenerare?anno=2026").get_json()["assegnazioni"]
+    ok = ok and rigenerato["2026-03-02"][0] == titolare
+    
+    # Ferie tra dicembre e gennaio: la patch aggiorna entrambi gli anni
+    client.post("/api/ferie", json={"tipo": "tecnico", "nome": "Likaj", "dal": "2026-12-28", "al": "2027-01-03"})
+    risposta = client.post("/api/calendario/rigenerare-parziale", json={"dal": "2026-12-28", "al": "2027-01-03", "anno": 2027})
+    cache = app_pwa.leggi_config()["calendario_cache"]
+    print(f"  Patch a cavallo d'anno: {risposta.status_code}, anni in cache: {sorted(cache)}")
+    ok = (
+        ok
+        and risposta.status_code == 200
+        and risposta.get_json()["anno"] == 2027
+        and not any(
+            cache[d[:4]]["assegnazioni"][d][0] == "Likaj"
+            for d in ("2026-12-28", "2026-12-31", "2027-01-01", "2027-01-03")
+        )
+    )
+    if ok:
+        print("✅ PASSATO: Scambi conservati in lettura, patch divisa per anno")
+    else:
+        print("❌ FALLITO: Cache del calendario non coerente")
+    assert ok
+
+
 if __name__ == "__main__":
     print("\n" + "🧪 SUITE DI TEST - CALENDARIO REPERIBILITÀ 2026 ".center(60, "="))
     
@@ -194,6 +1058,27 @@ if __name__ == "__main__":
     test_festivi()
     test_weekend()
     test_feriali()
+    test_indice_assegnazioni()
+    test_ferie()
+    test_configurazione_per_istanza()
+    test_generazione_multi_anno()
+    test_scenari_ferie()
+    test_patch_da_checkpoint()
+    test_ottimizzazione_equita()
+    test_generazione_squadre()
+    test_copia_calendario()
+    test_tabella_festivi()
+    test_iter_assegnazioni()
+    test_get_range()
+    test_disponibilita()
+    test_scambio_turni()
+    test_verifica_fattibilita()
+    test_assegnazioni_fisse()
+    test_orizzonte_mobile()
+    test_app_cache_config()
+    test_app_conflitti_versione()
+    test_app_etag_calendario()
+    test_app_cache_calendario()
     
     print("\n" + "="*60)
     print("✅ TUTTI I TEST COMPLETATI")